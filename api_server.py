@@ -0,0 +1,244 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.api_logic.worker_pool import WorkerPool, QueueFullError
+from services.cache_logic.result_cache import all_cache_stats
+from services.concurrency_logic.single_flight import all_single_flight_stats
+from services.concurrency_logic.cpu_pool import cpu_pool_stats, shutdown_cpu_pool
+from services.concurrency_logic.rate_limiter import get_rate_limiter
+from services.llm_logic.router import all_router_stats
+from services.fetcher_logic.speculative_fetch import speculation_stats
+from services.fetcher_logic.offer_collection import offer_source_stats
+from services.llm_logic.prompt_assembly import prompt_stats
+from services.llm_logic.structured_output import structured_output_stats
+from services.catalog_logic.catalog_index import catalog_stats
+from services.pipeline_logic.pipeline import RECENT_ANALYSES, find_recent_analysis
+from services.fetcher_logic.region_compare import compare_regions
+from services.watchlist_logic.scheduler import WATCHLIST_DB_PATH, WatchlistScheduler
+from services.watchlist_logic.watchlist_store import SQLiteWatchlistStore
+from services.alert_logic.alert_engine import AlertEngine, create_alert_engine
+from schemas.alert_schema import AlertRule
+from pydantic import ValidationError
+from services.config_logic.settings import get_settings
+from services.metrics_logic.exporter import start_metrics_server, stop_metrics_server
+from services.metrics_logic.registry import REGISTRY
+import json
+import re
+
+settings = get_settings()
+API_HOST = settings.api_host
+API_PORT = settings.api_port
+API_WORKERS = settings.api_workers
+API_MAX_QUEUE = settings.api_max_queue
+API_MAX_BATCH = settings.api_max_batch
+WATCHLIST_ENABLED = settings.watchlist_enabled
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)$")
+WATCHLIST_ITEM_PATH = re.compile(r"^/watchlist/([0-9a-f]+)$")
+ALERT_RULE_PATH = re.compile(r"^/alerts/rules/([\w-]+)$")
+
+
+# HTTP front end for the analysis worker pool
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    Endpoints:
+        POST /analyze         {"product_input": "..."}          -> 202 {"job_id": ...}
+        POST /analyze/batch   {"product_inputs": ["...", ...]}  -> 202 {"job_ids": [...]}
+        POST /analyze/similar {"product_input": "..."}          -> 200 {"match": recent analysis of a near-identical request or null}
+        POST /compare         {"product_info": {...}, "regions": ["us", "in"], "base_currency": "USD"} -> 200 region comparison
+        POST /watchlist       {"product_input": "..."} or {"product_info": {...}}, optional "interval_seconds" -> 201 watched item
+        GET  /watchlist                                         -> 200 {"items": [...]} without stored outputs
+        GET  /watchlist/{id}                                    -> 200 item with its last fetch and analysis
+        DELETE /watchlist/{id}                                  -> 200 {"removed": true}
+        POST /alerts/rules    {"kind": "window_low", "product_id": "...", ...} (see AlertRule) -> 201 rule
+        GET  /alerts/rules                                      -> 200 {"rules": [...]}
+        DELETE /alerts/rules/{id}                               -> 200 {"removed": true}
+        GET  /alerts                                            -> 200 {"alerts": [...]} most recent first
+        GET  /jobs/{id}                                         -> 200 job record
+        GET  /health                                            -> 200 pool status
+        GET  /stats                                             -> 200 cache, coalescing, quota, routing, speculation, offer-source, prompt-size, output-repair, catalog, near-duplicate, CPU pool, watchlist and alert counters
+
+    Returns 429 when the worker queue has no room for the request.
+    """
+
+    pool: WorkerPool = None
+    watchlist: WatchlistScheduler = None
+    alerts: AlertEngine = None
+
+    def _send_json(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send_json(200, {
+                "status": "ok",
+                "workers": self.pool.num_workers,
+                "queue_depth": self.pool.queue_depth(),
+                "max_queue": self.pool.max_queue
+            })
+
+        if self.path == "/stats":
+            return self._send_json(200, {
+                "caches": all_cache_stats(),
+                "single_flight": all_single_flight_stats(),
+                "quota": get_rate_limiter().quota_usage(),
+                "llm_routers": all_router_stats(),
+                "speculative_fetch": speculation_stats(),
+                "offer_sources": offer_source_stats(),
+                "prompts": prompt_stats(),
+                "structured_output": structured_output_stats(),
+                "catalog": catalog_stats(),
+                "near_duplicates": RECENT_ANALYSES.stats(),
+                "cpu_pool": cpu_pool_stats(),
+                "watchlist": self.watchlist.snapshot() if self.watchlist else None,
+                "alerts": self.alerts.snapshot() if self.alerts else None
+            })
+
+        if self.path in ("/alerts", "/alerts/rules"):
+            if self.alerts is None:
+                return self._send_json(404, {"error": "Alerts are disabled"})
+            if self.path == "/alerts":
+                return self._send_json(200, {"alerts": self.alerts.recent_alerts()})
+            return self._send_json(200, {"rules": self.alerts.rules()})
+
+        if self.path == "/watchlist" or WATCHLIST_ITEM_PATH.match(self.path):
+            if self.watchlist is None:
+                return self._send_json(404, {"error": "Watchlist is disabled"})
+            match = WATCHLIST_ITEM_PATH.match(self.path)
+            if match is None:
+                return self._send_json(200, {"items": self.watchlist.list_items()})
+            item = self.watchlist.get(match.group(1))
+            if item is None:
+                return self._send_json(404, {"error": "Watchlist item not found"})
+            return self._send_json(200, item)
+
+        match = JOB_PATH.match(self.path)
+        if match:
+            job = self.pool.job_store.get(match.group(1))
+            if job is None:
+                return self._send_json(404, {"error": "Job not found"})
+            return self._send_json(200, job)
+
+        self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        try:
+            body = self._read_json()
+        except ValueError:
+            return self._send_json(400, {"error": "Request body must be valid JSON"})
+
+        try:
+            if self.path == "/analyze":
+                product_input = body.get("product_input")
+                if not isinstance(product_input, str) or not product_input.strip():
+                    return self._send_json(400, {"error": "product_input must be a non-empty string"})
+                job_id = self.pool.submit(product_input)
+                return self._send_json(202, {"job_id": job_id, "status": "queued"})
+
+            if self.path == "/analyze/similar":
+                product_input = body.get("product_input")
+                if not isinstance(product_input, str) or not product_input.strip():
+                    return self._send_json(400, {"error": "product_input must be a non-empty string"})
+                return self._send_json(200, {"match": find_recent_analysis(product_input)})
+
+            if self.path == "/compare":
+                product_info, regions = body.get("product_info"), body.get("regions")
+                if not isinstance(product_info, dict) or not isinstance(regions, list) or not regions:
+                    return self._send_json(400, {"error": "product_info must be an object and regions a non-empty list"})
+                comparison = compare_regions(product_info, regions, base_currency=body.get("base_currency") or "USD")
+                return self._send_json(200, comparison.model_dump(mode="json"))
+
+            if self.path == "/watchlist":
+                if self.watchlist is None:
+                    return self._send_json(404, {"error": "Watchlist is disabled"})
+                product_input, product_info = body.get("product_input"), body.get("product_info")
+                if not isinstance(product_info, dict) and not (isinstance(product_input, str) and product_input.strip()):
+                    return self._send_json(400, {"error": "product_input must be a non-empty string or product_info an object"})
+                item = self.watchlist.add(product_input=product_input, product_info=product_info if isinstance(product_info, dict) else None, interval_seconds=body.get("interval_seconds"))
+                return self._send_json(200 if item["existing"] else 201, item)
+
+            if self.path == "/alerts/rules":
+                if self.alerts is None:
+                    return self._send_json(404, {"error": "Alerts are disabled"})
+                try:
+                    rule = AlertRule.model_validate(body)
+                except ValidationError as e:
+                    return self._send_json(400, {"error": str(e)})
+                return self._send_json(201, self.alerts.add_rule(rule).model_dump())
+
+            if self.path == "/analyze/batch":
+                product_inputs = body.get("product_inputs")
+                if not isinstance(product_inputs, list) or not product_inputs or not all(isinstance(p, str) and p.strip() for p in product_inputs):
+                    return self._send_json(400, {"error": "product_inputs must be a non-empty list of strings"})
+                if len(product_inputs) > API_MAX_BATCH:
+                    return self._send_json(400, {"error": f"Batch size exceeds {API_MAX_BATCH}"})
+                job_ids = self.pool.submit_batch(product_inputs)
+                return self._send_json(202, {"job_ids": job_ids, "status": "queued"})
+
+        except QueueFullError as e:
+            return self._send_json(429, {"error": str(e)})
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+
+        self._send_json(404, {"error": "Not found"})
+
+
+    def do_DELETE(self):
+        match = ALERT_RULE_PATH.match(self.path)
+        if match is not None and self.alerts is not None:
+            if not self.alerts.remove_rule(match.group(1)):
+                return self._send_json(404, {"error": "Alert rule not found"})
+            return self._send_json(200, {"removed": True})
+
+        match = WATCHLIST_ITEM_PATH.match(self.path)
+        if match is None or self.watchlist is None:
+            return self._send_json(404, {"error": "Not found"})
+        if not self.watchlist.remove(match.group(1)):
+            return self._send_json(404, {"error": "Watchlist item not found"})
+        self._send_json(200, {"removed": True})
+
+
+# start the worker pool and watchlist scheduler and serve until interrupted
+def main():
+    pool = WorkerPool(num_workers=API_WORKERS, max_queue=API_MAX_QUEUE)
+    pool.start()
+    AnalysisRequestHandler.pool = pool
+    REGISTRY.register_collector("jobs", lambda: [("productpulse_jobs", "gauge", "Analysis jobs by status.", [({"status": "queued"}, pool.queue_depth())])])
+    start_metrics_server()
+
+    watchlist = alerts = None
+    if WATCHLIST_ENABLED:
+        # Price alerts are evaluated on every watchlist refresh
+        alerts = create_alert_engine()
+        watchlist = WatchlistScheduler(SQLiteWatchlistStore(WATCHLIST_DB_PATH), observers=[alerts.observe_refresh])
+        watchlist.start()
+        AnalysisRequestHandler.watchlist = watchlist
+        AnalysisRequestHandler.alerts = alerts
+
+    server = ThreadingHTTPServer((API_HOST, API_PORT), AnalysisRequestHandler)
+    print(f"✅ ProductPulse API listening on http://{API_HOST}:{API_PORT} with {API_WORKERS} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if watchlist is not None:
+            watchlist.stop()
+            alerts.save_state()
+        pool.stop()
+        shutdown_cpu_pool()
+        stop_metrics_server()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,30 @@ import time
 import json
 from pydantic import BaseModel
 
-from tools.extractor_tool import Extractor_Tool
-from tools.fetcher_tool import Fetcher_Tool
-from tools.analyzer_tool import Analyzer_Tool
-from tools.predictor_tool import Predictor_Tool
+from services.api_logic.client import AnalysisApiClient
+from services.job_logic.job_store import SQLiteJobStore
+from services.job_logic.job_runner import BackgroundJobRunner
+from services.cache_logic.result_cache import hash_payload
+from services.fetcher_logic.fx_rates import REGION_CURRENCIES, format_money
+from services.fetcher_logic.price_sketch import PriceSketch
+from services.fetcher_logic.region_compare import compare_regions
+from services.alert_logic.alert_engine import ALERT_LOG_PATH
+from services.alert_logic.alert_sinks import read_recent_alerts
+from services.config_logic.settings import get_settings
+from services.metrics_logic.exporter import start_metrics_server
+from services.metrics_logic.registry import REGISTRY
+
+
+# When set, analyses run on the standalone API service (api_server.py)
+ANALYSIS_API_URL = get_settings().analysis_api_url
+
+# Local job queue used when no API service is configured
+JOB_DB_PATH = get_settings().job_db_path
+JOB_WORKERS = get_settings().job_workers
+JOB_POLL_SECONDS = 1.0
+
+# Above this many offers the distribution chart shows a histogram of the price sketch instead of one bar per seller
+DISTRIBUTION_MAX_BARS = 25
 
 
 # ============================================================================
@@ -90,11 +110,22 @@ def safe_get(obj, key, default=None):
         return default
 
 
-def format_price(price):
-    """Format price with currency symbol"""
-    if price is None:
-        return "N/A"
-    return f"${price:,.2f}"
+@st.cache_resource
+def get_job_backend():
+    """Job submitter shared by every session: the API client or a local background runner"""
+    if ANALYSIS_API_URL:
+        return AnalysisApiClient(ANALYSIS_API_URL)
+    runner = BackgroundJobRunner(SQLiteJobStore(JOB_DB_PATH), num_workers=JOB_WORKERS)
+    runner.start()
+    # Analyses run in this process, so it serves their metrics
+    REGISTRY.register_collector("jobs", lambda: [("productpulse_jobs", "gauge", "Analysis jobs by status.", [({"status": status}, count) for status, count in runner.job_store.count_active().items()])])
+    start_metrics_server()
+    return runner
+
+
+def format_price(price, currency="USD"):
+    """Format price with the symbol of its currency"""
+    return format_money(price, currency)
 
 
 def format_percentage(value):
@@ -104,43 +135,22 @@ def format_percentage(value):
     return f"{value:.1f}%"
 
 
-# ============================================================================
-# PIPELINE EXECUTION
-# ============================================================================
+def format_age(seconds):
+    """Format an age in seconds as a short human-readable string"""
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min"
+    return f"{seconds / 3600:.1f} h"
 
-def run_analysis_pipeline(product_input: str):
-    """Run all tools sequentially"""
-    
-    # Step 1: Extract
-    extractor = Extractor_Tool()
-    extractor_output = extractor.run(product_input)
-    
-    # Step 2: Fetch (ensure required fields)
-    required_fields = {
-        'product_name': None, 'brand': None, 'model': None, 'category': None,
-        'attributes': {}, 'condition': None, 'market_region': None,
-        'currency': 'USD', 'additional_context': None,
-        'search_keywords': [], 'input_confidence': 0.0
-    }
-    complete_product_info = {**required_fields, **extractor_output}
-    
-    fetcher = Fetcher_Tool()
-    fetcher_output = fetcher.run({"product_info": complete_product_info})
-    
-    # Step 3: Analyze
-    analyzer = Analyzer_Tool()
-    analyzer_output = analyzer.run({"fetched_product_info": fetcher_output})
-    
-    # Step 4: Predict
-    predictor = Predictor_Tool()
-    predictor_output = predictor.run({"analyzer_output": analyzer_output})
-    
-    return {
-        "extractor": extractor_output,
-        "fetcher": fetcher_output,
-        "analyzer": analyzer_output,
-        "predictor": predictor_output
-    }
+
+def submit_analysis(product_input):
+    """Queue an analysis job and start watching it"""
+    job_id = get_job_backend().submit(product_input)
+    st.session_state.active_job_id = job_id
+    st.session_state.watching_job = True
+    # Keep the job in the URL so a reload or reconnect resumes it
+    st.query_params["job"] = job_id
 
 
 # ============================================================================
@@ -157,18 +167,19 @@ def create_price_chart(fetcher_data):
     ]
     labels = ['Lowest', 'Current', 'Average', 'Highest']
     colors = ['#10b981', '#3b82f6', '#f59e0b', '#ef4444']
+    currency = safe_get(fetcher_data, 'currency', None) or 'USD'
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
         x=labels, y=prices, marker_color=colors,
-        text=[f'${p:,.2f}' for p in prices],
+        text=[format_price(p, currency) for p in prices],
         textposition='outside',
         textfont=dict(size=14, color='black', family='Arial Black')
     ))
     
     fig.update_layout(
         title={'text': 'Price Comparison Analysis', 'x': 0.5, 'xanchor': 'center'},
-        yaxis_title='Price (USD)', height=450, showlegend=False,
+        yaxis_title=f'Price ({currency})', height=450, showlegend=False,
         plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)'
     )
     return fig
@@ -179,19 +190,47 @@ def create_distribution_chart(fetcher_data):
     price_dist = safe_get(fetcher_data, 'price_distribution', [])
     if not price_dist:
         return None
+    sketch = PriceSketch.from_dict(safe_get(fetcher_data, 'price_sketch', None))
+    # Too many bars to read, or only the first offers were serialized: chart the sketch
+    truncated = len(price_dist) < (safe_get(fetcher_data, 'seller_count', 0) or 0)
+    if (len(price_dist) > DISTRIBUTION_MAX_BARS or truncated) and sketch:
+        return create_sketch_chart(sketch, safe_get(fetcher_data, 'currency', None) or 'USD')
     
     sellers = [safe_get(d, 'seller', 'Unknown') for d in price_dist]
     prices = [safe_get(d, 'price', 0) for d in price_dist]
+    currency = safe_get(fetcher_data, 'currency', None) or 'USD'
     
     fig = go.Figure(data=[go.Bar(
         x=sellers, y=prices, marker_color='#667eea',
-        text=[f'${p:,.2f}' for p in prices],
+        text=[format_price(p, currency) for p in prices],
         textposition='outside'
     )])
     
     fig.update_layout(
         title={'text': 'Price Distribution Across Sellers', 'x': 0.5},
-        xaxis_title='Seller', yaxis_title='Price (USD)', height=450,
+        xaxis_title='Seller', yaxis_title=f'Price ({currency})', height=450,
+        plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def create_sketch_chart(sketch, currency, bins=20):
+    """Price histogram with quartile markers, from a price sketch"""
+    histogram = sketch.histogram(bins)
+    edges, counts = histogram['edges'], histogram['counts']
+    centres = [(low + high) / 2 for low, high in zip(edges, edges[1:])]
+    
+    fig = go.Figure(data=[go.Bar(
+        x=centres, y=[round(count, 1) for count in counts], width=[high - low for low, high in zip(edges, edges[1:])],
+        marker_color='#667eea', hovertemplate=f'%{{x:,.2f}} {currency}: ~%{{y}} offers<extra></extra>'
+    )])
+    for label, price in sketch.percentiles((25, 50, 75)).items():
+        fig.add_vline(x=price, line_dash='dash', line_color='#ef4444' if label == 'p50' else '#f59e0b',
+                      annotation_text=f"{label.upper()} {format_price(price, currency)}")
+    
+    fig.update_layout(
+        title={'text': f'Price Distribution ({sketch.count:,.0f} offers)', 'x': 0.5},
+        xaxis_title=f'Price ({currency})', yaxis_title='Offers', height=450, bargap=0.05,
         plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)'
     )
     return fig
@@ -218,6 +257,52 @@ def create_gauge_chart(confidence):
     return fig
 
 
+# ============================================================================
+# RERUN CACHING
+# ============================================================================
+# Streamlit reruns the whole script on every interaction. Figures and the JSON
+# report only change when the results do, so they are cached on a fingerprint
+# of the results computed once when the analysis finishes. Arguments prefixed
+# with an underscore are not hashed by st.cache_data.
+
+def results_fingerprint(results):
+    """Content hash of a results dict"""
+    return hash_payload(results)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_price_chart(fingerprint, _fetcher_data):
+    """Price comparison figure spec for a results fingerprint"""
+    return create_price_chart(_fetcher_data).to_dict()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_distribution_chart(fingerprint, _fetcher_data):
+    """Price distribution figure spec for a results fingerprint"""
+    fig = create_distribution_chart(_fetcher_data)
+    return fig.to_dict() if fig else None
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_gauge_chart(confidence):
+    """Confidence gauge figure spec"""
+    return create_gauge_chart(confidence).to_dict()
+
+
+@st.cache_data(max_entries=64, ttl=15 * 60, show_spinner=False)
+def cached_region_comparison(fingerprint, regions, base_currency, _product_info):
+    """Multi-region price comparison for a results fingerprint, refreshed every 15 minutes"""
+    if ANALYSIS_API_URL:
+        return get_job_backend().compare_regions(_product_info, list(regions), base_currency)
+    return compare_regions(_product_info, list(regions), base_currency=base_currency).model_dump(mode="json")
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_report_json(fingerprint, _results):
+    """Serialized JSON report for a results fingerprint"""
+    return json.dumps(_results, indent=2, default=str)
+
+
 # ============================================================================
 # MAIN APP
 # ============================================================================
@@ -230,6 +315,7 @@ def main():
     # Session state
     if 'results' not in st.session_state:
         st.session_state.results = None
+        st.session_state.results_fingerprint = None
     
     # Header
     st.markdown("""
@@ -260,9 +346,23 @@ def main():
         ML-based buy/no-buy prediction
         """)
         
+        # Price alerts raised by the watchlist refresh loop (api_server.py)
+        recent_alerts = read_recent_alerts(ALERT_LOG_PATH, limit=10)
+        if recent_alerts:
+            st.markdown("---")
+            st.header("🔔 Price Alerts")
+            for alert in recent_alerts:
+                st.markdown(f"**{alert['message']}**  \n<small>{alert['triggered_at'][:16].replace('T', ' ')} UTC</small>", unsafe_allow_html=True)
+        
         st.markdown("---")
         if st.button("🗑️ Clear Results", use_container_width=True):
             st.session_state.results = None
+            st.session_state.results_fingerprint = None
+            st.session_state.active_job_id = None
+            st.session_state.results_job_id = None
+            st.session_state.reuse_offer = None
+            st.session_state.comparison_request = None
+            st.query_params.pop("job", None)
             st.rerun()
     
     # Input Section
@@ -289,41 +389,78 @@ def main():
             height=100
         )
     
-    # Analyze button
+    # Analyze button: offer a recent analysis of a near-identical request, otherwise queue a background job
     if st.button("🚀 Analyze Product", type="primary", disabled=not product_input):
-        st.markdown("---")
-        st.markdown("## 📈 Analysis Progress")
-        
-        progress_bar = st.progress(0)
-        status = st.empty()
-        
-        steps = [
-            ("🔍 Extractor", "Parsing...", 0.25),
-            ("📊 Fetcher", "Gathering data...", 0.50),
-            ("🧠 Analyzer", "Analyzing...", 0.75),
-            ("🎯 Predictor", "Predicting...", 1.0)
-        ]
-        
         try:
-            for icon, desc, prog in steps:
-                status.markdown(f'<div class="step-container"><h3>{icon} {desc}</h3></div>', unsafe_allow_html=True)
-                progress_bar.progress(prog)
-                time.sleep(0.3)
-            
-            with st.spinner("🤖 Running analysis..."):
-                results = run_analysis_pipeline(product_input)
-            
-            status.success("✅ Analysis complete!")
-            st.session_state.results = results
-            st.session_state.show_balloons = True
-            st.rerun()
-
-            
+            match = get_job_backend().find_recent(product_input)
+        except Exception as e:
+            print(f"⚠️ Near-duplicate lookup failed: {e}")
+            match = None
+        try:
+            if match:
+                st.session_state.reuse_offer = {**match, "product_input": product_input}
+            else:
+                submit_analysis(product_input)
         except Exception as e:
-            status.error(f"❌ Failed: {str(e)}")
+            st.error(f"❌ Failed: {str(e)}")
             st.exception(e)
             return
     
+    offer = st.session_state.get("reuse_offer")
+    if offer:
+        st.info(f"🔁 A near-identical request was analyzed {format_age(offer['age_seconds'])} ago: \"{offer['matched_input']}\"")
+        use_col, fresh_col = st.columns(2)
+        if use_col.button("Use this analysis", use_container_width=True):
+            results = offer["results"]
+            st.session_state.results = results
+            st.session_state.results_fingerprint = results_fingerprint(results)
+            st.session_state.active_job_id = None
+            st.session_state.results_job_id = None
+            st.session_state.reuse_offer = None
+            st.query_params.pop("job", None)
+            st.rerun()
+        if fresh_col.button("Run a fresh analysis", use_container_width=True):
+            st.session_state.reuse_offer = None
+            try:
+                submit_analysis(offer["product_input"])
+            except Exception as e:
+                st.error(f"❌ Failed: {str(e)}")
+                st.exception(e)
+                return
+    
+    # Poll the active job; results are stored under its ID and survive reruns and disconnects
+    active_job_id = st.session_state.get("active_job_id") or st.query_params.get("job")
+    if active_job_id and active_job_id != st.session_state.get("results_job_id"):
+        st.session_state.active_job_id = active_job_id
+        job = get_job_backend().get_job(active_job_id)
+        
+        if job is None:
+            st.session_state.active_job_id = None
+            st.query_params.pop("job", None)
+            st.warning("⚠️ Analysis job not found")
+        elif job["status"] == "succeeded":
+            results = job["result"]
+            st.session_state.results = results
+            st.session_state.results_fingerprint = results_fingerprint(results)
+            st.session_state.results_job_id = active_job_id
+            st.session_state.show_balloons = st.session_state.get("watching_job", False)
+            st.session_state.watching_job = False
+            st.rerun()
+        elif job["status"] == "failed":
+            st.session_state.active_job_id = None
+            st.session_state.watching_job = False
+            st.query_params.pop("job", None)
+            st.error(f"❌ Failed: {job.get('error')}")
+            return
+        else:
+            st.markdown("---")
+            st.markdown("## 📈 Analysis Progress")
+            label = "⏳ Queued..." if job["status"] == "queued" else "🤖 Running analysis..."
+            st.markdown(f'<div class="step-container"><h3>{label}</h3></div>', unsafe_allow_html=True)
+            st.caption(f"Job `{active_job_id}` keeps running if you leave this page.")
+            time.sleep(JOB_POLL_SECONDS)
+            st.rerun()
+    
     if st.session_state.get("show_balloons", False):
         st.balloons()
         st.session_state.show_balloons = False
@@ -331,6 +468,7 @@ def main():
     # Display Results
     if st.session_state.results:
         results = st.session_state.results
+        fingerprint = st.session_state.get("results_fingerprint") or results_fingerprint(results)
         extractor = results['extractor']
         fetcher = results['fetcher']
         analyzer = results['analyzer']
@@ -339,6 +477,12 @@ def main():
         st.markdown("---")
         st.markdown("## 📊 Analysis Results")
         
+        # Stages that ran out of time or budget and served a fallback
+        degraded = results.get('degraded') or {}
+        if degraded:
+            fallbacks = ", ".join(f"{stage} ({info['fallback'].replace('_', ' ')})" for stage, info in degraded.items())
+            st.warning(f"⚠️ Partial results: {fallbacks}. Re-run the analysis for full results.")
+        
         # Product Info
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("📦 Product", safe_get(extractor, 'product_name', 'N/A'))
@@ -354,22 +498,30 @@ def main():
         
         current = safe_get(fetcher, 'current_price', 0)
         average = safe_get(fetcher, 'average_price', 0)
+        currency = safe_get(fetcher, 'currency', None) or 'USD'
         
-        col1.metric("💵 Current", format_price(current))
-        col2.metric("📊 Average", format_price(average), f"{current-average:,.2f}", delta_color="inverse")
-        col3.metric("⬇️ Lowest", format_price(safe_get(fetcher, 'lowest_price', 0)))
-        col4.metric("⬆️ Highest", format_price(safe_get(fetcher, 'highest_price', 0)))
+        col1.metric("💵 Current", format_price(current, currency))
+        col2.metric("📊 Average", format_price(average, currency), f"{current-average:,.2f}", delta_color="inverse")
+        col3.metric("⬇️ Lowest", format_price(safe_get(fetcher, 'lowest_price', 0), currency))
+        col4.metric("⬆️ Highest", format_price(safe_get(fetcher, 'highest_price', 0), currency))
         col5.metric("🏪 Sellers", safe_get(fetcher, 'seller_count', 0))
-        
+        outliers = safe_get(fetcher, 'outliers', None) or []
+        if outliers:
+            left_out = ", ".join(f"{safe_get(o, 'seller', 'Unknown')} ({format_price(safe_get(o, 'price', 0), currency)})" for o in outliers)
+            st.caption(f"ℹ️ {len(outliers)} listing(s) left out of the price stats as outliers: {left_out}")
+        if safe_get(fetcher, 'current_price_replaced', False):
+            raw_current = safe_get(safe_get(fetcher, 'raw_price_stats', None) or {}, 'current', None)
+            st.caption(f"ℹ️ The first listing ({format_price(raw_current, currency)}) looked like an outlier, so Current shows the next listing.")
+
         # Charts
         st.markdown("---")
         st.markdown("### 📈 Visual Analysis")
         col1, col2 = st.columns(2)
         
         with col1:
-            st.plotly_chart(create_price_chart(fetcher), use_container_width=True)
+            st.plotly_chart(cached_price_chart(fingerprint, fetcher), use_container_width=True)
         with col2:
-            chart = create_distribution_chart(fetcher)
+            chart = cached_distribution_chart(fingerprint, fetcher)
             if chart:
                 st.plotly_chart(chart, use_container_width=True)
             else:
@@ -400,7 +552,7 @@ def main():
             best = safe_get(analyzer, 'best_offer', None)
             if best:
                 st.success(f"""
-                **💰 Price:** {format_price(safe_get(best, 'price', 0))}  
+                **💰 Price:** {format_price(safe_get(best, 'price', 0), currency)}  
                 **🏪 Seller:** {safe_get(best, 'seller', 'N/A')}  
                 **✨ Condition:** {safe_get(best, 'condition', 'N/A')}  
                 **⭐ Confidence:** {safe_get(best, 'seller_confidence', 0):.0%}
@@ -408,7 +560,7 @@ def main():
         
         with col2:
             conf = safe_get(predictor, 'confidence', 0)
-            st.plotly_chart(create_gauge_chart(conf), use_container_width=True)
+            st.plotly_chart(cached_gauge_chart(conf), use_container_width=True)
             
             st.markdown("**Price Evaluation:**")
             price_eval = safe_get(analyzer, 'price_evaluation', None)
@@ -486,9 +638,56 @@ def main():
             col3.markdown(f"""<div class="info-box"><h4>📈 Spread</h4><h3>{format_percentage(safe_get(market, 'price_spread_percent', 0))}</h3></div>""", unsafe_allow_html=True)
             col4.markdown(f"""<div class="info-box"><h4>🔢 Sellers</h4><h3>{safe_get(market, 'seller_count', 0)}</h3></div>""", unsafe_allow_html=True)
         
+        # Multi-region comparison
+        st.markdown("---")
+        st.markdown("### 🌍 Compare Regions")
+        region_options = sorted(REGION_CURRENCIES)
+        home_region = (safe_get(extractor, 'market_region', None) or 'us').lower()
+        col1, col2, col3 = st.columns([3, 1, 1])
+        regions = col1.multiselect(
+            "Markets", region_options,
+            default=[r for r in dict.fromkeys([home_region, 'us', 'uk', 'in']) if r in region_options][:3],
+            format_func=lambda r: f"{r.upper()} ({REGION_CURRENCIES[r]})"
+        )
+        base_currency = col2.selectbox("Currency", sorted(set(REGION_CURRENCIES.values())), index=sorted(set(REGION_CURRENCIES.values())).index("USD"))
+        col3.markdown("<br>", unsafe_allow_html=True)
+        if col3.button("🔎 Compare", disabled=not regions, use_container_width=True):
+            st.session_state.comparison_request = (tuple(regions), base_currency)
+        
+        comparison_request = st.session_state.get("comparison_request")
+        if comparison_request:
+            try:
+                with st.spinner("Searching all markets..."):
+                    comparison = cached_region_comparison(fingerprint, comparison_request[0], comparison_request[1], extractor)
+            except Exception as e:
+                st.error(f"❌ Comparison failed: {str(e)}")
+                comparison = None
+            if comparison:
+                base = comparison['base_currency']
+                st.caption(f"Query \"{comparison['query']}\" · {len(comparison['regions'])} markets in {comparison['total_seconds']:.1f}s · FX rates: {comparison['fx_source']}")
+                st.dataframe([
+                    {
+                        "Market": row['market_region'].upper(),
+                        "Sellers": row['seller_count'],
+                        "Lowest": format_price(row['lowest_price'], row['currency']),
+                        f"Lowest ({base})": format_price(row['lowest_price_base'], base),
+                        f"Average ({base})": format_price(row['average_price_base'], base),
+                        f"Highest ({base})": format_price(row['highest_price_base'], base),
+                        "Note": row['error'] or "",
+                    }
+                    for row in comparison['regions']
+                ], use_container_width=True, hide_index=True)
+                if comparison['ranking']:
+                    st.markdown("**🏆 Best offers across markets:**")
+                    for offer in comparison['ranking'][:5]:
+                        st.markdown(
+                            f"{offer['rank']}. **{format_price(offer['price_base'], base)}** · {offer['seller'] or 'Unknown'} "
+                            f"({offer['market_region'].upper()}, {format_price(offer['price'], offer['currency'])})"
+                        )
+        
         # Download
         st.markdown("---")
-        json_str = json.dumps(results, indent=2, default=str)
+        json_str = cached_report_json(fingerprint, results)
         st.download_button(
             "📥 Download Full Report (JSON)",
             json_str,
@@ -0,0 +1,81 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that must only load on first use, never at import
+LLM_AND_ML = ("langchain", "langchain_core", "langgraph", "langchain_google_genai", "langchain_ollama", "joblib", "sklearn")
+PROVIDER_CLIENTS = ("langgraph", "langchain_google_genai", "langchain_ollama", "joblib", "sklearn")
+
+# entry module -> (budget in ms, top-level packages it must not import)
+BUDGETS = {
+    "services.pipeline_logic.pipeline": (400, LLM_AND_ML + ("plotly", "streamlit")),
+    "services.job_logic.job_runner": (400, LLM_AND_ML + ("plotly", "streamlit")),
+    "api_server": (500, LLM_AND_ML + ("plotly", "streamlit")),
+    "app": (1200, LLM_AND_ML),                      # streamlit itself imports plotly
+    "tools.fetcher_tool": (900, PROVIDER_CLIENTS),
+    "tools.extractor_tool": (900, PROVIDER_CLIENTS),
+    "tools.analyzer_tool": (1000, PROVIDER_CLIENTS),
+    "tools.predictor_tool": (900, PROVIDER_CLIENTS),
+}
+
+parser = argparse.ArgumentParser(description="Fail when cold-start import time or import-time dependencies regress (python -X importtime).")
+parser.add_argument("modules", nargs="*", default=list(BUDGETS), help="Entry modules to check (default: all budgeted modules)")
+parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the median is compared to the budget")
+parser.add_argument("--scale", type=float, default=float(os.getenv("IMPORT_BUDGET_SCALE", "1.0")), help="Multiplier for every budget, for slower machines")
+args = parser.parse_args()
+
+
+# cumulative import time of module (ms) and every top-level package it loaded
+def measure(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    total_us, loaded = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue                                # header line
+        name = name.strip()
+        loaded.add(name.split(".")[0])
+        if name == module:
+            total_us = int(cumulative)
+    return total_us / 1000, loaded
+
+
+failures = []
+print(f"{'module':<36}{'median ms':>10}{'budget ms':>11}  status")
+for module in args.modules:
+    budget_ms, forbidden = BUDGETS.get(module, (float("inf"), ()))
+    budget_ms *= args.scale
+    timings, loaded = [], set()
+    for _ in range(args.runs):
+        elapsed_ms, modules = measure(module)
+        timings.append(elapsed_ms)
+        loaded |= modules
+
+    median_ms = statistics.median(timings)
+    eager = sorted(name for name in forbidden if name in loaded)
+    problems = []
+    if median_ms > budget_ms:
+        problems.append(f"over budget by {median_ms - budget_ms:.0f} ms")
+    if eager:
+        problems.append(f"imports {', '.join(eager)} eagerly")
+    failures.extend(f"{module}: {problem}" for problem in problems)
+    print(f"{module:<36}{median_ms:>10.0f}{budget_ms:>11.0f}  {'; '.join(problems) or 'ok'}")
+
+if failures:
+    print("\n❌ Import-time budget exceeded:")
+    for failure in failures:
+        print(f"  - {failure}")
+    sys.exit(1)
+print("\n✅ All modules within their import-time budget.")
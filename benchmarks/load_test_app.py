@@ -0,0 +1,20 @@
+"""
+Streamlit entry point used by streamlit_load_bench.py: runs app.py unchanged,
+with the LLM backends and SerpAPI replaced by latency-sampling stubs.
+
+Streamlit re-executes this file on every rerun; the stubs and the compiled
+app live in load_test_stubs, which stays imported between reruns.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.load_test_stubs import compiled_script, install_stubs
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+install_stubs()
+exec(compiled_script(APP_PATH), {"__name__": "__main__", "__file__": APP_PATH})
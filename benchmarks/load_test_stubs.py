@@ -0,0 +1,155 @@
+import functools
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+
+# Seller names used by the stub search results
+STUB_SELLERS = ("Amazon", "Walmart", "Best Buy", "Target", "eBay", "Newegg", "B&H Photo", "Costco", "Micro Center", "Adorama")
+
+# Rate-limiter provider of the stub LLM backends; its limits are set high, so
+# calls pay the real limiter's cost without being throttled by it
+STUB_LLM_PROVIDER = "stub_llm"
+STUB_LLM_LIMITS = {"RATE_LIMIT_STUB_LLM_PER_MINUTE": "1000000", "RATE_LIMIT_STUB_LLM_BURST": "1000000"}
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+# parse a latency spec into a function returning seconds
+def parse_latency_spec(spec):
+    """
+    "const:S", "uniform:LOW:HIGH" or "lognormal:MEDIAN:P95", all in seconds.
+    Lognormal is the usual shape of provider latency: most calls near the
+    median with a long tail out to (and past) the p95.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(":")] if args else []
+    if kind == "const" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        low, high = values
+        return lambda: random.uniform(low, high)
+    if kind == "lognormal" and len(values) == 2:
+        median, p95 = values
+        if median <= 0 or p95 < median:
+            raise ValueError(f"lognormal latency needs 0 < median <= p95: {spec}")
+        mu, sigma = math.log(median), math.log(p95 / median) / 1.645
+        return lambda: random.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown latency spec {spec!r}; use const:S, uniform:LOW:HIGH or lognormal:MEDIAN:P95")
+
+
+# short stable digest of any text
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:8]
+
+
+class StubChatModel:
+    """
+    Chat model stand-in for one pipeline stage: waits a sampled latency, then
+    answers with canned content of the shape the stage expects. Identical
+    prompts get identical answers, so caches behave as they would in production.
+    """
+
+    def __init__(self, stage, sample_latency):
+        self.stage = stage
+        self.sample_latency = sample_latency
+
+    def invoke(self, model_input, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        time.sleep(self.sample_latency())
+        if isinstance(model_input, list):
+            prompt = "\n".join(str(getattr(message, "content", message)) for message in model_input)
+        else:
+            prompt = str(model_input)
+        return AIMessage(content=self._answer(_digest(prompt)))
+
+    def _answer(self, digest):
+        if self.stage == "extractor":
+            return json.dumps({
+                "product_name": f"Load Test Product {digest}", "brand": "Stub", "model": digest,
+                "category": "electronics", "attributes": {}, "condition": "new", "market_region": "us",
+                "currency": "USD", "additional_context": None, "search_keywords": [digest], "input_confidence": 0.9
+            })
+        if self.stage == "analyzer":
+            return json.dumps({
+                "headline": f"Stub market summary {digest}",
+                "key_points": ["Prices vary across sellers.", "Several sellers have stock."],
+                "short_explanation": "Generated by the load-test stub."
+            })
+        return "- Stub reasoning for the ML decision.\n- Generated by the load-test stub."
+
+
+class _StubResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class StubSerpApi:
+    """Replaces the requests module in serpapi_client: waits a sampled latency and returns shopping results."""
+
+    def __init__(self, sample_latency):
+        self.sample_latency = sample_latency
+
+    def get(self, url, params=None, timeout=None):
+        time.sleep(self.sample_latency())
+        query = (params or {}).get("q") or ""
+        rng = random.Random(_digest(query))
+        base = rng.uniform(50, 2000)
+        # Offers span about +/-20% of a base price, like real multi-seller results
+        prices = [base * 0.8, base * 1.2] + [base * rng.uniform(0.8, 1.2) for _ in range(rng.randint(3, 18))]
+        rng.shuffle(prices)
+        results = [
+            {
+                "title": query,
+                "source": rng.choice(STUB_SELLERS),
+                "price": f"${price:,.2f}",
+                "extracted_price": round(price, 2),
+                "rating": round(rng.uniform(3.5, 5.0), 1),
+                "reviews": rng.randint(0, 5000),
+            }
+            for price in prices
+        ]
+        return _StubResponse({"shopping_results": results})
+
+
+# a script compiled once per process, as Streamlit caches its compiled main script
+@functools.lru_cache(maxsize=None)
+def compiled_script(path):
+    with open(path, encoding="utf-8") as script_file:
+        return compile(script_file.read(), path, "exec")
+
+
+# replace the LLM backends and SerpAPI with stubs (once per process)
+def install_stubs():
+    """
+    Latencies come from LOAD_TEST_LLM_LATENCY and LOAD_TEST_SEARCH_LATENCY
+    (latency specs, see parse_latency_spec). Everything between the stubs -
+    rate limiter, coalescing, caches, job queue and the app itself - is real;
+    stub LLM calls take tokens from the STUB_LLM_PROVIDER bucket.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from services.llm_logic import router
+        from services.fetcher_logic import serpapi_client
+
+        llm_latency = parse_latency_spec(os.getenv("LOAD_TEST_LLM_LATENCY", "lognormal:0.8:2.5"))
+        search_latency = parse_latency_spec(os.getenv("LOAD_TEST_SEARCH_LATENCY", "lognormal:1.2:3.0"))
+        for name, value in STUB_LLM_LIMITS.items():
+            os.environ.setdefault(name, value)
+        for stage in router.STAGE_BACKENDS:
+            backend = router.LLMBackend("stub", lambda stage=stage: StubChatModel(stage, llm_latency), provider=STUB_LLM_PROVIDER)
+            router._routers[stage] = router.LLMRouter(stage, [backend])
+        serpapi_client.requests = StubSerpApi(search_latency)
+        _installed = True
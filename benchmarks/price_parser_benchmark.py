@@ -0,0 +1,74 @@
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fetcher_logic.price_parser import parse_price_text, parse_prices
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+random.seed(42)
+
+
+# previous implementation, for comparison
+def legacy_clean_price(price_value):
+    if isinstance(price_value, str):
+        clean_str = re.sub(r'[^\d.]', '', price_value)
+        try:
+            return float(clean_str)
+        except ValueError:
+            return None
+    return None
+
+
+# price strings in the formats SerpAPI returns across markets, with the value they should parse to
+def sample_price():
+    amount = round(random.uniform(5, 250_000), 2)
+    whole, cents = f"{amount:.2f}".split(".")
+    us_grouped = f"{int(whole):,}"
+    styles = [
+        (f"${us_grouped}.{cents}", amount),
+        (f"{us_grouped.replace(',', '.')},{cents} €", amount),
+        (f"£{us_grouped}.{cents}", amount),
+        (f"{us_grouped.replace(',', ' ')},{cents} €", amount),
+        (f"CHF {us_grouped.replace(',', chr(39))}.{cents}", amount),
+        (f"¥{us_grouped}", float(whole)),
+        (f"US$ {us_grouped}.{cents} used", amount),
+    ]
+    # Indian grouping: last three digits, then groups of two
+    head, tail = whole[:-3], whole[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    indian = ",".join(([head] if head else []) + groups + [tail]) if len(whole) > 3 else whole
+    styles.append((f"₹{indian}", float(whole)))
+    return random.choice(styles)
+
+
+samples = [sample_price() for _ in range(N)]
+# Offer lists repeat prices a lot; the second workload draws from 5,000 distinct strings
+repeated = random.choices(samples[:5000], k=N)
+
+
+# time a callable over the samples and count correct results
+def run(name, parse, texts, expected):
+    start = time.perf_counter()
+    values = parse(texts)
+    elapsed = time.perf_counter() - start
+    correct = sum(1 for value, want in zip(values, expected) if value is not None and abs(value - want) < 0.005)
+    print(f"{name:<28} {elapsed * 1000:8.1f} ms  {elapsed / N * 1e6:6.2f} µs/price  {correct / N:7.2%} correct")
+
+
+legacy = lambda items: [legacy_clean_price(text) for text in items]
+batch = lambda items: [None if p != p else p for p in parse_prices(items).prices.tolist()]
+
+for label, workload in (("mostly distinct", samples), ("5,000 distinct", repeated)):
+    texts = [text for text, _ in workload]
+    expected = [value for _, value in workload]
+    print(f"\n{N:,} price strings, {label} ({len(set(texts)):,} unique)")
+    run("legacy _clean_price", legacy, texts, expected)
+    parse_price_text.cache_clear()
+    run("parse_prices", batch, texts, expected)
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from benchmarks.load_test_stubs import parse_latency_spec
+
+ENTRY_SCRIPT = os.path.join(ROOT, "benchmarks", "load_test_app.py")
+
+# Labels of the widgets a simulated analyst uses
+TEXT_AREA_LABEL = "**Describe the product:**"
+ANALYZE_LABEL = "🚀 Analyze Product"
+
+# What analysts type; a per-request suffix keeps requests distinct unless --repeat-inputs is given
+SAMPLE_INPUTS = (
+    "iPhone 15 Pro 256GB new, US market",
+    "Samsung Galaxy S24 Ultra 512GB, unlocked, new condition",
+    "Sony WH-1000XM5 wireless headphones, new, buying in the US",
+    "HP Pavilion 15 laptop with Ryzen 5, 8GB RAM, 512GB SSD, new condition",
+    "Nintendo Switch OLED, used in good condition",
+    "Dell UltraSharp U2723QE 27 inch 4K monitor, new",
+)
+
+parser = argparse.ArgumentParser(description="Drive the Streamlit app with simulated concurrent analysts over its websocket protocol, with stubbed LLM and SerpAPI providers, and report latency, throughput, memory and CPU.")
+parser.add_argument("--sessions", type=int, default=10, help="Concurrent simulated sessions")
+parser.add_argument("--iterations", type=int, default=3, help="Analyses each session runs")
+parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which sessions connect")
+parser.add_argument("--think", type=float, default=1.0, help="Mean pause between a session's actions, in seconds")
+parser.add_argument("--llm-latency", default="lognormal:0.8:2.5", help="Stub LLM latency: const:S, uniform:LOW:HIGH or lognormal:MEDIAN:P95")
+parser.add_argument("--search-latency", default="lognormal:1.2:3.0", help="Stub SerpAPI latency, same format")
+parser.add_argument("--job-workers", type=int, default=2, help="Background analysis workers in the app process (JOB_WORKERS)")
+parser.add_argument("--repeat-inputs", action="store_true", help="Reuse the same few inputs, so caches and coalescing take effect")
+parser.add_argument("--timeout", type=float, default=180.0, help="Seconds to wait for one analysis before counting it failed")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--output", help="Write the JSON report here")
+parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+parser.add_argument("--server-log", help="Write the app's output here (default: discarded)")
+# Parsed in main(), so importing this module (e.g. during test collection) has no side effects
+args = None
+
+
+# nearest-rank percentiles of a list of seconds, in milliseconds
+def latency_summary(samples):
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+    at = lambda percentile: round(ordered[min(len(ordered) - 1, max(0, int(round(percentile / 100 * len(ordered))) - 1))] * 1000, 1)
+    return {"count": len(ordered), "p50": at(50), "p95": at(95), "p99": at(99), "max": round(ordered[-1] * 1000, 1)}
+
+
+# resident memory of a process in MB (Linux /proc; None elsewhere)
+def process_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+# user + system CPU seconds of a process (Linux /proc; None elsewhere)
+def process_cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class SimulatedSession:
+    """
+    One browser tab: a websocket to the app that types a product description,
+    clicks Analyze and waits until the results are rendered.
+
+    Every script run is timed from its new_session message to its
+    script_finished message. Runs the app ends with st.rerun() (job polling,
+    which sleeps between polls) are counted but kept out of the rerun latency.
+    """
+
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+        self.rerun_latencies = []
+        self.interaction_latencies = []
+        self.analysis_latencies = []
+        self.script_runs = 0
+        self.failures = []
+        self.degraded = 0
+        self.query_string = ""
+        self.page_script_hash = ""
+        self._widgets = {}
+        self._texts = []
+        self._final_texts = []
+        self._run_started = None
+        self._settled = asyncio.Event()
+
+    async def _read(self):
+        async for frame in self.ws:
+            msg = ForwardMsg()
+            msg.ParseFromString(frame)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self._run_started = time.perf_counter()
+                self.page_script_hash = msg.new_session.page_script_hash
+                self._widgets, self._texts = {}, []
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in ("button", "text_area"):
+                    widget = getattr(element, element_type)
+                    self._widgets[widget.label] = widget.id
+                elif element_type == "markdown":
+                    self._texts.append(element.markdown.body)
+                elif element_type == "alert":
+                    self._texts.append(element.alert.body)
+            elif kind == "page_info_changed":
+                self.query_string = msg.page_info_changed.query_string
+            elif kind == "script_finished" and self._run_started is not None:
+                self.script_runs += 1
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    self.rerun_latencies.append(time.perf_counter() - self._run_started)
+                    self._final_texts = list(self._texts)
+                    self._settled.set()
+
+    async def rerun(self, widget_states, timeout):
+        """Sends widget values, as the browser does on interaction; returns seconds until the page settled."""
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = self.query_string
+        state.page_script_hash = self.page_script_hash
+        for widget_id, field, value in widget_states:
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            setattr(widget, field, value)
+
+        self._settled.clear()
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._settled.wait(), timeout)
+        return time.perf_counter() - started
+
+    async def think(self, mean):
+        await asyncio.sleep(random.uniform(0.5 * mean, 1.5 * mean))
+
+    async def run(self, iterations, think, timeout, repeat_inputs):
+        async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None, open_timeout=30) as self.ws:
+            reader = asyncio.create_task(self._read())
+            try:
+                self.interaction_latencies.append(await self.rerun([], timeout))
+                for iteration in range(iterations):
+                    product = SAMPLE_INPUTS[(self.index + iteration) % len(SAMPLE_INPUTS)]
+                    if not repeat_inputs:
+                        product = f"{product}, request {self.index}-{iteration}"
+
+                    # Type the description (the browser reruns when the text area loses focus)
+                    await self.think(think)
+                    text_area = (self._widgets[TEXT_AREA_LABEL], "string_value", product)
+                    self.interaction_latencies.append(await self.rerun([text_area], timeout))
+
+                    # Click Analyze and wait for the results to render
+                    await self.think(think)
+                    try:
+                        elapsed = await self.rerun([text_area, (self._widgets[ANALYZE_LABEL], "trigger_value", True)], timeout)
+                    except asyncio.TimeoutError:
+                        self.failures.append(f"no result within {timeout:.0f}s")
+                        continue
+                    if any("Analysis Results" in text for text in self._final_texts):
+                        self.analysis_latencies.append(elapsed)
+                        self.degraded += any("Partial results" in text for text in self._final_texts)
+                    else:
+                        self.failures.append(next((text for text in self._final_texts if "Failed" in text), "results not rendered"))
+            except Exception as e:
+                self.failures.append(f"session error: {type(e).__name__}: {e}")
+            finally:
+                reader.cancel()
+
+
+# start the stubbed app on a free port and wait until it is healthy
+def start_server(workdir, log):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    env = dict(os.environ)
+    for name in ("ANALYSIS_API_URL", "FX_RATES_URL"):
+        env.pop(name, None)
+    env.update({
+        "LOAD_TEST_LLM_LATENCY": args.llm_latency,
+        "LOAD_TEST_SEARCH_LATENCY": args.search_latency,
+        "JOB_WORKERS": str(args.job_workers),
+        "JOB_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "RATE_LIMIT_DB_PATH": os.path.join(workdir, "rate_limits.sqlite3"),
+        "CATALOG_PATH": os.path.join(workdir, "catalog.jsonl"),
+        "FX_RATES_PATH": os.path.join(workdir, "fx_rates.json"),
+        "ALERT_LOG_PATH": os.path.join(workdir, "alerts.jsonl"),
+        # Measure the host, not the SerpAPI budget or near-duplicate reuse prompts
+        "RATE_LIMIT_SERPAPI_PER_MINUTE": "1000000",
+        "RATE_LIMIT_SERPAPI_BURST": "1000000",
+        "QUOTA_SERPAPI_PER_DAY": "1000000000",
+        "NEAR_DUPLICATE_THRESHOLD": "1.01",
+    })
+    command = [
+        sys.executable, "-m", "streamlit", "run", ENTRY_SCRIPT,
+        "--server.headless", "true", "--server.address", "127.0.0.1", "--server.port", str(port),
+        "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false", "--logger.level", "error",
+    ]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {server.returncode}; rerun with --server-log to see why")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server, f"ws://127.0.0.1:{port}/_stcore/stream"
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("streamlit did not become healthy within 60s")
+
+
+# sample the app's resident memory until stopped, keeping the peak
+async def track_peak_rss(pid, peak, stop):
+    while not stop.is_set():
+        rss = process_rss_mb(pid)
+        if rss is not None:
+            peak[0] = max(peak[0], rss)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def load_test(server, url):
+    # One analysis first, so imports, model loading and cache warm-up are not billed to the sessions
+    warmup = SimulatedSession(-1, url)
+    await warmup.run(1, 0.0, args.timeout, False)
+    if warmup.failures:
+        raise RuntimeError(f"warm-up analysis failed: {warmup.failures[0]}")
+
+    baseline_rss = process_rss_mb(server.pid)
+    baseline_cpu = process_cpu_seconds(server.pid)
+    peak, stop = [baseline_rss or 0.0], asyncio.Event()
+    tracker = asyncio.create_task(track_peak_rss(server.pid, peak, stop))
+
+    sessions = [SimulatedSession(index, url) for index in range(args.sessions)]
+
+    async def start(session):
+        await asyncio.sleep(session.index * args.ramp / max(args.sessions, 1))
+        await session.run(args.iterations, args.think, args.timeout, args.repeat_inputs)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(start(session) for session in sessions))
+    duration = time.perf_counter() - started
+
+    end_rss = process_rss_mb(server.pid)
+    end_cpu = process_cpu_seconds(server.pid)
+    stop.set()
+    await tracker
+
+    collect = lambda name: [value for session in sessions for value in getattr(session, name)]
+    script_runs = sum(session.script_runs for session in sessions)
+    completed = len(collect("analysis_latencies"))
+    failures = collect("failures")
+    cpu_seconds = end_cpu - baseline_cpu if end_cpu is not None and baseline_cpu is not None else None
+    return {
+        "duration_s": round(duration, 2),
+        "analyses": {"completed": completed, "failed": len(failures), "degraded": sum(session.degraded for session in sessions)},
+        "throughput": {
+            "analyses_per_minute": round(completed / duration * 60, 2),
+            "script_runs_per_second": round(script_runs / duration, 2),
+        },
+        "latency_ms": {
+            "rerun": latency_summary(collect("rerun_latencies")),
+            "interaction": latency_summary(collect("interaction_latencies")),
+            "analysis": latency_summary(collect("analysis_latencies")),
+        },
+        "memory_mb": {
+            "baseline_rss": round(baseline_rss, 1) if baseline_rss is not None else None,
+            "peak_rss": round(peak[0], 1) if baseline_rss is not None else None,
+            "per_session": round((end_rss - baseline_rss) / args.sessions, 2) if end_rss is not None and baseline_rss is not None else None,
+        },
+        "cpu": {
+            "seconds": round(cpu_seconds, 2) if cpu_seconds is not None else None,
+            "per_script_run_ms": round(cpu_seconds / script_runs * 1000, 2) if cpu_seconds is not None and script_runs else None,
+            "utilization": round(cpu_seconds / duration, 3) if cpu_seconds is not None else None,
+        },
+        "script_runs": script_runs,
+        "failure_samples": sorted(set(failures))[:5],
+    }
+
+
+# flatten nested report values into dotted keys
+def flatten(values, prefix=""):
+    flat = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+# print the report's metrics, next to a baseline report's when given
+def print_report(report, baseline=None):
+    current = flatten(report["results"])
+    previous = flatten(baseline["results"]) if baseline else {}
+    print(f"\n{'metric':<40}{'value':>12}" + (f"{'baseline':>12}{'change':>10}" if baseline else ""))
+    for key, value in current.items():
+        line = f"{key:<40}{value:>12}"
+        if baseline:
+            old = previous.get(key)
+            change = f"{(value - old) / old:+.1%}" if old not in (None, 0) and value is not None else ""
+            line += f"{old if old is not None else '-':>12}{change:>10}"
+        print(line)
+    for failure in report["results"]["failure_samples"]:
+        print(f"  ⚠️ {failure}")
+
+
+# run the load test and report; exits 1 when any analysis failed
+def main():
+    global args
+    args = parser.parse_args()
+    for spec in (args.llm_latency, args.search_latency):
+        parse_latency_spec(spec)
+    if not os.path.exists(os.path.join(ROOT, "models", "logistic_predictor.joblib")):
+        sys.exit("❌ models/logistic_predictor.joblib not found; run train_predictor_model.py first")
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as workdir:
+        log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+        server, url = start_server(workdir, log)
+        try:
+            results = asyncio.run(load_test(server, url))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            if args.server_log:
+                log.close()
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        revision = None
+
+    import streamlit
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "server_log")},
+        "environment": {
+            "git_revision": revision,
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+            output.write("\n")
+        print(f"\n✅ Report written to {args.output}")
+
+    if results["analyses"]["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
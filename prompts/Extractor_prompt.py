@@ -1,62 +1,22 @@
+from schemas.product_schema import ProductSchema
+import json
 
-extract_prompt_template="""
-You are the Product Extraction Agent. Your job is to read the user's input and extract structured product information.
+# The schema is embedded as minified JSON (braces escaped for PromptTemplate)
+_schema_json = json.dumps(ProductSchema, separators=(",", ":")).replace("{", "{{").replace("}", "}}")
 
-Your output MUST ALWAYS be a single valid JSON object that strictly follows the schema below:
+extract_prompt_template = """You are the Product Extraction Agent. Read the user's input and extract structured product information.
 
-{{
-  "product_name": null,
-  "brand": null,
-  "model": null,
-  "category": null,
+Your output MUST be a single valid JSON object with exactly this schema:
+""" + _schema_json + """
 
-  "attributes": {{
-    "color": null,
-    "size": null,
-    "material": null,
-    "storage": null,
-    "ram": null,
-    "specs": [],
-    "features": []
-  }},
-
-  "condition": null,
-  "market_region": null,
-  "currency" : null,
-  "additional_context": null,
-
-  "search_keywords": [],
-  "input_confidence": null
-}}
-
--------------------
 INSTRUCTIONS:
--------------------
-
 1. Extract ONLY factual information from the user's input.
 2. If information is missing, unavailable, or not inferable, set it to null.
-3. Infer details **only when the confidence is high**.
-   - Example: If user says "iPhone 13" → you may infer brand = "Apple"
-4. Use the product_name + brand + model to generate useful search keywords.
-   - Example: ["oneplus nord", "oneplus nord smartphone"]
-5. Keep categories simple (e.g., "smartphone", "laptop", "watch", "appliance").
-6. Do NOT add fields that are not present in the schema.
-7. Do NOT change the field names.
-8. DO NOT return explanations.
-9. Return ONLY the JSON.
+3. Infer details only when confidence is high (e.g. "iPhone 13" -> brand "Apple").
+4. Use product_name + brand + model to generate useful search keywords (e.g. ["oneplus nord", "oneplus nord smartphone"]).
+5. Keep categories simple (e.g. "smartphone", "laptop", "watch", "appliance").
+6. Do NOT add, remove or rename fields.
+7. Return ONLY the JSON, no explanations. {format_instructions}
 
--------------------
-JSON VALIDATION:
--------------------
-
-Before replying, run the output through:
-{format_instructions}
-
-This ensures the final result is guaranteed to be valid JSON.
-
--------------------
 USER INPUT:
--------------------
-{input_text}
-
-Produce the final JSON now."""
\ No newline at end of file
+{input_text}"""
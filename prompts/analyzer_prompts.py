@@ -1,35 +1,15 @@
 
-system_prompt_template = """
-You are a product market analyst.
+system_prompt_template = """You are a product market analyst. Summarize already-analyzed market data. Follow all rules strictly and do not add new information."""
 
-Your job is to summarize already-analyzed market data.
-Follow all rules strictly and do not add new information.
-"""
-
-
-summarize_prompt_template = """
-You are given analyzed market data for a product.
 
-Your task is to generate a concise summary using the following structure:
+summarize_prompt_template = """Summarize the analyzed market data below.
 
-1. Headline
-- A single sentence stating whether this is a good time to buy or wait.
+1. headline: one sentence stating whether this is a good time to buy or wait.
+2. key_points: 3 to 5 short points, each directly supported by the data (pricing position, market stability, seller competition, risks).
+3. short_explanation: 2 to 4 sentences explaining the headline, in clear, neutral, professional language; no percentages unless present in the data.
 
-2. Key Points
-- 3 to 5 short bullet points
-- Each point must be directly supported by the provided data
-- Focus on pricing position, market stability, seller competition, and risks
-
-3. Short Explanation
-- 2 to 4 sentences explaining why the headline conclusion was reached
-- Do not mention percentages unless explicitly present in the data
-- Use clear, neutral, professional language
-
-Rules:
-- Do NOT introduce new insights
-- Do NOT contradict the buy decision
-- Do NOT speculate about future prices
+Rules: do NOT introduce new insights, contradict the buy decision, or speculate about future prices.
 
 Analyzed data:
 {analysis_data}
-"""
\ No newline at end of file
+"""
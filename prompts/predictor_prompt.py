@@ -1,3 +1,14 @@
+from services.llm_logic.prompt_assembly import estimate_tokens, fit_lines, record_prompt
+
+
+# Static instructions, sized once at import
+PREDICTOR_INSTRUCTIONS = """You are an expert product analyst. An ML model made a BUY/WAIT prediction from the market data below.
+Give 3-5 clear, concise bullet points starting with '-' explaining why the decision makes sense (or doesn't), covering price position and value, market stability and risk, competition and supply, and timing. Be specific and actionable.
+
+"""
+PREDICTOR_INSTRUCTIONS_TOKENS = estimate_tokens(PREDICTOR_INSTRUCTIONS)
+
+
 def generate_predictor_prompt(ml_decision: str, confidence: float, analyzer_output: dict) -> str:
     """
     Generates a prompt for the LLM to explain the ML prediction.
@@ -15,32 +26,23 @@ def generate_predictor_prompt(ml_decision: str, confidence: float, analyzer_outp
     market_analysis = getattr(analyzer_output, "market_analysis", None)
     buy_decision = getattr(analyzer_output, "buy_decision", None)
     
-    prompt = f"""You are an expert product analyst. The ML model has made a prediction. Provide clear, actionable reasoning.
-
-        **ML PREDICTION:**
-        - Decision: {ml_decision}
-        - Confidence: {confidence:.1%}
-
-        **MARKET DATA:**
-        - Current Price Position: {price_eval.price_position if price_eval else 'N/A'}
-        - Price Gap: {price_eval.price_gap_percent if price_eval else 0:.1f}%
-        - Price Volatility: {price_eval.price_volatility if price_eval else 'N/A'}
-        - Seller Count: {market_analysis.seller_count if market_analysis else 0}
-        - Competition Level: {market_analysis.competition_level if market_analysis else 'N/A'}
-        - Price Spread: {market_analysis.price_spread_percent if market_analysis else 0:.1f}%
-
-        **ANALYZER RECOMMENDATION:**
-        - Action: {buy_decision.action if buy_decision else 'N/A'}
-        - Urgency: {buy_decision.urgency if buy_decision else 'N/A'}
-        - Rule Triggered: {buy_decision.rule_triggered if buy_decision else 'N/A'}
-
-        **TASK:**
-        Provide 3-5 clear, concise bullet points explaining why the {ml_decision} decision makes sense (or doesn't). Consider:
-        1. Price positioning and value
-        2. Market stability and risk factors
-        3. Competition and supply dynamics
-        4. Timing and urgency considerations
-
-        Format as bullet points starting with '-'. Be specific and actionable."""
+    # One "key: value" line per fact, most important first so budget trimming drops the least useful
+    lines = [
+        f"ml_decision: {ml_decision}",
+        f"ml_confidence: {confidence:.1%}",
+        f"price_position: {price_eval.price_position if price_eval else 'N/A'}",
+        f"price_gap_percent: {price_eval.price_gap_percent if price_eval else 0:.1f}",
+        f"price_volatility: {price_eval.price_volatility if price_eval else 'N/A'}",
+        f"analyzer_action: {buy_decision.action if buy_decision else 'N/A'}",
+        f"analyzer_urgency: {buy_decision.urgency if buy_decision else 'N/A'}",
+        f"seller_count: {market_analysis.seller_count if market_analysis else 0}",
+        f"competition_level: {market_analysis.competition_level if market_analysis else 'N/A'}",
+        f"price_spread_percent: {market_analysis.price_spread_percent if market_analysis else 0:.1f}",
+        f"rule_triggered: {buy_decision.rule_triggered if buy_decision else 'N/A'}",
+    ]
+    data = fit_lines("predictor", PREDICTOR_INSTRUCTIONS_TOKENS, lines)
+    
+    prompt = PREDICTOR_INSTRUCTIONS + data
+    record_prompt("predictor", prompt, trimmed=data.count("\n") + 1 < len(lines))
             
-    return prompt
\ No newline at end of file
+    return prompt
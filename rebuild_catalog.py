@@ -0,0 +1,32 @@
+from services.catalog_logic.catalog_index import CATALOG_PATH, CatalogIndex
+from services.job_logic.job_store import SQLiteJobStore
+from services.config_logic.settings import get_settings
+import argparse
+import os
+
+parser = argparse.ArgumentParser(description="Rebuild the product catalog index from stored analyses and bulk-load catalog files.")
+parser.add_argument("--jobs-db", default=get_settings().job_db_path, help="SQLite job store holding stored analyses")
+parser.add_argument("--load", nargs="*", default=[], help="JSONL files of catalog entries or product info to bulk-load first")
+parser.add_argument("--output", default=CATALOG_PATH, help="Catalog file to write")
+
+
+# rebuild the catalog file from scratch
+def main():
+    args = parser.parse_args()
+
+    # Start from an empty file so the rebuilt catalog has no stale entries
+    if os.path.exists(args.output):
+        os.remove(args.output)
+    catalog = CatalogIndex(path=args.output)
+
+    for path in args.load:
+        print(f"Loaded {catalog.load_jsonl(path, persist=True)} entries from {path}")
+
+    if os.path.exists(args.jobs_db):
+        print(f"Indexed {catalog.rebuild_from_jobs(SQLiteJobStore(args.jobs_db))} products from {args.jobs_db}")
+
+    print(f"✅ Catalog rebuilt with {len(catalog)} entries in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
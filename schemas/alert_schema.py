@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional
+
+
+# Analyzer fields a "changes_to" rule can watch
+CATEGORICAL_FIELDS = ("price_position", "price_volatility", "action")
+
+
+# A user-defined alert condition
+class AlertRule(BaseModel):
+    rule_id: Optional[str] = Field(default=None, description="Identifier assigned when the rule is added.")
+    name: Optional[str] = Field(default=None, description="Human-readable label used in alert messages.")
+    product_id: Optional[str] = Field(default=None, description="Catalog product ID the rule applies to; all products when omitted.")
+    kind: Literal["window_low", "gap_below", "price_below", "below_ewma", "changes_to"] = Field(
+        description="window_low: current price below its low over window_days; gap_below: price_gap_percent at or below threshold; "
+                    "price_below: current price at or below threshold; below_ewma: current price at least threshold percent under its EWMA; "
+                    "changes_to: field (price_position, price_volatility or action) changes to value."
+    )
+    threshold: Optional[float] = Field(default=None, description="Numeric threshold for gap_below, price_below and below_ewma.")
+    field: Optional[Literal["price_position", "price_volatility", "action"]] = Field(default=None, description="Analyzer field watched by changes_to.")
+    value: Optional[str] = Field(default=None, description="Value that triggers changes_to, compared case-insensitively.")
+    window_days: float = Field(default=30.0, gt=0, description="Look-back window of window_low.")
+
+    @model_validator(mode="after")
+    def _check_arguments(self):
+        if self.kind in ("gap_below", "price_below", "below_ewma") and self.threshold is None:
+            raise ValueError(f"{self.kind} rules need a threshold")
+        if self.kind == "changes_to" and (self.field is None or not self.value):
+            raise ValueError("changes_to rules need a field and a value")
+        return self
+
+
+# An alert raised by a rule for one observation
+class Alert(BaseModel):
+    alert_id: str = Field(description="Unique identifier of the alert.")
+    rule_id: str = Field(description="Rule that fired.")
+    kind: str = Field(description="Kind of the rule that fired.")
+    product_id: str = Field(description="Catalog product ID the observation belongs to.")
+    product_name: Optional[str] = Field(default=None, description="Product name of the observation.")
+    message: str = Field(description="Human-readable description of what happened.")
+    current_price: Optional[float] = Field(default=None, description="Current price at the time of the alert.")
+    currency: Optional[str] = Field(default=None, description="Currency of current_price.")
+    triggered_at: str = Field(description="UTC time the alert fired, ISO 8601.")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional
 
 
 # Detailed price evaluation of the product
@@ -36,6 +36,8 @@ class MarketAnalysis(BaseModel):
     competition_level: str = Field(description="Level of competition among sellers: low, moderate, high.")
     pricing_health: str = Field(description="Health of pricing in the market: stable, moderate_variation, fragmented.")
     price_spread_percent: float = Field(description="Percentage spread between highest and lowest prices.")
+    price_percentiles: Optional[Dict[str, float]] = Field(default=None, description="Offer price percentiles (p10, p25, p50, p75, p90).")
+    current_price_percentile: Optional[float] = Field(default=None, description="Share of offers (0-100) priced at or below the current price.")
 
     
 # Market signals derived from the analysis  
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+# Prices found in one market region, in local and base currency
+class RegionPrices(BaseModel):
+    market_region: str = Field(description="Google country code of the market searched.")
+    currency: str = Field(description="Local currency of the region's prices.")
+    fx_rate: Optional[float] = Field(default=None, description="Units of the base currency per unit of the local currency.")
+    seller_count: int = Field(default=0, description="Number of offers with a valid price.")
+    lowest_price: Optional[float] = Field(default=None, description="Lowest offer in local currency.")
+    average_price: Optional[float] = Field(default=None, description="Average offer in local currency.")
+    highest_price: Optional[float] = Field(default=None, description="Highest offer in local currency.")
+    lowest_price_base: Optional[float] = Field(default=None, description="Lowest offer in the base currency.")
+    average_price_base: Optional[float] = Field(default=None, description="Average offer in the base currency.")
+    highest_price_base: Optional[float] = Field(default=None, description="Highest offer in the base currency.")
+    latency_seconds: float = Field(default=0.0, description="Time taken by the region's search.")
+    error: Optional[str] = Field(default=None, description="Why the region has no prices, if it failed.")
+
+
+# One offer in the cross-region ranking
+class RankedOffer(BaseModel):
+    rank: int = Field(description="Position in the ranking, 1 being the cheapest.")
+    market_region: str = Field(description="Region the offer was found in.")
+    seller: Optional[str] = Field(default=None, description="Seller or retailer.")
+    price: float = Field(description="Offer price in local currency.")
+    currency: str = Field(description="Local currency of the offer.")
+    price_base: float = Field(description="Offer price in the base currency.")
+
+
+# Overall multi-region comparison
+class RegionComparison(BaseModel):
+    product_id: Optional[str] = Field(default=None, description="Canonical catalog ID of the product compared.")
+    query: str = Field(description="Search query used in every region.")
+    base_currency: str = Field(description="Currency all prices were normalized to.")
+    fx_source: str = Field(description="Where the FX rates came from: defaults, cache or remote.")
+    regions: List[RegionPrices] = Field(description="Per-region price matrix.")
+    ranking: List[RankedOffer] = Field(description="Offers from all regions, cheapest first in the base currency.")
+    price_percentiles_base: Dict[str, float] = Field(default_factory=dict, description="Percentiles (p10-p90) of the offers of all regions in the base currency.")
+    price_sketch: Optional[dict] = Field(default=None, description="Quantile sketch (PriceSketch.to_dict()) of the offers of all regions in the base currency.")
+    total_seconds: float = Field(description="Wall time of the comparison, bounded by the slowest region.")
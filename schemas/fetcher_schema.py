@@ -1,5 +1,11 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+from pydantic.json_schema import SkipJsonSchema
+from services.config_logic.settings import get_settings
+from services.fetcher_logic.offer_table import OfferTable
+from typing import Dict, Optional, List
+
+# Offers (and sellers) serialized per fetch; price_sketch summarizes the rest
+PRICE_DISTRIBUTION_MAX_OFFERS = get_settings().price_distribution_max_offers
 
 class PriceDistribution(BaseModel):
     seller: Optional[str] = Field(description = "The name of the seller or retailer.")
@@ -7,6 +13,9 @@ class PriceDistribution(BaseModel):
 
 
 class FetcherOutput(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    product_id: Optional[str] = None
     product_name: str
     brand: Optional[str] = None
     model: Optional[str] = None
@@ -19,5 +28,41 @@ class FetcherOutput(BaseModel):
     highest_price: Optional[float] = None
     average_price: Optional[float] = None
     seller_count: Optional[int] = 0
-    price_distribution: List[PriceDistribution]
-    trend_signals: Optional[dict] = None
\ No newline at end of file
+    # Offers stay columnar inside the pipeline; price_distribution is built from them on serialization,
+    # capped at PRICE_DISTRIBUTION_MAX_OFFERS (a FetcherOutput read back holds only the serialized offers)
+    offers: SkipJsonSchema[OfferTable] = Field(default_factory=OfferTable, exclude=True, repr=False)
+    trend_signals: Optional[dict] = None
+    # Offer source name -> {"offers", "latency_seconds", "error"} for the sources queried
+    sources: Optional[Dict[str, dict]] = None
+    # The price fields above leave out outlier offers; these are the same stats over every offer
+    raw_price_stats: Optional[dict] = None
+    # True when the first offer was an outlier and current_price is the first kept offer instead
+    current_price_replaced: bool = False
+    # Offers left out of the price stats and offers as outliers (e.g. accessories in a phone search)
+    outliers: List[PriceDistribution] = Field(default_factory=list)
+    # PriceSketch.to_dict() of the offer prices: percentiles and histograms without the full offer list
+    price_sketch: Optional[dict] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _offers_from_distribution(cls, data):
+        # Accept the serialized form (a price_distribution list) as input
+        if isinstance(data, dict) and "price_distribution" in data and "offers" not in data:
+            data = dict(data)
+            data["offers"] = OfferTable.from_records(data.pop("price_distribution") or [])
+        return data
+
+    @computed_field
+    @property
+    def price_distribution(self) -> List[PriceDistribution]:
+        # The first offers, in source order; large offer sets are described by price_sketch
+        limit = PRICE_DISTRIBUTION_MAX_OFFERS
+        sellers = [self.offers.sellers[code] for code in self.offers.seller_codes[:limit].tolist()]
+        prices = self.offers.prices[:limit].tolist()
+        return [PriceDistribution.model_construct(seller=seller, price=price) for seller, price in zip(sellers, prices)]
+
+    @computed_field
+    @property
+    def seller_prices(self) -> Dict[str, float]:
+        # Lowest price of the cheapest sellers, for change detection between refreshes
+        return self.offers.lowest_by_seller(PRICE_DISTRIBUTION_MAX_OFFERS)
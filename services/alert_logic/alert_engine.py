@@ -0,0 +1,350 @@
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from schemas.alert_schema import Alert, AlertRule
+from services.config_logic.settings import get_settings
+from services.alert_logic.alert_sinks import JsonlFileSink, MemorySink, WebhookSink
+from services.fetcher_logic.fx_rates import format_money
+from typing import Any, Dict, List, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+settings = get_settings()
+ALERT_RULES_PATH = settings.alert_rules_path
+ALERT_STATE_PATH = settings.alert_state_path
+ALERT_LOG_PATH = settings.alert_log_path
+ALERT_WEBHOOK_URL = settings.alert_webhook_url
+ALERT_EWMA_ALPHA = settings.alert_ewma_alpha
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+@dataclass
+class Observation:
+    """One refreshed data point of a product, in the analyzer's vocabulary."""
+    product_id: str
+    timestamp: float
+    current_price: Optional[float] = None
+    currency: Optional[str] = None
+    product_name: Optional[str] = None
+    price_gap_percent: Optional[float] = None
+    price_position: Optional[str] = None
+    price_volatility: Optional[str] = None
+    action: Optional[str] = None
+
+
+# build an observation from serialized fetcher and analyzer outputs
+def observation_from_results(product_id: str, fetcher: Dict[str, Any], analyzer: Optional[Dict[str, Any]] = None, timestamp: Optional[float] = None) -> Observation:
+    analyzer = analyzer or {}
+    evaluation = analyzer.get("price_evaluation") or {}
+    decision = analyzer.get("buy_decision") or {}
+    return Observation(
+        product_id=product_id,
+        timestamp=time.time() if timestamp is None else timestamp,
+        current_price=fetcher.get("current_price"),
+        currency=fetcher.get("currency"),
+        product_name=fetcher.get("product_name"),
+        price_gap_percent=evaluation.get("price_gap_percent"),
+        price_position=evaluation.get("price_position"),
+        price_volatility=evaluation.get("price_volatility"),
+        action=decision.get("action"),
+    )
+
+
+class SlidingMin:
+    """Minimum price over a trailing time window; a monotonic deque makes each push amortized O(1)."""
+
+    __slots__ = ("window_seconds", "items")
+
+    def __init__(self, window_seconds: float, items=()):
+        self.window_seconds = window_seconds
+        # (timestamp, price) with strictly increasing prices; the front is the minimum
+        self.items = deque(tuple(item) for item in items)
+
+    def minimum(self, now: float) -> Optional[float]:
+        while self.items and now - self.items[0][0] > self.window_seconds:
+            self.items.popleft()
+        return self.items[0][1] if self.items else None
+
+    def push(self, timestamp: float, price: float) -> None:
+        while self.items and self.items[-1][1] >= price:
+            self.items.pop()
+        self.items.append((timestamp, price))
+
+
+class ProductState:
+    """Incremental state of one product: window minimums, EWMA, last analyzer values and rule conditions."""
+
+    __slots__ = ("windows", "ewma", "fields", "conditions", "observations")
+
+    def __init__(self):
+        self.windows: Dict[float, SlidingMin] = {}
+        self.ewma: Optional[float] = None
+        self.fields: Dict[str, Optional[str]] = {}
+        self.conditions: Dict[str, bool] = {}
+        self.observations = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "windows": {str(days): list(window.items) for days, window in self.windows.items()},
+            "ewma": self.ewma, "fields": self.fields, "conditions": self.conditions, "observations": self.observations,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProductState":
+        state = cls()
+        state.windows = {float(days): SlidingMin(float(days) * DAY_SECONDS, items) for days, items in data.get("windows", {}).items()}
+        state.ewma = data.get("ewma")
+        state.fields = data.get("fields", {})
+        state.conditions = data.get("conditions", {})
+        state.observations = data.get("observations", 0)
+        return state
+
+
+class AlertEngine:
+    """
+    Evaluates alert rules against each new observation of a product.
+
+    Every product keeps incremental state (trailing minimums per rule window,
+    an EWMA of its price, its last price_position / price_volatility / action
+    and the last outcome of each rule), so a rule costs O(1) per observation
+    no matter how much history there is. Rules are indexed by product, plus
+    one list of rules that apply to every product.
+
+    Threshold rules fire when their condition becomes true, not on every
+    observation while it stays true; window_low fires on every new low and
+    changes_to on every transition into its value. Alerts go to every sink.
+
+    Product states are kept in a SQLite file (state_path), one row per
+    product, and each observation rewrites only its product's row.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None, rules_path: Optional[str] = None, state_path: Optional[str] = None, ewma_alpha: float = ALERT_EWMA_ALPHA):
+        self.sinks = list(sinks or [])
+        self.rules_path = rules_path
+        self.state_path = state_path
+        self.ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+        self._rules: Dict[str, AlertRule] = {}
+        self._by_product: Dict[Optional[str], List[AlertRule]] = defaultdict(list)
+        self._window_days: Counter = Counter()
+        self._states: Dict[str, ProductState] = {}
+        self.stats = Counter()
+        self._load()
+
+    def _load(self) -> None:
+        if self.rules_path and os.path.exists(self.rules_path):
+            with open(self.rules_path, "r", encoding="utf-8") as f:
+                for data in json.load(f):
+                    self._index(AlertRule.model_validate(data))
+        if self.state_path:
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS alert_state (product_id TEXT PRIMARY KEY, observations INTEGER NOT NULL, state TEXT NOT NULL)")
+                rows = conn.execute("SELECT product_id, state FROM alert_state").fetchall()
+            self._states = {product_id: ProductState.from_dict(json.loads(state)) for product_id, state in rows}
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.state_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write_json(path: str, data: Any) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    def _index(self, rule: AlertRule) -> None:
+        self._rules[rule.rule_id] = rule
+        self._by_product[rule.product_id].append(rule)
+        if rule.kind == "window_low":
+            self._window_days[rule.window_days] += 1
+
+    def add_rule(self, rule: AlertRule) -> AlertRule:
+        rule = rule.model_copy(update={"rule_id": rule.rule_id or uuid.uuid4().hex})
+        with self._lock:
+            if rule.rule_id in self._rules:
+                raise ValueError(f"Rule {rule.rule_id} already exists")
+            self._index(rule)
+            self._save_rules()
+        return rule
+
+    def remove_rule(self, rule_id: str) -> bool:
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            self._by_product[rule.product_id].remove(rule)
+            if rule.kind == "window_low":
+                self._window_days[rule.window_days] -= 1
+                if not self._window_days[rule.window_days]:
+                    del self._window_days[rule.window_days]
+            for state in self._states.values():
+                state.conditions.pop(rule_id, None)
+            self._save_rules()
+            return True
+
+    def rules(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [rule.model_dump() for rule in self._rules.values()]
+
+    def _save_rules(self) -> None:
+        if self.rules_path:
+            self._write_json(self.rules_path, [rule.model_dump() for rule in self._rules.values()])
+
+    def _save_rows(self, rows: List[tuple]) -> None:
+        # A row only replaces one with fewer observations, so a late write never rolls a product back
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO alert_state (product_id, observations, state) VALUES (?, ?, ?) ON CONFLICT (product_id) DO UPDATE "
+                "SET observations = excluded.observations, state = excluded.state WHERE excluded.observations >= alert_state.observations",
+                rows
+            )
+
+    def save_state(self) -> None:
+        """Writes every product's state (e.g. on shutdown); observe() already saves the products it updates."""
+        if not self.state_path:
+            return
+        with self._lock:
+            rows = [(product_id, state.observations, json.dumps(state.to_dict())) for product_id, state in self._states.items()]
+        self._save_rows(rows)
+
+    def _evaluate(self, rule: AlertRule, state: ProductState, observation: Observation) -> Optional[str]:
+        """Returns the alert message if the rule fires, reading the state from before this observation."""
+        price = observation.current_price
+        label = rule.name or rule.kind
+        product = observation.product_name or observation.product_id
+        money = lambda amount: format_money(amount, observation.currency)
+
+        if rule.kind == "changes_to":
+            previous, current = state.fields.get(rule.field), getattr(observation, rule.field)
+            target = rule.value.lower()
+            if previous is not None and current is not None and previous.lower() != target and current.lower() == target:
+                return f"{label}: {product} {rule.field} changed from {previous} to {current}"
+            return None
+
+        if rule.kind == "window_low":
+            window = state.windows.get(rule.window_days)
+            low = window.minimum(observation.timestamp) if window is not None else None
+            if price is not None and low is not None and price < low:
+                return f"{label}: {product} at {money(price)} is below its {rule.window_days:g}-day low of {money(low)}"
+            return None
+
+        # Threshold rules fire on the transition into the condition
+        if rule.kind == "gap_below":
+            gap = observation.price_gap_percent
+            condition = gap is not None and gap <= rule.threshold
+            message = f"{label}: {product} is {gap}% vs the market average (threshold {rule.threshold:g}%)"
+        elif rule.kind == "price_below":
+            condition = price is not None and price <= rule.threshold
+            message = f"{label}: {product} dropped to {money(price)} (target {money(rule.threshold)})"
+        else:
+            ewma = state.ewma
+            condition = price is not None and ewma is not None and price <= ewma * (1 - rule.threshold / 100)
+            message = f"{label}: {product} at {money(price)} is {rule.threshold:g}%+ below its average trend of {money(ewma)}"
+
+        was_true = state.conditions.get(rule.rule_id, False)
+        state.conditions[rule.rule_id] = condition
+        return message if condition and not was_true else None
+
+    def _update_state(self, state: ProductState, observation: Observation) -> None:
+        price = observation.current_price
+        if price is not None:
+            for days in self._window_days:
+                window = state.windows.get(days)
+                if window is None:
+                    window = state.windows[days] = SlidingMin(days * DAY_SECONDS)
+                window.push(observation.timestamp, price)
+            state.ewma = price if state.ewma is None else self.ewma_alpha * price + (1 - self.ewma_alpha) * state.ewma
+        for name in ("price_position", "price_volatility", "action"):
+            value = getattr(observation, name)
+            if value is not None:
+                state.fields[name] = value
+        state.observations += 1
+
+    def observe(self, observation: Observation) -> List[Alert]:
+        """
+        Evaluates the applicable rules, updates the product's state, delivers
+        any alerts and saves the product's state row, so window minimums and
+        EWMAs survive a crash.
+        """
+        triggered_at = datetime.now(timezone.utc).isoformat()
+        alerts = []
+        with self._lock:
+            state = self._states.get(observation.product_id)
+            if state is None:
+                state = self._states[observation.product_id] = ProductState()
+            rules = self._by_product.get(observation.product_id, []) + self._by_product.get(None, [])
+            for rule in rules:
+                message = self._evaluate(rule, state, observation)
+                if message is not None:
+                    alerts.append(Alert(
+                        alert_id=uuid.uuid4().hex, rule_id=rule.rule_id, kind=rule.kind, product_id=observation.product_id,
+                        product_name=observation.product_name, message=message, current_price=observation.current_price,
+                        currency=observation.currency, triggered_at=triggered_at
+                    ))
+            self._update_state(state, observation)
+            self.stats["observations"] += 1
+            self.stats["evaluations"] += len(rules)
+            self.stats["alerts"] += len(alerts)
+            row = (observation.product_id, state.observations, json.dumps(state.to_dict()))
+
+        for alert in alerts:
+            self._deliver(alert)
+        try:
+            if self.state_path:
+                self._save_rows([row])
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Saving alert state failed: {e}")
+            with self._lock:
+                self.stats["state_save_errors"] += 1
+        return alerts
+
+    def observe_refresh(self, item: Dict[str, Any], fetcher: Dict[str, Any], results: Optional[Dict[str, Any]]) -> List[Alert]:
+        """Watchlist observer: feeds one refresh (with the latest analysis of the item) to the engine."""
+        analyzer = (results or item.get("last_results") or {}).get("analyzer")
+        return self.observe(observation_from_results(item["product_id"], fetcher, analyzer))
+
+    def _deliver(self, alert: Alert) -> None:
+        print(f"🔔 {alert.message}")
+        for sink in self.sinks:
+            try:
+                sink.deliver(alert)
+            except Exception as e:
+                print(f"⚠️ Alert delivery to {type(sink).__name__} failed: {e}")
+                with self._lock:
+                    self.stats["delivery_errors"] += 1
+
+    def recent_alerts(self, limit: int = 50) -> List[Dict[str, Any]]:
+        for sink in self.sinks:
+            if isinstance(sink, MemorySink):
+                return sink.recent(limit)
+        return []
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"rules": len(self._rules), "products": len(self._states), **self.stats}
+
+
+# alert engine with the sinks and files configured in the environment
+def create_alert_engine() -> AlertEngine:
+    sinks = [JsonlFileSink(ALERT_LOG_PATH), MemorySink()]
+    if ALERT_WEBHOOK_URL:
+        sinks.append(WebhookSink(ALERT_WEBHOOK_URL))
+    return AlertEngine(sinks=sinks, rules_path=ALERT_RULES_PATH, state_path=ALERT_STATE_PATH)
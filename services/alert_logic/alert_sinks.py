@@ -0,0 +1,83 @@
+from collections import deque
+from schemas.alert_schema import Alert
+from services.metrics_logic.registry import EXTERNAL_CALL_LATENCY, timed
+from typing import Any, Dict, List
+import json
+import os
+import threading
+import requests
+
+
+class JsonlFileSink:
+    """Appends alerts to a JSON lines file, which the Streamlit app reads back."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def deliver(self, alert: Alert) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(alert.model_dump_json() + "\n")
+
+
+class WebhookSink:
+    """POSTs each alert as JSON to a URL (a local receiver or chat webhook)."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, alert: Alert) -> None:
+        with timed(EXTERNAL_CALL_LATENCY, "alert_webhook"):
+            response = requests.post(self.url, json=alert.model_dump(mode="json"), timeout=self.timeout)
+        response.raise_for_status()
+
+
+class MemorySink:
+    """Keeps the most recent alerts in memory, for the API."""
+
+    def __init__(self, max_alerts: int = 500):
+        self._alerts = deque(maxlen=max_alerts)
+        self._lock = threading.Lock()
+
+    def deliver(self, alert: Alert) -> None:
+        with self._lock:
+            self._alerts.append(alert.model_dump(mode="json"))
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._alerts)[-limit:][::-1]
+
+
+# newest alerts from a JSON lines alert log, newest first
+def read_recent_alerts(path: str, limit: int = 20, block_size: int = 8192) -> List[Dict[str, Any]]:
+    """
+    Reads the log backwards from its end in blocks until limit complete lines
+    are in hand, so the cost follows limit, not the size of the log.
+    """
+    if limit <= 0 or not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b""
+        # One extra newline: the first line in the buffer may be cut off
+        while position > 0 and tail.count(b"\n") <= limit:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+    lines = tail.splitlines()
+    if position > 0:
+        lines = lines[1:]
+    alerts = []
+    for line in reversed(lines):
+        if len(alerts) >= limit:
+            break
+        try:
+            alerts.append(json.loads(line))
+        except ValueError:
+            continue
+    return alerts
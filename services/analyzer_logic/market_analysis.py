@@ -1,7 +1,9 @@
 from schemas.analysis_schema import MarketAnalysis
+from services.fetcher_logic.price_sketch import PriceSketch
+from typing import Optional
 
 # generate market analysis
-def generate_market_analysis(seller_count: int, lowest_price: float, highest_price: float, average_price: float) -> MarketAnalysis:
+def generate_market_analysis(seller_count: int, lowest_price: float, highest_price: float, average_price: float, price_sketch: Optional[PriceSketch] = None, current_price: Optional[float] = None) -> MarketAnalysis:
         if not all([seller_count, lowest_price, highest_price, average_price]):
             return {"market_status": "insufficient_data"}
 
@@ -26,4 +28,6 @@ def generate_market_analysis(seller_count: int, lowest_price: float, highest_pri
             competition_level = competition,
             pricing_health = pricing_health,
             price_spread_percent = spread_percent,
+            price_percentiles = price_sketch.percentiles() if price_sketch is not None and len(price_sketch) else None,
+            current_price_percentile = round(price_sketch.cdf(current_price) * 100, 1) if price_sketch is not None and len(price_sketch) and current_price else None,
         )
\ No newline at end of file
@@ -0,0 +1,63 @@
+from services.analyzer_logic.confidence import compute_confidence_score
+from services.analyzer_logic.price_analysis import get_price_evaluation
+from services.analyzer_logic.market_analysis import generate_market_analysis
+from services.analyzer_logic.risk_analysis import generate_risks_and_warnings
+from services.analyzer_logic.signals import generate_signals
+from services.analyzer_logic.buy_decision import get_buy_decision_info
+from services.analyzer_logic.offer_selection import select_best_offer
+from services.analyzer_logic.data_completeness import get_data_completeness_ratio
+from services.fetcher_logic.price_sketch import PriceSketch
+from schemas.fetcher_schema import FetcherOutput
+from typing import Any, Dict
+
+
+# rule-based part of the analysis: everything except the LLM summary
+def assess_market(fetched_product_info: FetcherOutput) -> Dict[str, Any]:
+    """
+    Computes the price evaluation, buy decision, best offer, market analysis,
+    risks, signals and confidence score from fetched market data.
+
+    Pure and deterministic, so batch runs can execute it in a worker process.
+    """
+    current_price = fetched_product_info.current_price
+    average_price = fetched_product_info.average_price
+    lowest_price = fetched_product_info.lowest_price
+    highest_price = fetched_product_info.highest_price
+    seller_count = fetched_product_info.seller_count
+    offers = fetched_product_info.offers
+    # Fetcher outputs built before sketches existed (e.g. cached or stored ones) get one from their offers
+    price_sketch = PriceSketch.from_dict(fetched_product_info.price_sketch) or PriceSketch.from_prices(offers.prices)
+
+    # Get price evaluation
+    price_evaluation = get_price_evaluation(current_price, average_price, lowest_price, highest_price, seller_count)
+
+    # Get buy decision
+    buy_decision = get_buy_decision_info(price_position=price_evaluation.price_position, price_gap_percent=price_evaluation.price_gap_percent, price_volatility=price_evaluation.price_volatility, seller_count=seller_count)
+
+    # Select best offer
+    best_offer = select_best_offer(offers, average_price)
+
+    # Generate market analysis
+    market_analysis = generate_market_analysis(seller_count, lowest_price, highest_price, average_price, price_sketch, current_price)
+
+    # Generate risks and warnings
+    risks_and_warnings = generate_risks_and_warnings(seller_count, price_evaluation.price_volatility, current_price, average_price)
+
+    # Generate market signals
+    signals = generate_signals(price_evaluation.price_position, price_evaluation.price_volatility, seller_count)
+
+    # get data completeness ratio for calculating confidence score
+    data_completeness_ratio = get_data_completeness_ratio(current_price, average_price, lowest_price, highest_price, seller_count)
+
+    # Compute confidence score
+    confidence_score = compute_confidence_score(seller_count, price_evaluation.price_position, price_evaluation.price_volatility, data_completeness_ratio)
+
+    return {
+        "price_evaluation": price_evaluation,
+        "buy_decision": buy_decision,
+        "best_offer": best_offer,
+        "market_analysis": market_analysis,
+        "risks_and_warnings": risks_and_warnings,
+        "signals": signals,
+        "confidence_score": confidence_score
+    }
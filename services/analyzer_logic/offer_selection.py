@@ -1,4 +1,6 @@
 from schemas.analysis_schema import BestOffer
+from services.fetcher_logic.offer_table import OfferTable
+import numpy as np
 
 
 # Source rank score evaluation helper
@@ -39,49 +41,49 @@ def compute_seller_confidence(seller: str, rating=None, reviews=None) -> float:
     return min(score, 1.0)
 
 
-# Select best offer from price distribution
-def select_best_offer(price_distribution: list, average_price: float) -> BestOffer:
-    best_offer = None
-    best_score = -1
-
-    prices = [p.price for p in price_distribution if p.price]
-    lowest_price = min(prices) if prices else None
-
-    for index, item in enumerate(price_distribution, start=1):
-        price = item.price
-        seller = item.seller
-
-        if not price or not seller:
-            continue
-
-        # Filter overpriced offers
-        if average_price and price > average_price * 1.3:
-            continue
-
-        price_score = compute_price_score(price, lowest_price, average_price)
-        seller_confidence = compute_seller_confidence(seller)
-        rank_score = compute_rank_score(index)
+# Select best offer from the columnar offer table
+def select_best_offer(offers: OfferTable, average_price: float) -> BestOffer:
+    """
+    Scores every offer at once with the same weights as before:
+    0.45 * price score + 0.35 * seller confidence + 0.20 * rank score,
+    skipping offers without a price or seller and offers more than 30%
+    above the average. The first offer wins ties.
+    """
+    if not isinstance(offers, OfferTable):
+        offers = OfferTable.from_records(offers)
+
+    prices = offers.prices
+    sellers = offers.sellers
+    ranks = np.arange(1, len(offers) + 1)
+    priced = prices > 0
+    lowest_price = prices[priced].min() if priced.any() else None
+
+    eligible = priced & np.array([bool(sellers[code]) for code in offers.seller_codes.tolist()], dtype=bool)
+    if average_price:
+        eligible &= prices <= average_price * 1.3
+    if not eligible.any():
+        raise ValueError("No eligible offers to select the best offer from.")
+
+    # Same piecewise score as compute_price_score
+    if average_price is not None and average_price > lowest_price:
+        scaled = np.round(1 - ((prices - lowest_price) / (average_price - lowest_price)) * 0.5, 3)
+    else:
+        scaled = np.full(len(offers), 0.5)
+    price_scores = np.where(prices <= lowest_price, 1.0, np.where(prices >= (average_price or 0), 0.5, scaled))
 
-        final_score = (
-            0.45 * price_score +
-            0.35 * seller_confidence +
-            0.20 * rank_score
-        )
+    # Seller confidence once per distinct seller
+    confidence_by_seller = np.array([compute_seller_confidence(seller) if seller else 0.0 for seller in sellers])
+    seller_confidence = confidence_by_seller[offers.seller_codes]
+    rank_scores = np.maximum(1 - (ranks - 1) * 0.1, 0.2)
 
-        if final_score > best_score:
-            best_score = final_score
-            best_offer = {
-                "seller": seller,
-                "price": price,
-                "condition": "refurbished" if "refurb" in seller.lower() else "unknown",
-                "seller_confidence": round(seller_confidence, 2),
-                "source_rank": index
-            }
+    final_scores = 0.45 * price_scores + 0.35 * seller_confidence + 0.20 * rank_scores
+    best = int(np.argmax(np.where(eligible, final_scores, -np.inf)))
+    seller = sellers[offers.seller_codes[best]]
 
     return BestOffer(
-        seller=best_offer["seller"],
-        price=best_offer["price"],
-        condition=best_offer["condition"],
-        seller_confidence=best_offer["seller_confidence"],
-        source_rank=best_offer["source_rank"]
+        seller=seller,
+        price=float(prices[best]),
+        condition="refurbished" if "refurb" in seller.lower() else "unknown",
+        seller_confidence=round(float(seller_confidence[best]), 2),
+        source_rank=int(ranks[best])
     )
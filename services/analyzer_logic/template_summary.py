@@ -0,0 +1,32 @@
+from schemas.analysis_schema import Summary, PriceEvaluation, BuyDecision, MarketAnalysis
+
+
+# build a summary from the computed analysis without an LLM
+def build_template_summary(product_name: str, price_evaluation: PriceEvaluation, buy_decision: BuyDecision, market_analysis: MarketAnalysis, risks_and_warnings: list) -> Summary:
+    """
+    Fills a fixed template from the rule-based analysis. Used when the
+    summarization LLM is unavailable or out of budget.
+    """
+    action = buy_decision.action if buy_decision else "Neutral"
+    if action == "Buy":
+        headline = f"Good time to buy {product_name}: the current price is below the market average."
+    elif action == "Wait":
+        headline = f"Consider waiting on {product_name}: {buy_decision.rationale[0].lower() + buy_decision.rationale[1:]}"
+    else:
+        headline = f"{product_name} is priced in line with the market; no immediate action needed."
+
+    key_points = [
+        f"Price position: {price_evaluation.price_position.replace('_', ' ')}.",
+        f"Price volatility: {price_evaluation.price_volatility}.",
+    ]
+    if isinstance(market_analysis, MarketAnalysis):
+        key_points.append(f"{market_analysis.seller_count} sellers with {market_analysis.competition_level} competition and {market_analysis.pricing_health.replace('_', ' ')} pricing.")
+    key_points.extend(risk for risk in risks_and_warnings[:2] if risk != "No significant risk indicators detected")
+
+    short_explanation = buy_decision.rationale if buy_decision else "The analysis did not trigger a specific buy rule."
+
+    return Summary(
+        headline = headline,
+        key_points = key_points,
+        short_explanation = short_explanation
+    )
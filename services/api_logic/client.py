@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional
+import requests
+import time
+
+
+class AnalysisApiError(RuntimeError):
+    """Raised when the analysis API rejects a request or a job fails."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AnalysisApiClient:
+    """
+    Thin client for the ProductPulse HTTP API (see api_server.py).
+    """
+
+    def __init__(self, base_url: str, request_timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.request_timeout = request_timeout
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        kwargs.setdefault("timeout", self.request_timeout)
+        response = requests.request(method, f"{self.base_url}{path}", **kwargs)
+        if response.status_code == 429:
+            raise AnalysisApiError("Analysis service is busy, please retry shortly", response.status_code)
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("error")
+            except ValueError:
+                message = None
+            raise AnalysisApiError(message or f"HTTP {response.status_code}", response.status_code)
+        return response.json()
+
+    def submit(self, product_input: str) -> str:
+        return self._request("POST", "/analyze", json={"product_input": product_input})["job_id"]
+
+    def submit_batch(self, product_inputs: List[str]) -> List[str]:
+        return self._request("POST", "/analyze/batch", json={"product_inputs": product_inputs})["job_ids"]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job's status and result; None when the API has no such job (e.g. expired or pruned)."""
+        try:
+            return self._request("GET", f"/jobs/{job_id}")
+        except AnalysisApiError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    def find_recent(self, product_input: str) -> Optional[Dict[str, Any]]:
+        return self._request("POST", "/analyze/similar", json={"product_input": product_input}).get("match")
+
+    def compare_regions(self, product_info: Dict[str, Any], regions: List[str], base_currency: str = "USD") -> Dict[str, Any]:
+        return self._request("POST", "/compare", json={"product_info": product_info, "regions": regions, "base_currency": base_currency}, timeout=60)
+
+    def add_to_watchlist(self, product_input: Optional[str] = None, product_info: Optional[Dict[str, Any]] = None, interval_seconds: Optional[float] = None) -> Dict[str, Any]:
+        body = {"product_input": product_input, "product_info": product_info, "interval_seconds": interval_seconds}
+        return self._request("POST", "/watchlist", json={key: value for key, value in body.items() if value is not None}, timeout=60)
+
+    def list_watchlist(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/watchlist")["items"]
+
+    def get_watchlist_item(self, item_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/watchlist/{item_id}")
+
+    def remove_from_watchlist(self, item_id: str) -> bool:
+        return self._request("DELETE", f"/watchlist/{item_id}")["removed"]
+
+    def add_alert_rule(self, rule: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request("POST", "/alerts/rules", json=rule)
+
+    def list_alert_rules(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/alerts/rules")["rules"]
+
+    def remove_alert_rule(self, rule_id: str) -> bool:
+        return self._request("DELETE", f"/alerts/rules/{rule_id}")["removed"]
+
+    def recent_alerts(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/alerts")["alerts"]
+
+    def wait_for_job(self, job_id: str, poll_interval: float = 1.0, timeout: float = 300.0) -> Dict[str, Any]:
+        """
+        Polls a job until it finishes and returns its results.
+
+        Raises:
+            AnalysisApiError: If the job is not found, fails or does not finish within timeout
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.get_job(job_id)
+            if job is None:
+                raise AnalysisApiError(f"Job {job_id} not found", 404)
+            if job["status"] == "succeeded":
+                return job["result"]
+            if job["status"] == "failed":
+                raise AnalysisApiError(job.get("error") or "Analysis failed")
+            time.sleep(poll_interval)
+        raise AnalysisApiError(f"Job {job_id} did not finish within {timeout:.0f}s")
+
+    def analyze(self, product_input: str, poll_interval: float = 1.0, timeout: float = 300.0) -> Dict[str, Any]:
+        return self.wait_for_job(self.submit(product_input), poll_interval=poll_interval, timeout=timeout)
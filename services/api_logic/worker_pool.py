@@ -0,0 +1,157 @@
+from services.pipeline_logic.pipeline import PIPELINE_DEADLINE_SECONDS, ToolRegistry, run_analysis_pipeline, serialize_results
+from services.concurrency_logic.rate_limiter import INTERACTIVE, BATCH, request_priority
+from services.concurrency_logic.cpu_pool import cpu_offload, get_cpu_pool
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import queue
+import threading
+import traceback
+import uuid
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the worker pool cannot accept more work."""
+
+
+# current UTC time in ISO 8601 format
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class InMemoryJobStore:
+    """
+    Thread-safe job records kept in process memory.
+
+    Each record holds the job status (queued, running, succeeded, failed),
+    its input, and either the serialized results or the error message.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, product_input: str, priority: int = INTERACTIVE) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "product_input": product_input,
+                "priority": priority,
+                "result": None,
+                "error": None,
+                "created_at": _now(),
+                "updated_at": _now(),
+            }
+        return job_id
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated_at=_now())
+
+    def mark_running(self, job_id: str) -> None:
+        self._update(job_id, status="running")
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._update(job_id, status="succeeded", result=result)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._update(job_id, status="failed", error=error)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class WorkerPool:
+    """
+    Bounded pool of analysis workers fed from a bounded queue.
+
+    Every worker thread owns its own ToolRegistry, so tool instances (and the
+    predictor's model and LLM client) are built once per worker and reused.
+    Submissions are rejected with QueueFullError instead of queueing without limit.
+    """
+
+    def __init__(self, num_workers: int = 4, max_queue: int = 32, job_store=None):
+        if num_workers <= 0 or max_queue <= 0:
+            raise ValueError("num_workers and max_queue must be positive")
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        self.job_store = job_store or InMemoryJobStore()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max_queue)
+        self._submit_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"analysis-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, product_input: str) -> str:
+        return self.submit_batch([product_input], priority=INTERACTIVE)[0]
+
+    def submit_batch(self, product_inputs: List[str], priority: int = BATCH) -> List[str]:
+        """
+        Queues every input or none of them. Batch jobs yield to interactive
+        ones when waiting on provider rate limits.
+
+        Raises:
+            QueueFullError: If the queue lacks room for the whole batch
+        """
+        with self._submit_lock:
+            free_slots = self.max_queue - self._queue.qsize()
+            if len(product_inputs) > free_slots:
+                raise QueueFullError(f"Queue full: {len(product_inputs)} requested, {max(free_slots, 0)} free")
+
+            job_ids = []
+            for product_input in product_inputs:
+                job_id = self.job_store.create(product_input, priority=priority)
+                self._queue.put_nowait(job_id)
+                job_ids.append(job_id)
+            return job_ids
+
+    def _worker_loop(self) -> None:
+        registry = ToolRegistry()
+        while True:
+            job_id = self._queue.get()
+            try:
+                if job_id is None:
+                    return
+                self._run_job(registry, job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, registry: ToolRegistry, job_id: str) -> None:
+        job = self.job_store.get(job_id)
+        if job is None:
+            return
+
+        self.job_store.mark_running(job_id)
+        try:
+            priority = job.get("priority", INTERACTIVE)
+            # Batch jobs have no user waiting, so they wait for full results and
+            # run their CPU-bound stages in the process pool
+            batch = priority == BATCH
+            with request_priority(priority), cpu_offload(get_cpu_pool() if batch else None):
+                deadline_seconds = None if batch else PIPELINE_DEADLINE_SECONDS
+                results = run_analysis_pipeline(job["product_input"], registry=registry, deadline_seconds=deadline_seconds)
+            self.job_store.complete(job_id, serialize_results(results))
+            print(f"✅ Job {job_id} succeeded.")
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            traceback.print_exc()
+            self.job_store.fail(job_id, str(e))
@@ -0,0 +1,176 @@
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from services.extractor_logic.heuristic_parser import REGIONS
+from typing import Any, Dict, List, Optional, Set
+import numpy as np
+import re
+import threading
+import time
+import zlib
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+_UNITS = {"gb", "tb", "mb", "inch", "inches", "in", "mah", "hz", "w"}
+# Spellings of the same unit, mapped to one form so "55 inch" and "55in" match
+_UNIT_ALIASES = {"inch": "in", "inches": "in"}
+_FILLER_WORDS = {"a", "an", "the", "in", "for", "with", "and", "of", "condition", "market", "buying", "buy", "price"}
+
+
+# order-insensitive normal form of a free-text product request
+def normalize_request(text: str) -> List[str]:
+    """
+    Lowercases, splits letter/digit runs, glues numbers to their units
+    ("256 GB" -> "256gb", "55 inch" -> "55in"), maps region phrases to country
+    codes ("USA" -> "us"), drops filler words and returns the sorted unique tokens.
+
+    "in" after a number is only a unit when written without a space or not
+    followed by a region ("S23 in India" keeps "23" and maps India to "in").
+    """
+    text = text.lower()
+    for phrase in sorted((p for p in REGIONS if " " in p), key=len, reverse=True):
+        text = text.replace(phrase, f" {REGIONS[phrase][0]} ")
+
+    matches = list(_TOKEN_PATTERN.finditer(text))
+    merged = []
+    for position, match in enumerate(matches):
+        token = match.group()
+        previous = matches[position - 1] if position else None
+        if merged and token in _UNITS and merged[-1][0].isdigit() and previous is not None and previous.group()[0].isdigit():
+            adjacent = previous.end() == match.start()
+            following = matches[position + 1].group() if position + 1 < len(matches) else None
+            if token != "in" or adjacent or following not in REGIONS:
+                merged[-1] += _UNIT_ALIASES.get(token, token)
+                continue
+        if token not in _FILLER_WORDS:
+            merged.append(REGIONS[token][0] if token in REGIONS else token)
+    return sorted(set(merged))
+
+
+# character shingles of the normalized request
+def shingles(tokens: List[str], k: int = 3) -> Set[str]:
+    text = " ".join(tokens)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+@dataclass
+class NearDuplicateMatch:
+    text: str
+    value: Any
+    similarity: float
+    age_seconds: float
+
+
+class NearDuplicateIndex:
+    """
+    Bounded MinHash/LSH index of recent free-text requests.
+
+    Each request is reduced to character shingles of its normalized tokens and
+    a MinHash signature split into bands; requests sharing any band bucket are
+    candidates, and a candidate matches when the exact shingle Jaccard reaches
+    threshold and both requests name the same numbers (so "iphone 14" never
+    matches "iphone 15"). Entries expire after ttl_seconds and the oldest are
+    evicted beyond max_entries.
+    """
+
+    def __init__(self, name: str, max_entries: int = 5000, ttl_seconds: float = 6 * 60 * 60, threshold: float = 0.8, num_perm: int = 128, bands: int = 16, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: ((a * x + b) mod 2^64) >> 32, with odd a
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[int]] = defaultdict(set)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def _signature(self, shingle_set: Set[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[tuple]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for key in entry[4]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if now - entry[0] <= self.ttl_seconds and len(self._entries) <= self.max_entries:
+                break
+            self._remove(entry_id)
+            self.evictions += 1
+
+    def add(self, text: str, value: Any) -> None:
+        tokens = normalize_request(text)
+        shingle_set = shingles(tokens)
+        if not shingle_set:
+            return
+        band_keys = self._band_keys(self._signature(shingle_set))
+        numbers = frozenset(token for token in tokens if token[0].isdigit())
+        now = time.time()
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (now, text, value, (shingle_set, numbers), band_keys)
+            for key in band_keys:
+                self._buckets[key].add(entry_id)
+            self._expire(now)
+
+    def find(self, text: str, max_age_seconds: Optional[float] = None) -> Optional[NearDuplicateMatch]:
+        """Returns the most similar recent request, newest first on ties, or None."""
+        tokens = normalize_request(text)
+        shingle_set = shingles(tokens)
+        if not shingle_set:
+            return None
+        band_keys = self._band_keys(self._signature(shingle_set))
+        numbers = frozenset(token for token in tokens if token[0].isdigit())
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            self._expire(now)
+            candidates = set()
+            for key in band_keys:
+                candidates |= self._buckets.get(key, set())
+
+            best = None
+            for entry_id in sorted(candidates, reverse=True):
+                stored_at, stored_text, value, (stored_shingles, stored_numbers), _ = self._entries[entry_id]
+                if stored_numbers != numbers or (max_age_seconds is not None and now - stored_at > max_age_seconds):
+                    continue
+                similarity = len(shingle_set & stored_shingles) / len(shingle_set | stored_shingles)
+                if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                    best = NearDuplicateMatch(stored_text, value, round(similarity, 3), round(now - stored_at, 1))
+            if best is not None:
+                self.hits += 1
+            return best
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            }
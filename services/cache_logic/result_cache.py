@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import threading
+import time
+
+
+# Sentinel used to tell a cached None apart from a miss
+_MISSING = object()
+
+
+# hash any JSON-like payload into a stable content address
+def hash_payload(payload: Any) -> str:
+    """
+    Returns a SHA-256 hex digest of the canonical JSON form of the payload.
+    Keys are sorted and whitespace removed so equal inputs always hash equally.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded, thread-safe LRU cache with an optional time-to-live.
+
+    Entries are evicted least-recently-used first once max_entries is reached,
+    and treated as misses once older than ttl_seconds.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256, ttl_seconds: Optional[float] = None):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Process-wide registry so every Streamlit session shares the same caches
+_caches: Dict[str, ResultCache] = {}
+_registry_lock = threading.Lock()
+
+
+# get (or create) a named cache shared across the whole process
+def get_cache(name: str, max_entries: int = 256, ttl_seconds: Optional[float] = None) -> ResultCache:
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = ResultCache(name, max_entries=max_entries, ttl_seconds=ttl_seconds)
+            _caches[name] = cache
+        return cache
+
+
+# snapshot of every registered cache's counters
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
@@ -0,0 +1,201 @@
+from collections import Counter, defaultdict
+from services.config_logic.settings import get_settings
+from services.catalog_logic.identity import block_key, distinguishing_tokens, identity_fields, identity_key, product_id_for, trigrams
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import os
+import threading
+
+CATALOG_PATH = get_settings().catalog_path
+CATALOG_MIN_SIMILARITY = get_settings().catalog_min_similarity
+
+
+class CatalogIndex:
+    """
+    Resolves extracted product fields to a canonical product ID.
+
+    Entries are grouped into blocks by the exact-match fields (brand, storage,
+    ram, condition, region); within a block, model names are matched through
+    a trigram inverted index, so a lookup only scores names that share
+    trigrams with the query in the same block. Fuzzy matches must also agree
+    on numbers and variant words ("14" vs "15", "pro" vs "max"), so typos and
+    spacing differences merge but different models do not.
+
+    When path is given, new entries are appended to it as JSON lines, and
+    load_jsonl() restores them on the next start.
+    """
+
+    def __init__(self, path: Optional[str] = None, min_similarity: float = CATALOG_MIN_SIMILARITY):
+        self.path = path
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, str] = {}
+        self._entries: Dict[str, Dict[str, str]] = {}
+        # block -> list of (product_id, name, trigram count, distinguishing tokens)
+        self._names: Dict[str, List[tuple]] = defaultdict(list)
+        # block -> trigram -> positions in self._names[block]
+        self._postings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self.stats = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, product_id: str, fields: Dict[str, str]) -> None:
+        key = identity_key(fields)
+        if key in self._by_key:
+            return
+        if product_id in self._entries:
+            # Another spelling of a known product
+            self._by_key[key] = product_id
+            return
+        self._by_key[key] = product_id
+        self._entries[product_id] = fields
+        block = block_key(fields)
+        names = self._names[block]
+        grams = trigrams(fields["name"])
+        position = len(names)
+        names.append((product_id, fields["name"], len(grams), distinguishing_tokens(fields["name"])))
+        postings = self._postings[block]
+        for gram in grams:
+            postings[gram].append(position)
+
+    def _fuzzy_match(self, fields: Dict[str, str]) -> Optional[str]:
+        block = block_key(fields)
+        postings = self._postings.get(block)
+        if not postings or not fields["name"]:
+            return None
+        grams = trigrams(fields["name"])
+        overlaps = Counter()
+        for gram in grams:
+            overlaps.update(postings.get(gram, ()))
+
+        required = distinguishing_tokens(fields["name"])
+        best_id, best_score = None, self.min_similarity
+        names = self._names[block]
+        for position, shared in overlaps.items():
+            product_id, _, gram_count, tokens = names[position]
+            # Dice coefficient of the two trigram sets
+            score = 2 * shared / (len(grams) + gram_count)
+            if score >= best_score and tokens == required:
+                best_id, best_score = product_id, score
+        return best_id
+
+    def match(self, product_info: dict) -> Optional[str]:
+        """
+        Returns the product ID of an existing entry matching the product info
+        (exactly or fuzzily), or None; never registers or persists anything.
+        """
+        fields = identity_fields(product_info)
+        with self._lock:
+            self.stats["matches"] += 1
+            return self._by_key.get(identity_key(fields)) or self._fuzzy_match(fields)
+
+    def resolve(self, product_info: dict) -> str:
+        """
+        Returns the canonical product ID for extracted product info,
+        registering a new catalog entry when nothing matches.
+        """
+        fields = identity_fields(product_info)
+        key = identity_key(fields)
+        with self._lock:
+            self.stats["resolves"] += 1
+            product_id = self._by_key.get(key)
+            if product_id is not None:
+                self.stats["exact_hits"] += 1
+                return product_id
+
+            product_id = self._fuzzy_match(fields)
+            if product_id is not None:
+                self.stats["fuzzy_hits"] += 1
+                # Remember the spelling so the next lookup is an exact hit
+                self._by_key[key] = product_id
+                return product_id
+
+            product_id = product_id_for(fields)
+            self._add(product_id, fields)
+            self.stats["created"] += 1
+            self._append([{"product_id": product_id, **fields}])
+            return product_id
+
+    def get(self, product_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            entry = self._entries.get(product_id)
+            return {"product_id": product_id, **entry} if entry else None
+
+    def bulk_load(self, records: Iterable[dict], persist: bool = False) -> int:
+        """
+        Adds many entries without fuzzy matching each one.
+
+        Records are either catalog entries (product_id plus normalized fields,
+        as written by this index) or raw product info dicts, optionally with a
+        product_id. Returns the number of entries added.
+        """
+        added = []
+        with self._lock:
+            for record in records:
+                if "name" in record and "region" in record:
+                    fields = {name: record.get(name) or "" for name in ("brand", "name", "storage", "ram", "condition", "region")}
+                else:
+                    fields = identity_fields(record)
+                product_id = record.get("product_id") or product_id_for(fields)
+                before = len(self._entries)
+                self._add(product_id, fields)
+                if len(self._entries) > before:
+                    added.append({"product_id": product_id, **fields})
+            if persist:
+                self._append(added)
+        return len(added)
+
+    def load_jsonl(self, path: str, persist: bool = False) -> int:
+        with open(path, "r", encoding="utf-8") as f:
+            return self.bulk_load((json.loads(line) for line in f if line.strip()), persist=persist)
+
+    def rebuild_from_jobs(self, job_store) -> int:
+        """
+        Re-indexes the products of every stored successful analysis, keeping
+        the product IDs those analyses were given.
+        """
+        def records():
+            for result in job_store.iter_results():
+                extractor = dict(result.get("extractor") or {})
+                fetcher = result.get("fetcher") or {}
+                if fetcher.get("product_id"):
+                    extractor["product_id"] = fetcher["product_id"]
+                if extractor:
+                    yield extractor
+        return self.bulk_load(records(), persist=True)
+
+    def _append(self, entries: List[dict]) -> None:
+        if not self.path or not entries:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "blocks": len(self._names), **self.stats}
+
+
+_catalog: Optional[CatalogIndex] = None
+_catalog_lock = threading.Lock()
+
+
+# process-wide catalog, loaded from CATALOG_PATH on first use
+def get_catalog() -> CatalogIndex:
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            catalog = CatalogIndex(path=CATALOG_PATH)
+            if os.path.exists(CATALOG_PATH):
+                catalog.load_jsonl(CATALOG_PATH)
+            _catalog = catalog
+        return _catalog
+
+
+# catalog size and resolution counters
+def catalog_stats() -> Dict[str, Any]:
+    return get_catalog().snapshot()
@@ -0,0 +1,100 @@
+from typing import Dict, Optional, Set
+import hashlib
+import re
+
+
+# Model-name words that distinguish variants and must match exactly
+VARIANT_WORDS = {"pro", "max", "plus", "mini", "ultra", "lite", "air", "fe", "se", "neo", "slim", "fold", "flip"}
+
+# Condition synonyms mapped to canonical values
+CONDITION_ALIASES = {
+    "new": "new", "brand new": "new", "sealed": "new",
+    "used": "used", "pre-owned": "used", "preowned": "used", "second hand": "used", "secondhand": "used",
+    "refurbished": "refurbished", "renewed": "refurbished", "refurb": "refurbished", "open box": "refurbished",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+_CAPACITY_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(tb|gb|mb)\b")
+
+
+# lowercase word and number tokens, splitting letter/digit runs ("s23ultra" -> s, 23, ultra)
+def normalize_tokens(text: Optional[str]) -> list:
+    return _TOKEN_PATTERN.findall((text or "").lower())
+
+
+# "128 GB" -> "128gb"; None when there is no capacity in the text
+def normalize_capacity(value) -> Optional[str]:
+    match = _CAPACITY_PATTERN.search(str(value or "").lower())
+    if not match:
+        return None
+    amount, unit = float(match.group(1)), match.group(2)
+    if unit == "gb" and amount >= 1024 and amount % 1024 == 0:
+        amount, unit = amount / 1024, "tb"
+    return f"{amount:g}{unit}"
+
+
+# canonical condition (new, used, refurbished)
+def normalize_condition(value: Optional[str]) -> Optional[str]:
+    text = " ".join(normalize_tokens(value))
+    if not text:
+        return None
+    return CONDITION_ALIASES.get(text, CONDITION_ALIASES.get(text.replace(" ", ""), text))
+
+
+# the normalized fields that define "the same product"
+def identity_fields(product_info: dict) -> Dict[str, str]:
+    """
+    Reduces extracted product info to brand, model name, storage, ram,
+    condition and region. The model name drops brand, capacity and filler
+    tokens, falling back to product_name when model is missing.
+    """
+    attributes = product_info.get("attributes") or {}
+    brand = " ".join(normalize_tokens(product_info.get("brand")))
+    storage = normalize_capacity(attributes.get("storage")) or ""
+    ram = normalize_capacity(attributes.get("ram")) or ""
+
+    name_source = product_info.get("model") or product_info.get("product_name") or ""
+    if product_info.get("model") and product_info.get("product_name"):
+        # "Galaxy S23" is more useful than "S23" when the name carries the product line
+        name_tokens = normalize_tokens(product_info["product_name"])
+        model_tokens = normalize_tokens(product_info["model"])
+        if set(model_tokens) <= set(name_tokens):
+            name_source = product_info["product_name"]
+    text = _CAPACITY_PATTERN.sub(" ", str(name_source).lower())
+    brand_tokens = set(brand.split())
+    name = " ".join(token for token in normalize_tokens(text) if token not in brand_tokens)
+
+    return {
+        "brand": brand,
+        "name": name,
+        "storage": storage,
+        "ram": ram,
+        "condition": normalize_condition(product_info.get("condition")) or "",
+        "region": (product_info.get("market_region") or "").strip().lower(),
+    }
+
+
+# exact-match key of the structured fields other than the name
+def block_key(fields: Dict[str, str]) -> str:
+    return "|".join((fields["brand"], fields["storage"], fields["ram"], fields["condition"], fields["region"]))
+
+
+# full identity: structured fields plus the model name
+def identity_key(fields: Dict[str, str]) -> str:
+    return block_key(fields) + "|" + fields["name"]
+
+
+# stable product id derived from the identity key
+def product_id_for(fields: Dict[str, str]) -> str:
+    return "prd_" + hashlib.sha1(identity_key(fields).encode("utf-8")).hexdigest()[:16]
+
+
+# numbers and variant words in a name; fuzzy matches must agree on these
+def distinguishing_tokens(name: str) -> Set[str]:
+    return {token for token in name.split() if token[0].isdigit() or token in VARIANT_WORDS}
+
+
+# padded character trigrams of a name
+def trigrams(name: str) -> Set[str]:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
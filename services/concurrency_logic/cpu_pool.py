@@ -0,0 +1,184 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from services.config_logic.settings import get_settings
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import multiprocessing
+import queue
+import threading
+
+CPU_POOL_WORKERS = get_settings().cpu_pool_workers
+CPU_POOL_CHUNK_SIZE = get_settings().cpu_pool_chunk_size
+
+_offload: ContextVar[Optional["CPUPool"]] = ContextVar("cpu_offload", default=None)
+
+
+class CPUPoolError(RuntimeError):
+    """Raised when the pool itself cannot run a call (workers failed to start or crashed, arguments not picklable)."""
+
+
+# run a chunk of calls in a worker process; failures are returned per call so one bad item does not fail the chunk
+def _run_chunk(calls: List[Tuple[Callable[..., Any], tuple]]) -> List[Tuple[bool, Any]]:
+    results = []
+    for fn, args in calls:
+        try:
+            results.append((True, fn(*args)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+class CPUPool:
+    """
+    Process pool for the deterministic pipeline stages (SerpAPI parsing, the
+    rule-based analysis and ML scoring), so batch runs are not held to one
+    core by the GIL.
+
+    Callers on I/O threads block in run() while their call is shipped to a
+    worker process. Calls are sent in chunks: at most one chunk per worker is
+    in flight, and every call queued while the workers are busy joins the next
+    chunk, so chunks grow with the backlog and IPC is amortized under load
+    without delaying a lone call. Functions and arguments must be picklable.
+    """
+
+    def __init__(self, max_workers: int, chunk_size: int = 8):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        # forkserver children start from a clean process, which is safe while this one runs threads
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+        self._queue: "queue.Queue" = queue.Queue()
+        self._slots = threading.Semaphore(max_workers)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.chunks = 0
+        self.errors = 0
+        self._dispatcher = threading.Thread(target=self._dispatch, name="cpu-pool-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Runs fn(*args) in a worker process and returns its result (or raises its error)."""
+        future: Future = Future()
+        self._queue.put((fn, args, future))
+        return future.result()
+
+    def _dispatch(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            # Wait for a free worker, then take everything that queued up meanwhile
+            self._slots.acquire()
+            chunk = [first]
+            stopping = False
+            while len(chunk) < self.chunk_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                chunk.append(item)
+
+            try:
+                submitted = self._executor.submit(_run_chunk, [(fn, args) for fn, args, _ in chunk])
+            except Exception as e:
+                self._slots.release()
+                for _, _, future in chunk:
+                    future.set_exception(CPUPoolError(f"CPU pool could not start the call: {e}"))
+            else:
+                with self._lock:
+                    self.calls += len(chunk)
+                    self.chunks += 1
+                submitted.add_done_callback(lambda done, chunk=chunk: self._deliver(done, chunk))
+            if stopping:
+                return
+
+    def _deliver(self, done: Future, chunk: List[Tuple[Callable[..., Any], tuple, Future]]) -> None:
+        self._slots.release()
+        try:
+            results = done.result()
+        except Exception as e:
+            # The chunk itself failed (e.g. unpicklable arguments or a crashed worker)
+            results = [(False, CPUPoolError(f"CPU pool chunk failed: {e}"))] * len(chunk)
+        for (_, _, future), (ok, value) in zip(chunk, results):
+            if ok:
+                future.set_result(value)
+            else:
+                with self._lock:
+                    self.errors += 1
+                future.set_exception(value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "calls": self.calls,
+                "chunks": self.chunks,
+                "avg_chunk_size": round(self.calls / self.chunks, 2) if self.chunks else 0.0,
+                "errors": self.errors,
+                "queued": self._queue.qsize(),
+            }
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown()
+
+
+_pool: Optional[CPUPool] = None
+_pool_lock = threading.Lock()
+
+
+# process-wide CPU pool, started on first use; None when CPU_POOL_WORKERS is 0
+def get_cpu_pool() -> Optional[CPUPool]:
+    global _pool
+    if CPU_POOL_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = CPUPool(CPU_POOL_WORKERS, chunk_size=CPU_POOL_CHUNK_SIZE)
+        return _pool
+
+
+# stop the process-wide pool, if it was started
+def shutdown_cpu_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+# counters of the process-wide pool, or None if it was never started
+def cpu_pool_stats() -> Optional[Dict[str, Any]]:
+    with _pool_lock:
+        return _pool.stats() if _pool is not None else None
+
+
+# send the enclosed run_cpu() calls to a process pool (None keeps them inline)
+@contextmanager
+def cpu_offload(pool: Optional[CPUPool]) -> Iterator[Optional[CPUPool]]:
+    token = _offload.set(pool)
+    try:
+        yield pool
+    finally:
+        _offload.reset(token)
+
+
+# the pool run_cpu() currently sends work to, if any
+def current_cpu_pool() -> Optional[CPUPool]:
+    return _offload.get()
+
+
+# run fn(*args) in the current CPU pool, or inline outside cpu_offload() or when the pool fails
+def run_cpu(fn: Callable[..., Any], *args) -> Any:
+    pool = _offload.get()
+    if pool is None:
+        return fn(*args)
+    try:
+        return pool.run(fn, *args)
+    except CPUPoolError as e:
+        print(f"⚠️ CPU pool unavailable, running {fn.__name__} inline: {e}")
+        return fn(*args)
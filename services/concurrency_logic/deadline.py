@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+import sys
+import time
+
+_deadline: ContextVar[Optional["Deadline"]] = ContextVar("request_deadline", default=None)
+_degraded: ContextVar[Optional[Dict[str, Dict[str, str]]]] = ContextVar("degraded_stages", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call cannot finish before the current request's deadline."""
+
+
+class Deadline:
+    """A point on the monotonic clock by which the current request must finish."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+# run the enclosed calls under a deadline; a nested deadline never outlives the enclosing one
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    outer = _deadline.get()
+    if seconds is None:
+        yield outer
+        return
+
+    deadline = Deadline(seconds)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline.expires_at = outer.expires_at
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+# the deadline of the current request, if it has one
+def current_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+# timeout for a blocking call, cut down to what is left of the current deadline
+def bounded_timeout(timeout: Optional[float] = None, what: str = "call") -> Optional[float]:
+    """
+    Returns timeout unchanged when no deadline is set, otherwise the smaller of
+    timeout and the time left. Raises DeadlineExceeded if no time is left, so
+    callers never start work they cannot finish.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"{what}: request deadline of {deadline.seconds:.1f}s reached")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+# timeout exception classes of the HTTP clients that are loaded (importing one just to check would cost startup time)
+def _client_timeout_types() -> tuple:
+    types = []
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        types.append(requests.exceptions.Timeout)
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        types.append(httpx.TimeoutException)
+    return tuple(types)
+
+
+# detect a deadline or network timeout, possibly wrapped in another exception
+def is_deadline_error(error: BaseException) -> bool:
+    """
+    True for DeadlineExceeded and other TimeoutErrors (socket and future
+    timeouts included) and for requests / httpx timeouts, following
+    __cause__ / __context__. The message text is never inspected.
+    """
+    timeout_types = (TimeoutError,) + _client_timeout_types()
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, timeout_types):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+# collect the stages that fell back to a degraded result inside the enclosed block
+@contextmanager
+def degradation_report() -> Iterator[Dict[str, Dict[str, str]]]:
+    report: Dict[str, Dict[str, str]] = {}
+    token = _degraded.set(report)
+    try:
+        yield report
+    finally:
+        _degraded.reset(token)
+
+
+# note that a stage served a fallback instead of its full result
+def mark_degraded(stage: str, fallback: str, error: Any) -> None:
+    report = _degraded.get()
+    if report is not None:
+        report[stage] = {"fallback": fallback, "reason": str(error)}
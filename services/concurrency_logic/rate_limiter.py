@@ -0,0 +1,273 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from services.config_logic.settings import get_settings
+from services.concurrency_logic.deadline import DeadlineExceeded, current_deadline
+from services.metrics_logic.registry import REGISTRY
+from typing import Any, Dict, Optional
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+RATE_LIMIT_DB_PATH = get_settings().rate_limit_db_path
+
+# Lower value is served first
+INTERACTIVE = 0
+BATCH = 1
+
+# Default limits per provider: sustained rate, burst size and daily quota (None = unlimited)
+DEFAULT_LIMITS = {
+    "serpapi": {"per_minute": 30, "burst": 5, "daily_quota": 3000},
+    "gemini": {"per_minute": 60, "burst": 10, "daily_quota": 10000},
+    "ollama": {"per_minute": 600, "burst": 20, "daily_quota": None},
+}
+
+# How long a caller may wait for a token before degrading
+DEFAULT_MAX_WAIT_SECONDS = {INTERACTIVE: 10.0, BATCH: 120.0}
+
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "productpulse_rate_limit_wait_seconds", "Time callers waited for a provider rate-limit token.", ("provider", "priority"),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+RATE_LIMIT_REJECTIONS = REGISTRY.counter("productpulse_rate_limit_rejections_total", "Callers that gave up waiting for a provider rate-limit token.", ("provider", "priority"))
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Provider exception classes that mean "slow down" (matched by name, so the SDKs stay optional)
+_RATE_LIMIT_ERROR_NAMES = {"RateLimitError", "ResourceExhausted", "TooManyRequests"}
+
+_priority: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+class RateLimitError(RuntimeError):
+    """Raised when a provider call cannot be made within its rate or quota budget."""
+
+
+class QuotaExhaustedError(RateLimitError):
+    """Raised when a provider's daily quota is used up."""
+
+
+# run the enclosed calls at the given priority (e.g. BATCH for bulk work)
+@contextmanager
+def request_priority(priority: int):
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# detect a provider-side rate limit surfaced as a provider or HTTP exception
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    True for our own RateLimitError, provider rate-limit exceptions (OpenAI-style
+    RateLimitError, Google ResourceExhausted / TooManyRequests) and errors
+    carrying HTTP status 429 (status_code, code or response.status_code).
+    Wrapped errors are followed through __cause__ / __context__; the message
+    text is never inspected, so a 429 in a price or model name does not count.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, RateLimitError):
+            return True
+        if any(cls.__name__ in _RATE_LIMIT_ERROR_NAMES for cls in type(error).__mro__):
+            return True
+        response = getattr(error, "response", None)
+        for status in (getattr(error, "status_code", None), getattr(error, "code", None), getattr(response, "status_code", None)):
+            try:
+                if int(status) == 429:
+                    return True
+            except (TypeError, ValueError):
+                pass
+        error = error.__cause__ or error.__context__
+    return False
+
+
+# limits for a provider, overridable via RATE_LIMIT_<PROVIDER>_PER_MINUTE / _BURST / QUOTA_<PROVIDER>_PER_DAY
+def _limits_for(provider: str) -> Dict[str, Any]:
+    limits = dict(DEFAULT_LIMITS.get(provider, {"per_minute": 60, "burst": 5, "daily_quota": None}))
+    prefix = provider.upper()
+    settings = get_settings()
+    if settings.env(f"RATE_LIMIT_{prefix}_PER_MINUTE"):
+        limits["per_minute"] = float(settings.env(f"RATE_LIMIT_{prefix}_PER_MINUTE"))
+    if settings.env(f"RATE_LIMIT_{prefix}_BURST"):
+        limits["burst"] = float(settings.env(f"RATE_LIMIT_{prefix}_BURST"))
+    if settings.env(f"QUOTA_{prefix}_PER_DAY"):
+        limits["daily_quota"] = int(settings.env(f"QUOTA_{prefix}_PER_DAY"))
+    return limits
+
+
+class RateLimiter:
+    """
+    Token bucket per provider with daily quota accounting.
+
+    Bucket levels and quota counters live in a SQLite file, so every process on
+    the host (Streamlit, API server, batch workers) draws from the same budget.
+    Within a process, waiting callers are served in priority order, so
+    interactive requests overtake queued batch work.
+    """
+
+    def __init__(self, db_path: str = RATE_LIMIT_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._condition = threading.Condition()
+        self._waiters: Dict[str, list] = {}
+        self._sequence = itertools.count()
+        self._wait_seconds: Dict[str, float] = {}
+        self._rejections: Dict[str, int] = {}
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (provider TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS quota_usage (provider TEXT NOT NULL, day TEXT NOT NULL, used INTEGER NOT NULL, PRIMARY KEY (provider, day))")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _try_take(self, provider: str) -> float:
+        """
+        Takes one token if available.
+
+        Returns:
+            0.0 when a token was taken, otherwise seconds until the next token
+        """
+        limits = _limits_for(provider)
+        rate = limits["per_minute"] / 60.0
+        capacity = limits["burst"]
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                quota = limits["daily_quota"]
+                if quota is not None:
+                    row = conn.execute("SELECT used FROM quota_usage WHERE provider = ? AND day = ?", (provider, day)).fetchone()
+                    if row and row[0] >= quota:
+                        raise QuotaExhaustedError(f"Daily {provider} quota of {quota} calls exhausted")
+
+                row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE provider = ?", (provider,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+
+                if tokens < 1.0:
+                    conn.execute("REPLACE INTO buckets (provider, tokens, updated_at) VALUES (?, ?, ?)", (provider, tokens, now))
+                    conn.execute("COMMIT")
+                    return (1.0 - tokens) / rate
+
+                conn.execute("REPLACE INTO buckets (provider, tokens, updated_at) VALUES (?, ?, ?)", (provider, tokens - 1.0, now))
+                conn.execute(
+                    "INSERT INTO quota_usage (provider, day, used) VALUES (?, ?, 1) ON CONFLICT (provider, day) DO UPDATE SET used = used + 1",
+                    (provider, day)
+                )
+                conn.execute("COMMIT")
+                return 0.0
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self, provider: str, priority: Optional[int] = None, max_wait: Optional[float] = None) -> float:
+        """
+        Blocks until a token for the provider is available.
+
+        Args:
+            provider: Provider name, e.g. "serpapi", "gemini", "ollama"
+            priority: INTERACTIVE or BATCH; defaults to the current request_priority
+            max_wait: Seconds to wait before giving up; defaults per priority and
+                never runs past the current request deadline
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            QuotaExhaustedError: If the daily quota is used up
+            RateLimitError: If no token became available within max_wait
+            DeadlineExceeded: If the request deadline passed first
+        """
+        priority = _priority.get() if priority is None else priority
+        max_wait = DEFAULT_MAX_WAIT_SECONDS.get(priority, 10.0) if max_wait is None else max_wait
+        deadline = current_deadline()
+        deadline_bound = deadline is not None and deadline.remaining() < max_wait
+        if deadline_bound:
+            max_wait = deadline.remaining()
+        started = time.monotonic()
+        entry = (priority, next(self._sequence))
+
+        # The condition only guards the wait queues; the SQLite transaction runs
+        # outside it, so a slow or locked database never stalls other providers
+        with self._condition:
+            waiters = self._waiters.setdefault(provider, [])
+            heapq.heappush(waiters, entry)
+        try:
+            while True:
+                # Only the highest-priority waiter competes for the shared bucket
+                with self._condition:
+                    at_head = waiters[0] == entry
+                wait = self._try_take(provider) if at_head else 0.05
+                if wait == 0.0:
+                    waited = time.monotonic() - started
+                    with self._condition:
+                        self._wait_seconds[provider] = self._wait_seconds.get(provider, 0.0) + waited
+                    RATE_LIMIT_WAIT.labels(provider, PRIORITY_NAMES.get(priority, priority)).observe(waited)
+                    return waited
+
+                remaining = max_wait - (time.monotonic() - started)
+                if remaining <= 0:
+                    with self._condition:
+                        self._rejections[provider] = self._rejections.get(provider, 0) + 1
+                    RATE_LIMIT_REJECTIONS.labels(provider, PRIORITY_NAMES.get(priority, priority)).inc()
+                    if deadline_bound:
+                        raise DeadlineExceeded(f"{provider} rate limit: no capacity before the request deadline")
+                    raise RateLimitError(f"{provider} rate limit: no capacity within {max_wait:.0f}s")
+                with self._condition:
+                    # Became the head while checking the bucket: retry at once
+                    if not at_head and waiters[0] == entry:
+                        continue
+                    self._condition.wait(min(wait, remaining))
+        finally:
+            with self._condition:
+                waiters.remove(entry)
+                heapq.heapify(waiters)
+                self._condition.notify_all()
+
+    def quota_usage(self) -> Dict[str, Dict[str, Any]]:
+        """Today's calls and remaining quota per provider."""
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        with self._connect() as conn:
+            used = dict(conn.execute("SELECT provider, used FROM quota_usage WHERE day = ?", (day,)).fetchall())
+
+        usage = {}
+        for provider in set(DEFAULT_LIMITS) | set(used):
+            quota = _limits_for(provider)["daily_quota"]
+            calls = used.get(provider, 0)
+            usage[provider] = {
+                "used_today": calls,
+                "daily_quota": quota,
+                "remaining": None if quota is None else max(quota - calls, 0),
+                "wait_seconds_total": round(self._wait_seconds.get(provider, 0.0), 3),
+                "rejections": self._rejections.get(provider, 0),
+            }
+        return usage
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+# process-wide rate limiter shared by every tool
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
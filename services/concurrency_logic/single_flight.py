@@ -0,0 +1,113 @@
+from typing import Any, Callable, Dict
+from services.concurrency_logic.deadline import DeadlineExceeded, bounded_timeout, current_deadline, is_deadline_error
+import threading
+
+
+class _Call:
+    """One in-flight execution that concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running wait and receive the same result (or exception). Nothing is
+    kept once the call finishes, so this is coalescing, not caching. Waiting
+    callers give up when their own request deadline passes.
+
+    When the leader fails with a deadline or timeout error, that was the
+    leader's budget running out, not necessarily the waiter's: a waiter with
+    time left runs the call again (as the new leader, or joining one).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+        self.retried = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    self.collapsed += 1
+                    leader = False
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    self.executions += 1
+                    leader = True
+
+            if leader:
+                return self._lead(key, call, fn)
+
+            if not call.done.wait(bounded_timeout(what=f"{self.name} in-flight call")):
+                raise DeadlineExceeded(f"{self.name}: in-flight call did not finish within the request deadline")
+            if call.error is None:
+                return call.result
+            if not (is_deadline_error(call.error) and self._has_time_left()):
+                raise call.error
+            with self._lock:
+                self.retried += 1
+
+    def _lead(self, key: str, call: _Call, fn: Callable[[], Any]) -> Any:
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @staticmethod
+    def _has_time_left() -> bool:
+        deadline = current_deadline()
+        return deadline is None or not deadline.expired
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "calls": self.calls,
+                "executions": self.executions,
+                "collapsed": self.collapsed,
+                "retried": self.retried,
+                "in_flight": len(self._calls),
+            }
+
+
+# Process-wide registry so every session coalesces through the same groups
+_groups: Dict[str, SingleFlight] = {}
+_registry_lock = threading.Lock()
+
+
+# get (or create) a named single-flight group
+def get_single_flight(name: str) -> SingleFlight:
+    with _registry_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = SingleFlight(name)
+            _groups[name] = group
+        return group
+
+
+# snapshot of every group's counters
+def all_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
@@ -0,0 +1,191 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import os
+
+
+# helper readers for typed environment values
+def _str(name: str, default: Optional[str] = None) -> Optional[str]:
+    return os.getenv(name, default)
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Every environment-driven setting of the app, read once from the
+    process environment and .env.
+
+    Modules take their values from get_settings() instead of calling
+    load_dotenv() and os.getenv() themselves, so .env is parsed once per
+    process and importing a module has no side effects beyond that.
+    """
+
+    # Provider credentials
+    google_api_key: Optional[str]
+    serpapi_key: Optional[str]
+
+    # Streamlit app and job queue
+    analysis_api_url: Optional[str]
+    job_db_path: str
+    job_workers: int
+
+    # HTTP API
+    api_host: str
+    api_port: int
+    api_workers: int
+    api_max_queue: int
+    api_max_batch: int
+
+    # Metrics endpoint
+    metrics_host: str
+    metrics_port: int
+
+    # Rate limits (per-provider overrides are read through env())
+    rate_limit_db_path: str
+
+    # Prompt budgets, structured output and LLM calls
+    prompt_budget_extractor: int
+    prompt_budget_analyzer: int
+    prompt_budget_predictor: int
+    structured_output_max_reprompts: int
+    llm_call_workers: int
+
+    # Request deadlines
+    pipeline_deadline_seconds: float
+    serpapi_timeout_seconds: float
+
+    # CPU pool for batch runs
+    cpu_pool_workers: int
+    cpu_pool_chunk_size: int
+
+    # Offer sources (per-source timeouts are read through env())
+    offer_sources: str
+    offer_source_timeout_seconds: float
+    offer_file_path: str
+    offer_replay_path: str
+    offer_replay_record: bool
+
+    # Offer price statistics: outlier filtering and quantile sketches
+    outlier_method: str
+    outlier_mad_threshold: float
+    outlier_iqr_factor: float
+    outlier_min_offers: int
+    outlier_min_deviation: float
+    price_sketch_compression: int
+    price_distribution_max_offers: int
+
+    # Speculative fetch
+    speculative_fetch_enabled: bool
+    speculation_min_similarity: float
+
+    # Catalog, FX rates and near-duplicate reuse
+    catalog_path: str
+    catalog_min_similarity: float
+    fx_rates_path: str
+    fx_rates_url: Optional[str]
+    fx_rates_max_age_seconds: float
+    near_duplicate_max_entries: int
+    near_duplicate_ttl_seconds: float
+    near_duplicate_threshold: float
+
+    # Watchlist and alerts
+    watchlist_enabled: bool
+    watchlist_db_path: str
+    watchlist_default_interval_seconds: float
+    watchlist_min_interval_seconds: float
+    watchlist_max_concurrency: int
+    watchlist_jitter: float
+    watchlist_price_tolerance: float
+    alert_rules_path: str
+    alert_state_path: str
+    alert_log_path: str
+    alert_webhook_url: Optional[str]
+    alert_ewma_alpha: float
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            google_api_key=_str("GOOGLE_API_KEY"),
+            serpapi_key=_str("SERPAPI_KEY"),
+            analysis_api_url=_str("ANALYSIS_API_URL"),
+            job_db_path=_str("JOB_DB_PATH", "data/jobs.sqlite3"),
+            job_workers=_int("JOB_WORKERS", 2),
+            api_host=_str("API_HOST", "127.0.0.1"),
+            api_port=_int("API_PORT", 8600),
+            api_workers=_int("API_WORKERS", 4),
+            api_max_queue=_int("API_MAX_QUEUE", 32),
+            api_max_batch=_int("API_MAX_BATCH", 50),
+            metrics_host=_str("METRICS_HOST", "127.0.0.1"),
+            metrics_port=_int("METRICS_PORT", 9464),                                # 0 = no metrics endpoint
+            rate_limit_db_path=_str("RATE_LIMIT_DB_PATH", "data/rate_limits.sqlite3"),
+            prompt_budget_extractor=_int("PROMPT_BUDGET_EXTRACTOR", 700),
+            prompt_budget_analyzer=_int("PROMPT_BUDGET_ANALYZER", 900),
+            prompt_budget_predictor=_int("PROMPT_BUDGET_PREDICTOR", 450),
+            structured_output_max_reprompts=_int("STRUCTURED_OUTPUT_MAX_REPROMPTS", 1),
+            llm_call_workers=_int("LLM_CALL_WORKERS", 64),                          # shared by all stages' hedged and deadline-bound calls
+            pipeline_deadline_seconds=_float("PIPELINE_DEADLINE_SECONDS", 8.0),   # 0 = no deadline
+            serpapi_timeout_seconds=_float("SERPAPI_TIMEOUT_SECONDS", 15.0),
+            cpu_pool_workers=_int("CPU_POOL_WORKERS", os.cpu_count() or 1),        # 0 = run batch CPU work inline
+            cpu_pool_chunk_size=_int("CPU_POOL_CHUNK_SIZE", 8),
+            offer_sources=_str("OFFER_SOURCES", "serpapi"),                      # comma-separated: serpapi, local, replay
+            offer_source_timeout_seconds=_float("OFFER_SOURCE_TIMEOUT_SECONDS", 10.0),
+            offer_file_path=_str("OFFER_FILE_PATH", "data/offers.jsonl"),
+            offer_replay_path=_str("OFFER_REPLAY_PATH", "data/offer_replay.jsonl"),
+            offer_replay_record=_bool("OFFER_REPLAY_RECORD", False),
+            outlier_method=_str("OUTLIER_METHOD", "mad"),                          # mad, iqr or none
+            outlier_mad_threshold=_float("OUTLIER_MAD_THRESHOLD", 3.5),
+            outlier_iqr_factor=_float("OUTLIER_IQR_FACTOR", 1.5),
+            outlier_min_offers=_int("OUTLIER_MIN_OFFERS", 4),
+            outlier_min_deviation=_float("OUTLIER_MIN_DEVIATION", 0.1),            # fraction of the median
+            price_sketch_compression=_int("PRICE_SKETCH_COMPRESSION", 100),        # max centroids per sketch
+            price_distribution_max_offers=_int("PRICE_DISTRIBUTION_MAX_OFFERS", 50),  # offers / sellers serialized per fetch
+            speculative_fetch_enabled=_str("SPECULATIVE_FETCH", "1") == "1",
+            speculation_min_similarity=_float("SPECULATION_MIN_SIMILARITY", 0.8),
+            catalog_path=_str("CATALOG_PATH", "data/catalog.jsonl"),
+            catalog_min_similarity=_float("CATALOG_MIN_SIMILARITY", 0.7),
+            fx_rates_path=_str("FX_RATES_PATH", "data/fx_rates.json"),
+            fx_rates_url=_str("FX_RATES_URL"),              # e.g. https://open.er-api.com/v6/latest/USD
+            fx_rates_max_age_seconds=_float("FX_RATES_MAX_AGE_SECONDS", 24 * 60 * 60),
+            near_duplicate_max_entries=_int("NEAR_DUPLICATE_MAX_ENTRIES", 5000),
+            near_duplicate_ttl_seconds=_float("NEAR_DUPLICATE_TTL_SECONDS", 6 * 60 * 60),
+            near_duplicate_threshold=_float("NEAR_DUPLICATE_THRESHOLD", 0.8),
+            watchlist_enabled=_bool("WATCHLIST_ENABLED", True),
+            watchlist_db_path=_str("WATCHLIST_DB_PATH", "data/watchlist.sqlite3"),
+            watchlist_default_interval_seconds=_float("WATCHLIST_DEFAULT_INTERVAL_SECONDS", 6 * 60 * 60),
+            watchlist_min_interval_seconds=_float("WATCHLIST_MIN_INTERVAL_SECONDS", 300),
+            watchlist_max_concurrency=_int("WATCHLIST_MAX_CONCURRENCY", 4),
+            watchlist_jitter=_float("WATCHLIST_JITTER", 0.1),               # +/- fraction of the interval
+            watchlist_price_tolerance=_float("WATCHLIST_PRICE_TOLERANCE", 0.005),
+            alert_rules_path=_str("ALERT_RULES_PATH", "data/alert_rules.json"),
+            alert_state_path=_str("ALERT_STATE_PATH", "data/alert_state.sqlite3"),
+            alert_log_path=_str("ALERT_LOG_PATH", "data/alerts.jsonl"),
+            alert_webhook_url=_str("ALERT_WEBHOOK_URL"),
+            alert_ewma_alpha=_float("ALERT_EWMA_ALPHA", 0.3),
+        )
+
+    def env(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Raw environment value, for settings whose names are built at runtime."""
+        return os.getenv(name, default)
+
+
+# process-wide settings; .env is loaded on the first call only
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    from dotenv import load_dotenv
+    load_dotenv()
+    return Settings.from_env()
@@ -0,0 +1,108 @@
+from schemas.product_schema import ProductSchema
+import copy
+import re
+
+
+# Brands recognised directly, and well-known product lines that imply a brand
+KNOWN_BRANDS = [
+    "apple", "samsung", "google", "oneplus", "xiaomi", "redmi", "realme", "oppo", "vivo", "motorola",
+    "nokia", "sony", "lg", "hp", "dell", "lenovo", "asus", "acer", "msi", "microsoft", "bose",
+    "jbl", "sennheiser", "beats", "garmin", "fitbit", "nothing", "canon", "nikon", "dyson", "philips",
+]
+PRODUCT_LINE_BRANDS = {
+    "iphone": "Apple", "ipad": "Apple", "macbook": "Apple", "airpods": "Apple", "imac": "Apple",
+    "galaxy": "Samsung", "pixel": "Google", "surface": "Microsoft", "thinkpad": "Lenovo",
+    "pavilion": "HP", "xps": "Dell", "playstation": "Sony", "quietcomfort": "Bose",
+}
+
+# Category hints keyed by keyword
+CATEGORY_KEYWORDS = {
+    "smartphone": ["iphone", "galaxy", "pixel", "phone", "smartphone", "oneplus", "redmi"],
+    "laptop": ["laptop", "macbook", "notebook", "thinkpad", "pavilion", "xps", "chromebook"],
+    "tablet": ["ipad", "tablet"],
+    "headphones": ["headphones", "earbuds", "airpods", "headset", "quietcomfort"],
+    "watch": ["watch", "smartwatch"],
+}
+
+# Region phrases mapped to Google country codes and their currencies
+REGIONS = {
+    "us": ("us", "USD"), "usa": ("us", "USD"), "united states": ("us", "USD"),
+    "india": ("in", "INR"), "uk": ("uk", "GBP"), "united kingdom": ("uk", "GBP"),
+    "canada": ("ca", "CAD"), "australia": ("au", "AUD"), "germany": ("de", "EUR"),
+    "france": ("fr", "EUR"), "japan": ("jp", "JPY"),
+}
+
+_STORAGE_PATTERN = re.compile(r"\b(\d+)\s?(gb|tb)\b(?!\s*ram)", re.IGNORECASE)
+_RAM_PATTERN = re.compile(r"\b(\d+)\s?gb\s*ram\b", re.IGNORECASE)
+_CONDITION_PATTERN = re.compile(r"\b(brand new|new|used|refurbished|renewed|pre-owned|open box)\b", re.IGNORECASE)
+_REGION_PATTERN = re.compile(r"\b(" + "|".join(sorted(REGIONS, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+_FILLER_PATTERN = re.compile(r"\b(buying in|buying|market|condition|in|the|with|for|a|an)\b", re.IGNORECASE)
+
+
+# normalize a condition phrase to the extractor's vocabulary
+def _normalize_condition(condition: str) -> str:
+    condition = condition.lower()
+    if condition in ("brand new", "new"):
+        return "new"
+    if condition in ("refurbished", "renewed"):
+        return "refurbished"
+    return "used"
+
+
+# extract product fields from raw text without an LLM
+def heuristic_extract(input_text: str) -> dict:
+    """
+    Best-effort, rule-based extraction used when the LLM is unavailable.
+
+    Returns a dictionary with the same fields as ProductSchema. Only values that
+    can be read directly from the text are filled in; input_confidence is kept low.
+    """
+    product = copy.deepcopy(ProductSchema)
+    text = " ".join(input_text.split())
+    lowered = text.lower()
+    remainder = text
+
+    ram = _RAM_PATTERN.search(text)
+    if ram:
+        product["attributes"]["ram"] = f"{ram.group(1)}GB"
+        remainder = remainder.replace(ram.group(0), " ")
+
+    storage = _STORAGE_PATTERN.search(remainder)
+    if storage:
+        product["attributes"]["storage"] = f"{storage.group(1)}{storage.group(2).upper()}"
+        remainder = remainder.replace(storage.group(0), " ")
+
+    condition = _CONDITION_PATTERN.search(remainder)
+    if condition:
+        product["condition"] = _normalize_condition(condition.group(1))
+        remainder = remainder.replace(condition.group(0), " ")
+
+    region = _REGION_PATTERN.search(remainder)
+    if region:
+        product["market_region"], product["currency"] = REGIONS[region.group(1).lower()]
+        remainder = remainder.replace(region.group(0), " ")
+
+    for brand in KNOWN_BRANDS:
+        if re.search(rf"\b{brand}\b", lowered):
+            product["brand"] = brand.upper() if len(brand) <= 3 else brand.title()
+            break
+    if not product["brand"]:
+        for line, brand in PRODUCT_LINE_BRANDS.items():
+            if line in lowered:
+                product["brand"] = brand
+                break
+
+    tokens = set(re.findall(r"[a-z0-9]+", lowered))
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if tokens.intersection(keywords):
+            product["category"] = category
+            break
+
+    # Whatever is left after removing specs and filler words is the product name
+    remainder = _FILLER_PATTERN.sub(" ", remainder)
+    product_name = " ".join(remainder.replace(",", " ").split())
+    product["product_name"] = product_name or text
+    product["search_keywords"] = [product["product_name"].lower()]
+    product["input_confidence"] = 0.3
+
+    return product
@@ -0,0 +1,45 @@
+from schemas.product_schema import ProductSchema
+import copy
+import json
+
+
+# One-line description of the extractor's JSON shape, used when re-prompting
+PRODUCT_SCHEMA_HINT = "Return only a JSON object with exactly these fields: " + json.dumps(ProductSchema, separators=(",", ":"))
+
+_LIST_FIELDS = ("search_keywords",)
+_ATTRIBUTE_LIST_FIELDS = ("specs", "features")
+
+
+# check that an extractor reply has the ProductSchema shape
+def validate_product_info(data) -> dict:
+    """
+    Raises ValueError describing the problems found, so the message can be
+    sent back to the model as-is. Missing fields are not an error; they are
+    filled from ProductSchema.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+
+    problems = []
+    unknown = sorted(set(data) - set(ProductSchema))
+    if unknown:
+        problems.append(f"unknown fields {unknown}")
+
+    attributes = data.get("attributes")
+    if attributes is not None and not isinstance(attributes, dict):
+        problems.append("attributes must be an object")
+    elif attributes:
+        for field in _ATTRIBUTE_LIST_FIELDS:
+            if attributes.get(field) is not None and not isinstance(attributes[field], list):
+                problems.append(f"attributes.{field} must be a list")
+    for field in _LIST_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], list):
+            problems.append(f"{field} must be a list")
+
+    confidence = data.get("input_confidence")
+    if confidence is not None and not isinstance(confidence, (int, float)):
+        problems.append("input_confidence must be a number")
+
+    if problems:
+        raise ValueError("; ".join(problems))
+    return {**copy.deepcopy(ProductSchema), **data}
@@ -0,0 +1,77 @@
+from services.fetcher_logic.offer_table import OfferTable
+from services.fetcher_logic.outlier_filter import outlier_mask
+from services.fetcher_logic.price_sketch import PriceSketch
+from schemas.fetcher_schema import FetcherOutput
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+# build the FetcherOutput for a product's offers
+def build_fetcher_output(product_info: dict, offers: OfferTable, currency: str, sources: Optional[Dict[str, dict]] = None) -> FetcherOutput:
+    """
+    Computes the price statistics and trend signal of an offer table (prices
+    in currency) and maps them to the FetcherOutput schema. The first offer
+    is the "current" price.
+
+    Outlier offers (see outlier_mask) are dropped before the statistics, so
+    the analyzer only sees the rest; the stats over all offers and the
+    dropped offers are kept in raw_price_stats and outliers. When the first
+    offer itself is an outlier, the first kept offer becomes the current
+    price and current_price_replaced is set (the original stays in
+    raw_price_stats["current"]). The kept prices are also summarized as a
+    quantile sketch (price_sketch).
+    """
+
+    # Drop outlier prices, keeping the unfiltered stats for reference
+    flagged = outlier_mask(offers.prices)
+    raw_stats = {**offers.summary(), "count": len(offers)}
+    outliers = offers.subset(flagged).to_records() if flagged.any() else []
+    offers = offers.subset(~flagged)
+    current_replaced = bool(len(flagged) and flagged[0] and len(offers))
+    if current_replaced:
+        print(f"⚠️ First offer ({raw_stats['current']:.2f} {currency}) is a price outlier; using the first kept offer as the current price.")
+    
+    # Calculate price statistics    
+    count = len(offers)
+    stats = offers.summary()
+    avg_price, lowest, highest, curr_price = stats["average"], stats["lowest"], stats["highest"], stats["current"]
+    
+    # Determine trend signals
+    trend_signals = {} 
+    if curr_price and avg_price:
+        if curr_price < avg_price:
+            trend_signals = {
+                "signal" : "buy",
+                "reason" : "below_market_average",
+                "percentage_difference" : round(((avg_price - curr_price) / avg_price )* 100, 2)
+            }
+        elif curr_price > avg_price:
+            trend_signals = {
+                "signal" : "wait",
+                "reason" : "above_market_average",
+                "percentage_diffference" : round(((curr_price - avg_price) / avg_price) * 100, 2)
+            }    
+        else:
+            trend_signals = { "signal" : "neutral", "reason" : "at_market_average"}    
+    
+    # Build and return the FetcherOutput 
+    return FetcherOutput(
+        product_name = product_info.get("product_name", "Unknown Product"),
+        brand = product_info.get("brand"),
+        model = product_info.get("model"),
+        market_region = product_info.get("market_region"),
+        currency = currency,
+        timestamp = datetime.now(timezone.utc).isoformat() + "Z",          # Coordinated Universal Time (UTC), eg: ISO 8601 format "2025-12-13 17:33:14.500000Z" Z: zulu time        
+        current_price = curr_price,
+        lowest_price = lowest,
+        highest_price = highest,
+        average_price = avg_price,
+        seller_count = count,
+        offers = offers,
+        trend_signals = trend_signals,
+        sources = sources,
+        raw_price_stats = raw_stats,
+        current_price_replaced = current_replaced,
+        outliers = outliers,
+        price_sketch = PriceSketch.from_prices(offers.prices).to_dict() if count else None
+    )
@@ -0,0 +1,130 @@
+from services.config_logic.settings import get_settings
+from services.extractor_logic.heuristic_parser import REGIONS
+from services.metrics_logic.registry import EXTERNAL_CALL_LATENCY, timed
+from typing import Dict, Optional
+import json
+import os
+import threading
+import time
+import requests
+
+FX_RATES_PATH = get_settings().fx_rates_path
+FX_RATES_URL = get_settings().fx_rates_url
+FX_RATES_MAX_AGE_SECONDS = get_settings().fx_rates_max_age_seconds
+
+# Units of each currency per 1 USD, used until a fresher table is cached
+DEFAULT_USD_RATES = {
+    "USD": 1.0, "EUR": 0.92, "GBP": 0.79, "INR": 83.0, "CAD": 1.36,
+    "AUD": 1.52, "JPY": 150.0, "CNY": 7.2, "SGD": 1.34, "AED": 3.67,
+}
+
+CURRENCY_SYMBOLS = {
+    "USD": "$", "EUR": "€", "GBP": "£", "INR": "₹", "CAD": "C$",
+    "AUD": "A$", "JPY": "¥", "CNY": "CN¥", "SGD": "S$", "AED": "AED ",
+}
+
+# Google country code -> local currency
+REGION_CURRENCIES = {code: currency for code, currency in REGIONS.values()}
+
+
+# local currency of a market region, or None if unknown
+def region_currency(market_region: Optional[str]) -> Optional[str]:
+    return REGION_CURRENCIES.get((market_region or "").strip().lower())
+
+
+# price with the symbol of its currency, e.g. "₹74,999.00"
+def format_money(amount: Optional[float], currency: Optional[str] = "USD") -> str:
+    if amount is None:
+        return "N/A"
+    currency = (currency or "USD").upper()
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    if symbol is None:
+        return f"{amount:,.2f} {currency}"
+    return f"{symbol}{amount:,.2f}"
+
+
+class FXTable:
+    """
+    USD-based exchange rate table, cached on disk.
+
+    Rates are read from FX_RATES_PATH; when the file is older than
+    FX_RATES_MAX_AGE_SECONDS and FX_RATES_URL is set, a fresh table is
+    downloaded and written back. Without either, the built-in defaults
+    are used, so conversion never needs the network on the request path.
+    """
+
+    def __init__(self, path: Optional[str] = FX_RATES_PATH, url: Optional[str] = FX_RATES_URL, max_age_seconds: float = FX_RATES_MAX_AGE_SECONDS):
+        self.path = path
+        self.url = url
+        self.max_age_seconds = max_age_seconds
+        self.rates: Dict[str, float] = dict(DEFAULT_USD_RATES)
+        self.updated_at = 0.0
+        self.source = "defaults"
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            self.rates.update({code.upper(): float(rate) for code, rate in cached["rates"].items()})
+            self.updated_at = float(cached.get("updated_at", 0.0))
+            self.source = "cache"
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ FX rate cache unreadable, using defaults: {e}")
+
+    def refresh(self, force: bool = False) -> bool:
+        """Downloads fresh rates if the cached table is stale. Returns True if rates changed."""
+        if not self.url or (not force and time.time() - self.updated_at < self.max_age_seconds):
+            return False
+        try:
+            with timed(EXTERNAL_CALL_LATENCY, "fx_rates"):
+                response = requests.get(self.url, timeout=5)
+            rates = response.json()["rates"]
+        except Exception as e:
+            print(f"⚠️ FX rate refresh failed, keeping cached rates: {e}")
+            return False
+
+        with self._lock:
+            self.rates.update({code.upper(): float(rate) for code, rate in rates.items()})
+            self.updated_at = time.time()
+            self.source = "remote"
+            snapshot = {"rates": self.rates, "updated_at": self.updated_at}
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+        return True
+
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Units of to_currency per unit of from_currency, or None if either is unknown."""
+        with self._lock:
+            source = self.rates.get((from_currency or "").upper())
+            target = self.rates.get((to_currency or "").upper())
+        if not source or not target:
+            return None
+        return target / source
+
+    def convert(self, amount: Optional[float], from_currency: str, to_currency: str) -> Optional[float]:
+        rate = self.rate(from_currency, to_currency)
+        if amount is None or rate is None:
+            return None
+        return round(amount * rate, 2)
+
+
+_fx_table: Optional[FXTable] = None
+_fx_lock = threading.Lock()
+
+
+# process-wide FX table, refreshed in the background of the first call when stale
+def get_fx_table() -> FXTable:
+    global _fx_table
+    with _fx_lock:
+        if _fx_table is None:
+            _fx_table = FXTable()
+            threading.Thread(target=_fx_table.refresh, name="fx-refresh", daemon=True).start()
+        return _fx_table
@@ -0,0 +1,182 @@
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from services.concurrency_logic.deadline import DeadlineExceeded, bounded_timeout, mark_degraded, request_deadline
+from services.config_logic.settings import get_settings
+from services.fetcher_logic.fetcher_output import build_fetcher_output
+from services.fetcher_logic.fx_rates import get_fx_table
+from services.fetcher_logic.offer_sources import OfferBatch, OfferSource, ReplaySource, get_offer_sources, target_currency
+from services.fetcher_logic.offer_table import OfferTable
+from schemas.fetcher_schema import FetcherOutput
+from typing import Any, Dict, List, Optional, Union
+import threading
+import time
+
+OFFER_REPLAY_RECORD = get_settings().offer_replay_record
+
+# Shared by all fetches so concurrent requests cannot spawn unbounded threads
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="offer-source")
+
+
+class OfferSourceStats:
+    """Per-source fetch counters: fetches, failures, timeouts, offers returned and total latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, name: str, result: Union[OfferBatch, Exception]) -> None:
+        with self._lock:
+            counters = self._counters[name]
+            counters["fetches"] += 1
+            if isinstance(result, OfferBatch):
+                counters["offers"] += len(result.offers)
+                counters["latency_ms"] += int(result.latency_seconds * 1000)
+            else:
+                counters["failures"] += 1
+                counters["timeouts"] += isinstance(result, TimeoutError)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            snapshot = {}
+            for name, counters in self._counters.items():
+                answered = counters["fetches"] - counters["failures"]
+                snapshot[name] = {
+                    "fetches": counters["fetches"],
+                    "failures": counters["failures"],
+                    "timeouts": counters["timeouts"],
+                    "offers": counters["offers"],
+                    "avg_latency_ms": round(counters["latency_ms"] / answered, 1) if answered else None,
+                }
+            return snapshot
+
+
+OFFER_SOURCE_STATS = OfferSourceStats()
+
+_recorder: Optional[ReplaySource] = None
+_recorder_lock = threading.Lock()
+
+
+# append a live batch to the replay file (OFFER_REPLAY_RECORD)
+def _record_for_replay(query: str, product_info: dict, batch: OfferBatch) -> None:
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = ReplaySource()
+    try:
+        _recorder.record(query, product_info, batch)
+    except OSError as e:
+        print(f"⚠️ Offer replay recording failed: {e}")
+
+
+# fetch one source, within its own timeout
+def _fetch_source(source: OfferSource, query: str, product_info: dict) -> OfferBatch:
+    started = time.monotonic()
+    with request_deadline(source.timeout_seconds):
+        batch = source.fetch(query, product_info)
+    batch.latency_seconds = time.monotonic() - started
+    return batch
+
+
+# query offer sources in parallel
+def collect_offers(product_info: dict, query: str, sources: Optional[List[OfferSource]] = None, prefetched: Optional[Dict[str, dict]] = None) -> Dict[str, Union[OfferBatch, Exception]]:
+    """
+    Fetches every source concurrently and waits for each at most its
+    timeout (and never past the request deadline), so a slow source only
+    loses its own offers.
+
+    Args:
+        product_info: Product details of the search
+        query: Search query built from product_info
+        sources: Sources to query; the OFFER_SOURCES ones when omitted
+        prefetched: Source name -> raw payload already fetched for this search
+            (the speculative SerpAPI search); that source normalizes it instead of fetching
+
+    Returns:
+        Source name -> OfferBatch, or the exception the source failed with, in source order
+    """
+    sources = sources if sources is not None else get_offer_sources()
+    prefetched = prefetched or {}
+    started = time.monotonic()
+
+    # Submit first so every source is running before any wait starts
+    futures = {}
+    for source in sources:
+        if source.name not in prefetched:
+            futures[source.name] = _executor.submit(copy_context().run, _fetch_source, source, query, product_info)
+
+    results: Dict[str, Union[OfferBatch, Exception]] = {}
+    for source in sources:
+        future = futures.get(source.name)
+        try:
+            if future is None:
+                result = source.batch_from_payload(product_info, prefetched[source.name])
+            elif future.done():
+                # Finished while earlier sources were awaited; usable even once the deadline has passed
+                result = future.result()
+            else:
+                remaining = max(0.0, source.timeout_seconds - (time.monotonic() - started))
+                result = future.result(timeout=bounded_timeout(remaining, what=f"{source.name} offers"))
+        except DeadlineExceeded as e:
+            result = e
+        except TimeoutError:
+            result = TimeoutError(f"{source.name} offers timed out after {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            result = e
+        if isinstance(result, TimeoutError) and future is not None:
+            # Not started yet: drop it; already running: it stops at its own deadline
+            future.cancel()
+        OFFER_SOURCE_STATS.record(source.name, result)
+        results[source.name] = result
+
+        if OFFER_REPLAY_RECORD and source.recordable and isinstance(result, OfferBatch) and not result.error and len(result.offers):
+            _record_for_replay(query, product_info, result)
+    return results
+
+
+# merge source results into one FetcherOutput
+def merge_offer_batches(product_info: dict, results: Dict[str, Union[OfferBatch, Exception]]) -> FetcherOutput:
+    """
+    Converts every batch to the searched region's currency and appends them
+    in source order (so the first source's first offer is the current price).
+    Per-source offer counts, latencies and errors go to FetcherOutput.sources.
+    """
+    currency = target_currency(product_info)
+    fx = get_fx_table()
+    tables, sources = [], {}
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            sources[name] = {"offers": 0, "latency_seconds": None, "error": str(result) or type(result).__name__}
+            continue
+        rate = 1.0 if result.currency == currency else fx.rate(result.currency, currency)
+        if rate is not None:
+            tables.append(result.offers.scaled(rate))
+        sources[name] = {
+            "offers": len(result.offers) if rate is not None else 0,
+            "latency_seconds": round(result.latency_seconds, 3),
+            "error": result.error if rate is not None else f"no FX rate for {result.currency}",
+        }
+    return build_fetcher_output(product_info, OfferTable.concat(tables), currency, sources)
+
+
+# fetch a product's offers from all enabled sources
+def fetch_offers(product_info: dict, query: str, prefetched: Optional[Dict[str, dict]] = None) -> FetcherOutput:
+    """
+    Collects and merges the offers of every enabled source. When some
+    sources fail the others' offers are used and the fetch is marked
+    degraded; when all fail, the first source's error is raised.
+    """
+    results = collect_offers(product_info, query, prefetched=prefetched)
+    failures = {name: result for name, result in results.items() if isinstance(result, Exception)}
+    if failures and len(failures) == len(results):
+        raise next(iter(failures.values()))
+    if failures:
+        reason = "; ".join(f"{name}: {error}" for name, error in failures.items())
+        print(f"⚠️ Fetching without some offer sources: {reason}")
+        mark_degraded("fetcher", "partial_sources", reason)
+    return merge_offer_batches(product_info, results)
+
+
+# fetch counters of every offer source used so far
+def offer_source_stats() -> Dict[str, Dict[str, Any]]:
+    return OFFER_SOURCE_STATS.snapshot()
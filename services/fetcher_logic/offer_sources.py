@@ -0,0 +1,255 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from services.catalog_logic.catalog_index import get_catalog
+from services.catalog_logic.identity import identity_fields, identity_key
+from services.concurrency_logic.cpu_pool import run_cpu
+from services.config_logic.settings import get_settings
+from services.fetcher_logic.fx_rates import get_fx_table, region_currency
+from services.fetcher_logic.offer_table import OfferTable
+from services.fetcher_logic.price_parser import parse_prices
+from services.fetcher_logic.serpapi_client import search_google_shopping
+from services.fetcher_logic.serpapi_parser import serpapi_offer_table
+from typing import Any, Callable, Dict, List, Optional
+import json
+import math
+import os
+import re
+import threading
+
+OFFER_SOURCES = get_settings().offer_sources
+OFFER_SOURCE_TIMEOUT_SECONDS = get_settings().offer_source_timeout_seconds
+OFFER_FILE_PATH = get_settings().offer_file_path
+OFFER_REPLAY_PATH = get_settings().offer_replay_path
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class OfferBatch:
+    """
+    Offers from one source for one search, normalized to an offer table with
+    every price in currency. error is set when the source answered without
+    offers it could use (e.g. SerpAPI reporting no results).
+    """
+    source: str
+    offers: OfferTable
+    currency: str
+    error: Optional[str] = None
+    latency_seconds: float = 0.0
+
+
+class OfferSource:
+    """
+    Somewhere offers come from. Subclasses set name and implement fetch().
+
+    fetch() runs on a collector thread, inside a request deadline of the
+    source's timeout, so network calls bounded with bounded_timeout() stop
+    when the source runs out of time. An exception fails this source only;
+    the other sources' offers are still used.
+    """
+
+    name: str = "source"
+    # Whether fetches are worth recording for the replay source
+    recordable: bool = True
+
+    def __init__(self, timeout_seconds: Optional[float] = None):
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else source_timeout_seconds(self.name)
+
+    def fetch(self, query: str, product_info: dict) -> OfferBatch:
+        raise NotImplementedError
+
+    def batch_from_payload(self, product_info: dict, data: Any) -> OfferBatch:
+        """Normalizes a raw response fetched elsewhere (only sources that support prefetching implement this)."""
+        raise NotImplementedError(f"{self.name} does not accept prefetched payloads")
+
+
+# timeout of one source: OFFER_SOURCE_TIMEOUT_<NAME> or the shared default
+def source_timeout_seconds(name: str) -> float:
+    override = get_settings().env(f"OFFER_SOURCE_TIMEOUT_{name.upper()}")
+    return float(override) if override else OFFER_SOURCE_TIMEOUT_SECONDS
+
+
+# currency a search in this product's region is normalized to
+def target_currency(product_info: dict) -> str:
+    return region_currency(product_info.get("market_region")) or product_info.get("currency") or "USD"
+
+
+# build a batch from offer dicts ({"seller", "price", optional "currency", "rating", "reviews"})
+def batch_from_rows(source: str, rows: List[dict], currency: str) -> OfferBatch:
+    """
+    Prices may be numbers or price strings; offers in another currency are
+    converted to currency, and dropped when there is no FX rate for them.
+    """
+    parsed = parse_prices([row.get("price") for row in rows], default_currency=currency)
+    fx = get_fx_table()
+    prices, kept = [], []
+    for row, amount, detected in zip(rows, parsed.prices.tolist(), parsed.currencies.tolist()):
+        row_currency = str(row.get("currency") or detected or currency).upper()
+        rate = 1.0 if row_currency == currency else fx.rate(row_currency, currency)
+        if math.isnan(amount) or rate is None:
+            continue
+        prices.append(amount * rate)
+        kept.append(row)
+    offers = OfferTable.from_columns(
+        prices=prices,
+        sellers=[row.get("seller") or "Unknown Seller" for row in kept],
+        ratings=[row.get("rating") for row in kept],
+        reviews=[row.get("reviews") for row in kept]
+    )
+    return OfferBatch(source, offers, currency)
+
+
+class _JsonlFile:
+    """A JSON-lines file read into an index on first use and re-read whenever it changes on disk."""
+
+    def __init__(self, path: str, build_index: Callable[[List[dict]], Any]):
+        self.path = path
+        self.build_index = build_index
+        self.lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._index = build_index([])
+
+    def index(self) -> Any:
+        with self.lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return self._index
+            if mtime != self._mtime:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._index = self.build_index([json.loads(line) for line in f if line.strip()])
+                self._mtime = mtime
+            return self._index
+
+
+class SerpApiSource(OfferSource):
+    """Google Shopping through SerpAPI; rate limiting, coalescing and the stale fallback come from search_google_shopping."""
+
+    name = "serpapi"
+
+    def fetch(self, query: str, product_info: dict) -> OfferBatch:
+        return self.batch_from_payload(product_info, search_google_shopping(query, product_info.get("market_region")))
+
+    def batch_from_payload(self, product_info: dict, data: dict) -> OfferBatch:
+        """Normalizes a raw SerpAPI payload, e.g. one fetched speculatively (in a worker process for batch runs)."""
+        offers, currency = run_cpu(serpapi_offer_table, product_info, data)
+        return OfferBatch(self.name, offers, currency, error=data.get("error"))
+
+
+class LocalFileSource(OfferSource):
+    """
+    Offers kept in a local JSON-lines file, one offer per line: the product
+    (a catalog product_id, or product fields as the extractor outputs them:
+    product_name, brand, model, attributes, condition, market_region) plus
+    seller, price and optionally currency, rating and reviews.
+
+    Lines are matched to catalog products without adding to the catalog, so
+    spelling variants of a known product find the same offers; lines of
+    products the catalog does not know are kept under their identity key and
+    found by searches with the same normalized fields.
+    """
+
+    name = "local"
+    recordable = False
+
+    def __init__(self, path: str = OFFER_FILE_PATH, timeout_seconds: Optional[float] = None):
+        super().__init__(timeout_seconds)
+        self.file = _JsonlFile(path, self._index_by_product)
+
+    @staticmethod
+    def _index_by_product(rows: List[dict]) -> Dict[str, List[dict]]:
+        catalog = get_catalog()
+        by_product = defaultdict(list)
+        for row in rows:
+            by_product[row.get("product_id") or catalog.match(row) or identity_key(identity_fields(row))].append(row)
+        return by_product
+
+    def fetch(self, query: str, product_info: dict) -> OfferBatch:
+        index = self.file.index()
+        rows = index.get(get_catalog().resolve(product_info), []) + index.get(identity_key(identity_fields(product_info)), [])
+        return batch_from_rows(self.name, rows, target_currency(product_info))
+
+
+class ReplaySource(OfferSource):
+    """
+    Serves offers recorded from earlier live fetches (see OFFER_REPLAY_RECORD),
+    keyed by search query and region: the latest recording of each original
+    source is replayed. For offline runs, demos and reproducible benchmarks.
+    """
+
+    name = "replay"
+    recordable = False
+
+    def __init__(self, path: str = OFFER_REPLAY_PATH, timeout_seconds: Optional[float] = None):
+        super().__init__(timeout_seconds)
+        self.file = _JsonlFile(path, self._index_by_search)
+
+    @staticmethod
+    def search_key(query: str, market_region: Optional[str]) -> str:
+        return f"{(market_region or '').lower()}|{_WHITESPACE.sub(' ', query.strip().lower())}"
+
+    @staticmethod
+    def _index_by_search(records: List[dict]) -> Dict[str, Dict[str, dict]]:
+        # search key -> original source -> latest recording
+        index = defaultdict(dict)
+        for record in records:
+            index[record["key"]][record["source"]] = record
+        return index
+
+    def fetch(self, query: str, product_info: dict) -> OfferBatch:
+        recordings = self.file.index().get(self.search_key(query, product_info.get("market_region")), {})
+        rows = [{**offer, "currency": recording["currency"]} for recording in recordings.values() for offer in recording["offers"]]
+        return batch_from_rows(self.name, rows, target_currency(product_info))
+
+    def record(self, query: str, product_info: dict, batch: OfferBatch) -> None:
+        """Appends a live batch to the replay file."""
+        offers = batch.offers
+        record = {
+            "key": self.search_key(query, product_info.get("market_region")),
+            "source": batch.source,
+            "currency": batch.currency,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "offers": [
+                {"seller": seller, "price": price, "rating": None if math.isnan(rating) else rating, "reviews": None if math.isnan(reviews) else reviews}
+                for seller, price, rating, reviews in zip(offers.seller_names().tolist(), offers.prices.tolist(), offers.ratings.tolist(), offers.reviews.tolist())
+            ],
+        }
+        with self.file.lock:
+            directory = os.path.dirname(self.file.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.file.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+# Source name -> factory; OFFER_SOURCES picks from these by name
+OFFER_SOURCE_FACTORIES: Dict[str, Callable[[], OfferSource]] = {
+    "serpapi": SerpApiSource,
+    "local": LocalFileSource,
+    "replay": ReplaySource,
+}
+
+_sources: Optional[List[OfferSource]] = None
+_sources_lock = threading.Lock()
+
+
+# make an offer source available to OFFER_SOURCES under its name
+def register_offer_source(name: str, factory: Callable[[], OfferSource]) -> None:
+    global _sources
+    with _sources_lock:
+        OFFER_SOURCE_FACTORIES[name] = factory
+        _sources = None
+
+
+# process-wide instances of the sources enabled in OFFER_SOURCES, in that order
+def get_offer_sources() -> List[OfferSource]:
+    global _sources
+    with _sources_lock:
+        if _sources is None:
+            names = [name.strip().lower() for name in OFFER_SOURCES.split(",") if name.strip()]
+            unknown = [name for name in names if name not in OFFER_SOURCE_FACTORIES]
+            if unknown:
+                raise ValueError(f"Unknown offer sources {unknown}; available: {sorted(OFFER_SOURCE_FACTORIES)}")
+            _sources = [OFFER_SOURCE_FACTORIES[name]() for name in dict.fromkeys(names)]
+        return _sources
@@ -0,0 +1,158 @@
+from typing import Any, Dict, Iterable, List, Optional
+import hashlib
+import numpy as np
+import sys
+
+# Numeric columns in the order they are packed for pickling
+PACKED_COLUMNS = (("prices", np.float64), ("reviews", np.float64), ("seller_codes", np.int32), ("ranks", np.int32), ("ratings", np.float32))
+
+
+class OfferTable:
+    """
+    Columnar list of offers for one product.
+
+    prices, ranks, ratings and reviews are parallel NumPy arrays (NaN where a
+    rating or review count is unknown); sellers are stored once each, as
+    interned strings, with seller_codes pointing into them. Offers stay in
+    this form from the fetcher through the analyzer and are only turned into
+    PriceDistribution models when FetcherOutput is serialized.
+
+    Tables pickle as one packed buffer (e.g. to and from CPU pool workers);
+    the unpickled columns are read-only views into it.
+    """
+
+    __slots__ = ("prices", "ranks", "ratings", "reviews", "seller_codes", "sellers")
+
+    def __init__(self, prices=None, seller_codes=None, sellers=(), ranks=None, ratings=None, reviews=None):
+        self.prices = np.asarray(prices if prices is not None else [], dtype=np.float64)
+        count = len(self.prices)
+        self.seller_codes = np.asarray(seller_codes if seller_codes is not None else np.zeros(count), dtype=np.int32)
+        self.sellers = tuple(sellers)
+        # Rank is the offer's 1-based position among valid offers, as used for source_rank
+        self.ranks = np.asarray(ranks if ranks is not None else np.arange(1, count + 1), dtype=np.int32)
+        self.ratings = np.asarray(ratings if ratings is not None else np.full(count, np.nan), dtype=np.float32)
+        self.reviews = np.asarray(reviews if reviews is not None else np.full(count, np.nan), dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __repr__(self) -> str:
+        return f"OfferTable({len(self)} offers, {len(self.sellers)} sellers)"
+
+    def __reduce__(self):
+        packed = b"".join(np.ascontiguousarray(getattr(self, name), dtype=dtype).tobytes() for name, dtype in PACKED_COLUMNS)
+        return (_unpack_offer_table, (packed, len(self), self.sellers))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, OfferTable) and self.fingerprint() == other.fingerprint()
+
+    @classmethod
+    def from_columns(cls, prices: Iterable[float], sellers: Iterable[Optional[str]], ratings: Iterable[Any] = None, reviews: Iterable[Any] = None) -> "OfferTable":
+        """Builds a table from per-offer columns, interning seller names."""
+        codes, unique, lookup = [], [], {}
+        for seller in sellers:
+            name = sys.intern(seller) if seller else ""
+            code = lookup.get(name)
+            if code is None:
+                code = lookup[name] = len(unique)
+                unique.append(name)
+            codes.append(code)
+        to_float = lambda values: [v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values] if values is not None else None
+        return cls(prices=list(prices), seller_codes=codes, sellers=unique, ratings=to_float(ratings), reviews=to_float(reviews))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> "OfferTable":
+        """Builds a table from PriceDistribution models or {"seller", "price"} dicts, skipping offers without a price."""
+        prices, sellers = [], []
+        for record in records:
+            price = record.get("price") if isinstance(record, dict) else getattr(record, "price", None)
+            seller = record.get("seller") if isinstance(record, dict) else getattr(record, "seller", None)
+            if price is None:
+                continue
+            prices.append(price)
+            sellers.append(seller)
+        return cls.from_columns(prices, sellers)
+
+    @classmethod
+    def concat(cls, tables: Iterable["OfferTable"]) -> "OfferTable":
+        """Appends tables in order, merging their seller lists and renumbering ranks."""
+        tables = [table for table in tables if len(table)]
+        if not tables:
+            return cls()
+        if len(tables) == 1:
+            return tables[0]
+        sellers, lookup, codes = [], {}, []
+        for table in tables:
+            remap = []
+            for seller in table.sellers:
+                code = lookup.get(seller)
+                if code is None:
+                    code = lookup[seller] = len(sellers)
+                    sellers.append(seller)
+                remap.append(code)
+            codes.append(np.asarray(remap, dtype=np.int32)[table.seller_codes])
+        return cls(
+            prices=np.concatenate([table.prices for table in tables]),
+            seller_codes=np.concatenate(codes),
+            sellers=sellers,
+            ratings=np.concatenate([table.ratings for table in tables]),
+            reviews=np.concatenate([table.reviews for table in tables])
+        )
+
+    def scaled(self, factor: float) -> "OfferTable":
+        """Copy with every price multiplied by factor (e.g. an FX rate)."""
+        if factor == 1:
+            return self
+        return OfferTable(prices=self.prices * factor, seller_codes=self.seller_codes, sellers=self.sellers, ranks=self.ranks, ratings=self.ratings, reviews=self.reviews)
+
+    def subset(self, keep: np.ndarray) -> "OfferTable":
+        """The offers where keep is True, in order; ranks still give their position in the full table."""
+        if keep.all():
+            return self
+        return OfferTable(prices=self.prices[keep], seller_codes=self.seller_codes[keep], sellers=self.sellers, ranks=self.ranks[keep], ratings=self.ratings[keep], reviews=self.reviews[keep])
+
+    def seller_names(self) -> np.ndarray:
+        """Seller name of every offer, as an object array."""
+        return np.array(self.sellers, dtype=object)[self.seller_codes] if len(self) else np.array([], dtype=object)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """current (first offer), lowest, highest and average price; all None when empty."""
+        if not len(self):
+            return {"current": None, "lowest": None, "highest": None, "average": None}
+        return {
+            "current": float(self.prices[0]),
+            "lowest": float(self.prices.min()),
+            "highest": float(self.prices.max()),
+            "average": float(self.prices.sum()) / len(self),
+        }
+
+    def lowest_by_seller(self, limit: Optional[int] = None) -> Dict[str, float]:
+        """Lowest price of each seller, cheapest seller first; only the limit cheapest sellers when given."""
+        if not len(self):
+            return {}
+        lowest = np.full(len(self.sellers), np.inf)
+        np.minimum.at(lowest, self.seller_codes, self.prices)
+        order = np.argsort(lowest, kind="stable")
+        order = order[np.isfinite(lowest[order])][:limit]
+        return {self.sellers[code]: float(lowest[code]) for code in order.tolist()}
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [{"seller": seller, "price": price} for seller, price in zip(self.seller_names().tolist(), self.prices.tolist())]
+
+    def fingerprint(self) -> str:
+        """Content hash of the prices and sellers, for cache keys."""
+        digest = hashlib.sha256(self.prices.tobytes())
+        digest.update(self.seller_codes.tobytes())
+        digest.update("\x1f".join(self.sellers).encode("utf-8"))
+        return digest.hexdigest()
+
+
+# rebuild a pickled table as array views into its packed buffer, without copying the columns
+def _unpack_offer_table(packed: bytes, count: int, sellers: tuple) -> OfferTable:
+    table = OfferTable.__new__(OfferTable)
+    offset = 0
+    for name, dtype in PACKED_COLUMNS:
+        setattr(table, name, np.frombuffer(packed, dtype=dtype, count=count, offset=offset))
+        offset += count * np.dtype(dtype).itemsize
+    table.sellers = tuple(sys.intern(seller) for seller in sellers)
+    return table
@@ -0,0 +1,73 @@
+from services.config_logic.settings import get_settings
+import numpy as np
+
+OUTLIER_METHOD = get_settings().outlier_method.strip().lower()
+OUTLIER_MAD_THRESHOLD = get_settings().outlier_mad_threshold
+OUTLIER_IQR_FACTOR = get_settings().outlier_iqr_factor
+OUTLIER_MIN_OFFERS = get_settings().outlier_min_offers
+OUTLIER_MIN_DEVIATION = get_settings().outlier_min_deviation
+
+# MAD of a normal distribution is 0.6745 standard deviations; scaling by it makes modified z-scores read like z-scores
+_MAD_SCALE = 0.6745
+# Mean absolute deviation of a normal distribution is 0.7979 standard deviations (used when the MAD is 0)
+_MEAN_AD_SCALE = 0.7979
+
+
+# modified z-score fence around the median
+def _mad_outliers(prices: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Flags prices whose modified z-score 0.6745 * |x - median| / MAD exceeds
+    threshold. When more than half the offers share one price the MAD is 0,
+    so the mean absolute deviation stands in for it; identical prices flag nothing.
+    """
+    median = np.median(prices)
+    deviations = np.abs(prices - median)
+    mad = np.median(deviations)
+    if mad > 0:
+        return _MAD_SCALE * deviations / mad > threshold
+    mean_ad = deviations.mean()
+    if mean_ad > 0:
+        return _MEAN_AD_SCALE * deviations / mean_ad > threshold
+    return np.zeros(len(prices), dtype=bool)
+
+
+# Tukey fences around the interquartile range
+def _iqr_outliers(prices: np.ndarray, factor: float) -> np.ndarray:
+    q1, q3 = np.percentile(prices, [25, 75])
+    iqr = q3 - q1
+    if iqr <= 0:
+        # Most offers share one price: the fences would flag every other price
+        return _mad_outliers(prices, OUTLIER_MAD_THRESHOLD)
+    return (prices < q1 - factor * iqr) | (prices > q3 + factor * iqr)
+
+
+# flag offer prices far from the bulk of the offers (accessories, bundles, mis-parsed prices)
+def outlier_mask(prices: np.ndarray, method: str = OUTLIER_METHOD, min_offers: int = OUTLIER_MIN_OFFERS, min_deviation: float = OUTLIER_MIN_DEVIATION) -> np.ndarray:
+    """
+    Boolean mask of the prices to leave out of the price statistics.
+
+    Args:
+        prices: Offer prices, in one currency
+        method: "mad" (median/MAD modified z-score), "iqr" (Tukey fences) or "none"
+        min_offers: Fewer offers than this are never filtered, as there is no bulk to compare with
+        min_deviation: Prices within this fraction of the median are never flagged, however
+            tightly the other offers cluster (e.g. $489 among four $499 offers is a deal, not an outlier)
+
+    Both methods are built on medians and percentiles, which NumPy finds by
+    partitioning rather than sorting, so the cost stays linear in the offers.
+    The median is never flagged, so at least half the offers are always kept.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    flagged = np.zeros(len(prices), dtype=bool)
+    usable = np.isfinite(prices)
+    if method == "none" or usable.sum() < max(min_offers, 3):
+        return flagged
+    if method == "mad":
+        flagged[usable] = _mad_outliers(prices[usable], OUTLIER_MAD_THRESHOLD)
+    elif method == "iqr":
+        flagged[usable] = _iqr_outliers(prices[usable], OUTLIER_IQR_FACTOR)
+    else:
+        raise ValueError(f"Unknown outlier method {method!r}; use mad, iqr or none")
+    median = np.median(prices[usable])
+    flagged &= np.abs(prices - median) > min_deviation * abs(median)
+    return flagged
@@ -1,31 +1,165 @@
-from typing import Any, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple
+import math
+import numpy as np
 import re
 
+
+# Currency symbols and codes, upper-cased
+CURRENCY_MARKERS = {
+    "US$": "USD", "CA$": "CAD", "C$": "CAD", "AU$": "AUD", "A$": "AUD", "S$": "SGD", "HK$": "HKD", "R$": "BRL",
+    "$": "USD", "€": "EUR", "£": "GBP", "₹": "INR", "RS.": "INR", "RS": "INR", "¥": "JPY", "￥": "JPY", "₩": "KRW",
+    "USD": "USD", "EUR": "EUR", "GBP": "GBP", "INR": "INR", "JPY": "JPY", "CAD": "CAD", "AUD": "AUD",
+    "CNY": "CNY", "SGD": "SGD", "AED": "AED", "CHF": "CHF", "BRL": "BRL", "KRW": "KRW", "HKD": "HKD",
+}
+
+# Symbols shared by several currencies; the region's currency wins when it is one of them
+AMBIGUOUS_MARKERS = {"$": {"USD", "CAD", "AUD", "SGD", "HKD", "NZD", "MXN"}, "¥": {"JPY", "CNY"}, "￥": {"JPY", "CNY"}}
+
+# Currencies whose locales write "1.299,99" (comma decimal, dot grouping)
+COMMA_DECIMAL_CURRENCIES = {"EUR", "BRL", "TRY", "DKK", "NOK", "SEK", "PLN", "CZK", "IDR", "VND"}
+
+# Candidate markers: a symbol, or a short letter run (optionally with "$" or ".") not inside a word
+_CURRENCY_PATTERN = re.compile(r"(?<![A-Za-z])([A-Za-z]{1,3}\$|[A-Za-z]{2,3}\.?|[$€£₹¥￥₩])(?![A-Za-z])")
+_NUMBER_PATTERN = re.compile(r"\d[\d.,'’\s\u00a0\u202f]*")
+_GROUP_SPACE_PATTERN = re.compile(r"['’\s\u00a0\u202f]")
+
+
+# currency code named in a price string, e.g. "1.299,00 €" -> "EUR"
+def detect_currency(text: str, default_currency: Optional[str] = None) -> Optional[str]:
+    for match in _CURRENCY_PATTERN.finditer(text):
+        marker = match.group(1).upper()
+        currency = CURRENCY_MARKERS.get(marker) or CURRENCY_MARKERS.get(marker.rstrip("."))
+        if currency is None:
+            continue
+        if default_currency in AMBIGUOUS_MARKERS.get(marker, ()):
+            return default_currency
+        return currency
+    return None
+
+
+# turn the digits and separators of one price into a float
+def _normalize_number(raw: str, comma_decimal: bool) -> Optional[float]:
+    """
+    Decides which separator is the decimal mark:
+      - spaces and apostrophes are always grouping ("1 299", "1'299")
+      - with both "." and ",", the last one is the decimal mark ("1.299,00", "1,299.00")
+      - a separator repeated is grouping ("1,09,999", "1.299.000")
+      - a single separator followed by exactly three digits is grouping unless
+        the locale says otherwise ("1,299" -> 1299; "1.299" -> 1299 for EUR)
+      - otherwise it is the decimal mark ("12,99", "12.99")
+    """
+    digits = _GROUP_SPACE_PATTERN.sub("", raw).rstrip(".,")
+    if not digits:
+        return None
+
+    last_dot, last_comma = digits.rfind("."), digits.rfind(",")
+    if last_dot >= 0 and last_comma >= 0:
+        decimal = "." if last_dot > last_comma else ","
+    elif last_dot < 0 and last_comma < 0:
+        return float(digits)
+    else:
+        separator = "." if last_dot >= 0 else ","
+        if digits.count(separator) > 1:
+            decimal = None
+        elif len(digits) - digits.rfind(separator) - 1 == 3:
+            decimal = None if (separator == ",") != comma_decimal else separator
+        else:
+            decimal = separator
+
+    grouping = {".", ","} - {decimal}
+    for mark in grouping:
+        digits = digits.replace(mark, "")
+    if decimal == ",":
+        digits = digits.replace(",", ".")
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+# parse one price string; memoized because offer lists repeat the same strings
+@lru_cache(maxsize=65536)
+def parse_price_text(text: str, default_currency: Optional[str] = None) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Returns (amount, currency code) for strings such as "$1,099.00",
+    "1.299,00 €", "₹1,09,999" or "CHF 1'299.50". The currency is detected
+    from symbols or ISO codes, falling back to default_currency, and decides
+    the decimal convention when the separators alone are ambiguous.
+    """
+    currency = detect_currency(text, default_currency) or default_currency
+    match = _NUMBER_PATTERN.search(text)
+    if not match:
+        return None, currency
+    return _normalize_number(match.group(0).strip(), currency in COMMA_DECIMAL_CURRENCIES), currency
+
+
 # convert various value types of prices to float
-def _clean_price(price_value: Any) -> Optional[float]:
+def _clean_price(price_value: Any, default_currency: Optional[str] = None) -> Optional[float]:
     """
     Robustly extracts a float price.
-    Handles: floats (10.99), strings ("$1,099.00"), and None.
-    """
-    
-    # Handle None
-    if price_value is None:
-        return None 
-    
-    # Handle float and int
+    Handles: floats (10.99), strings ("$1,099.00", "1.299,00 €"), and None.
+    """
+    if price_value is None or isinstance(price_value, bool):
+        return None
     if isinstance(price_value, (float, int)):
-        return float(price_value)
-    
-    # Handle string
+        return None if isinstance(price_value, float) and math.isnan(price_value) else float(price_value)
     if isinstance(price_value, str):
-        clean_str = re.sub(r'[^\d.]', '', price_value)
-        try:
-            return float(clean_str)
-        except ValueError:
-            return None 
-    
-    # For any other type,    
-    return None    
-        
-
-    
\ No newline at end of file
+        return parse_price_text(price_value, default_currency)[0]
+    return None
+
+
+@dataclass
+class ParsedPrices:
+    """Prices of a whole offer list: amounts (NaN where unparseable) and currency codes ('' if unknown)."""
+    prices: np.ndarray
+    currencies: np.ndarray
+
+    @property
+    def valid(self) -> np.ndarray:
+        return ~np.isnan(self.prices)
+
+
+# parse a list of raw prices in one call
+def parse_prices(values: Iterable[Any], default_currency: Optional[str] = None) -> ParsedPrices:
+    values = list(values)
+    prices = np.full(len(values), np.nan)
+    currencies = np.full(len(values), default_currency or "", dtype="<U3")
+    for index, value in enumerate(values):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            prices[index] = value
+        elif isinstance(value, str):
+            amount, currency = parse_price_text(value, default_currency)
+            if amount is not None:
+                prices[index] = amount
+            if currency:
+                currencies[index] = currency
+    return ParsedPrices(prices, currencies)
+
+
+# parse the prices of SerpAPI shopping results in one call
+def parse_offer_prices(items: List[dict], default_currency: Optional[str] = None) -> ParsedPrices:
+    """
+    Fast path: SerpAPI's numeric `extracted_price` is used as-is (the currency
+    still comes from the display `price` string when it names one). Items
+    without it fall back to parsing `price`, then `extracted_old_price`.
+    """
+    raw = []
+    display = []
+    for item in items:
+        extracted = item.get("extracted_price")
+        price_text = item.get("price")
+        if isinstance(extracted, (int, float)) and not isinstance(extracted, bool) and extracted:
+            raw.append(extracted)
+        else:
+            raw.append(price_text or item.get("extracted_old_price"))
+        display.append(price_text if isinstance(price_text, str) else "")
+
+    parsed = parse_prices(raw, default_currency)
+    for index, text in enumerate(display):
+        if text and not isinstance(raw[index], str):
+            currency = parse_price_text(text, default_currency)[1]
+            if currency:
+                parsed.currencies[index] = currency
+    return parsed
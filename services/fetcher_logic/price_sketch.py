@@ -0,0 +1,164 @@
+from services.config_logic.settings import get_settings
+from typing import Any, Dict, Iterable, Optional
+import math
+import numpy as np
+
+PRICE_SKETCH_COMPRESSION = get_settings().price_sketch_compression
+
+
+class PriceSketch:
+    """
+    Mergeable quantile sketch of prices (a merging t-digest).
+
+    Prices are kept as weighted centroids, small near the tails and larger
+    around the median, and a sketch never holds more than about compression
+    centroids however many prices it has seen. Sketches of different fetches
+    or regions merge into one that answers the same queries (quantiles, CDF,
+    histograms) as a sketch built from all their prices at once, within
+    roughly 1/compression of rank error.
+
+    Serializes to a small dict (to_dict / from_dict) stored with fetcher
+    outputs, region comparisons and watchlist history.
+    """
+
+    __slots__ = ("compression", "means", "weights", "min", "max")
+
+    def __init__(self, compression: int = PRICE_SKETCH_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return len(self.means)
+
+    def __repr__(self) -> str:
+        return f"PriceSketch({self.count:g} prices, {len(self)} centroids)"
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[float], compression: int = PRICE_SKETCH_COMPRESSION) -> "PriceSketch":
+        sketch = cls(compression)
+        sketch.add(prices)
+        return sketch
+
+    @classmethod
+    def merged(cls, sketches: Iterable[Optional["PriceSketch"]], compression: int = PRICE_SKETCH_COMPRESSION) -> "PriceSketch":
+        """One sketch summarizing every price seen by sketches (None entries are skipped)."""
+        result = cls(compression)
+        for sketch in sketches:
+            if sketch is not None:
+                result.merge(sketch)
+        return result
+
+    def add(self, prices: Iterable[float]) -> "PriceSketch":
+        """Adds a batch of prices; NaN and infinite prices are ignored."""
+        prices = np.asarray(list(prices) if not isinstance(prices, np.ndarray) else prices, dtype=np.float64)
+        prices = prices[np.isfinite(prices)]
+        if len(prices):
+            self._absorb(prices, np.ones(len(prices)), prices.min(), prices.max())
+        return self
+
+    def merge(self, other: "PriceSketch") -> "PriceSketch":
+        """Adds every price other has seen, in place."""
+        if len(other):
+            self._absorb(other.means, other.weights, other.min, other.max)
+        return self
+
+    def scaled(self, factor: float) -> "PriceSketch":
+        """Copy with every price multiplied by a positive factor (e.g. an FX rate)."""
+        sketch = PriceSketch(self.compression)
+        sketch.means, sketch.weights = self.means * factor, self.weights.copy()
+        sketch.min, sketch.max = self.min * factor, self.max * factor
+        return sketch
+
+    # fold centroids into the sketch and re-compress
+    def _absorb(self, means: np.ndarray, weights: np.ndarray, low: float, high: float) -> None:
+        """
+        Sorts all centroids and merges neighbours that fall in the same unit
+        of the k1 scale k(q) = compression / pi * asin(2q - 1), so centroids
+        stay small where q is near 0 or 1. Grouping by unit is one vectorized
+        pass (np.add.reduceat), not a per-centroid loop.
+        """
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        self.min, self.max = min(self.min, low), max(self.max, high)
+
+        total = weights.sum()
+        cumulative = np.cumsum(weights)
+        midpoints = np.clip((cumulative - weights / 2) / total, 0.0, 1.0)
+        units = np.floor(self.compression / math.pi * np.arcsin(2 * midpoints - 1))
+        starts = np.flatnonzero(np.r_[True, units[1:] != units[:-1]])
+
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q: Any) -> Any:
+        """
+        Estimated price at quantile q (a float or an array of floats in [0, 1]),
+        interpolating between centroid centres; NaN for an empty sketch.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if not len(self):
+            return np.full(q.shape, np.nan) if q.ndim else math.nan
+        total = self.count
+        centres = np.cumsum(self.weights) - self.weights / 2
+        result = np.interp(np.clip(q, 0.0, 1.0) * total, np.r_[0.0, centres, total], np.r_[self.min, self.means, self.max])
+        return result if q.ndim else float(result)
+
+    def cdf(self, price: Any) -> Any:
+        """Estimated share of prices at or below price (a float or an array of floats)."""
+        price = np.asarray(price, dtype=np.float64)
+        if not len(self):
+            return np.full(price.shape, np.nan) if price.ndim else math.nan
+        total = self.count
+        centres = np.cumsum(self.weights) - self.weights / 2
+        result = np.interp(price, np.r_[self.min, self.means, self.max], np.r_[0.0, centres, total], left=0.0, right=total) / total
+        return result if price.ndim else float(result)
+
+    def histogram(self, bins: int = 20) -> Dict[str, list]:
+        """Estimated offer counts in bins equal-width bins between the lowest and highest price."""
+        if not len(self):
+            return {"edges": [], "counts": []}
+        edges = np.linspace(self.min, self.max, bins + 1) if self.max > self.min else np.array([self.min, self.max])
+        counts = np.diff(self.cdf(edges)) * self.count
+        if len(counts):
+            # The lowest price belongs to the first bin
+            counts[0] += self.cdf(edges[0]) * self.count
+        return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+    def percentiles(self, points: Iterable[int] = (10, 25, 50, 75, 90)) -> Dict[str, float]:
+        """{"p10": ..., "p50": ...} price percentiles, rounded to cents; empty for an empty sketch."""
+        if not len(self):
+            return {}
+        points = list(points)
+        values = self.quantile(np.array(points, dtype=np.float64) / 100)
+        return {f"p{point}": round(float(value), 2) for point, value in zip(points, values)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "compression": self.compression,
+            "min": float(self.min) if len(self) else None,
+            "max": float(self.max) if len(self) else None,
+            "means": self.means.tolist(),
+            "weights": [int(weight) if float(weight).is_integer() else weight for weight in self.weights.tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["PriceSketch"]:
+        """Rebuilds a sketch from to_dict() output; None stays None."""
+        if not data:
+            return None
+        sketch = cls(int(data.get("compression") or PRICE_SKETCH_COMPRESSION))
+        sketch.means = np.asarray(data.get("means") or [], dtype=np.float64)
+        sketch.weights = np.asarray(data.get("weights") or [], dtype=np.float64)
+        if len(sketch):
+            sketch.min, sketch.max = float(data["min"]), float(data["max"])
+        return sketch
@@ -27,3 +27,49 @@ def flatten_value(value):
     
     # for other unexpected types(int, float, bool,... ) 
     return [str(value)]           
+
+
+# Fields every product_info passed to the fetcher must carry
+REQUIRED_QUERY_FIELDS = [
+    "product_name",
+    "brand",
+    "model",
+    "category",
+    "attributes",
+    "condition",
+    "market_region",
+    "additional_context",
+    "search_keywords",
+    "input_confidence"
+]
+
+# Fields whose values make up the shopping query, in query order
+QUERY_FIELDS = ["product_name", "brand", "model", "attributes", "condition"]
+
+
+# build the canonical shopping query for a product
+def build_search_query(product_info: dict) -> str:
+    """
+    Joins the identifying fields of product_info into one search query.
+    Empty values are skipped and repeated words (e.g. a brand already in the
+    product name) are kept only once, so equal products give equal queries.
+    The region is not part of the query; it is sent separately as `gl`.
+    """
+    for field in REQUIRED_QUERY_FIELDS:
+        if field not in product_info:
+            raise ValueError(f"Missing required field: {field}")
+
+    words = []
+    seen = set()
+    for field in QUERY_FIELDS:
+        value = product_info.get(field)
+        if value is None:
+            continue
+        for part in flatten_value(value):
+            for word in part.split():
+                if word in ("None", "null") or word.lower() in seen:
+                    continue
+                seen.add(word.lower())
+                words.append(word)
+
+    return " ".join(words)
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from services.catalog_logic.catalog_index import get_catalog
+from services.fetcher_logic.query_builder import build_search_query
+from services.fetcher_logic.offer_collection import fetch_offers
+from services.fetcher_logic.fx_rates import get_fx_table, region_currency
+from services.fetcher_logic.price_sketch import PriceSketch
+from schemas.comparison_schema import RankedOffer, RegionComparison, RegionPrices
+from schemas.product_schema import ProductSchema
+from typing import List, Optional
+import copy
+import time
+
+# Shared by all comparisons so concurrent requests cannot spawn unbounded threads
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="region-fetch")
+
+
+# fetch the offers of one region from every offer source
+def _fetch_region(product_info: dict, query: str, market_region: str):
+    started = time.monotonic()
+    region_info = {**product_info, "market_region": market_region}
+    output = fetch_offers(region_info, query)
+    errors = [source["error"] for source in (output.sources or {}).values() if source["error"]]
+    if not len(output.offers) and errors:
+        raise RuntimeError("; ".join(errors))
+    return output, time.monotonic() - started
+
+
+# compare the same product across market regions
+def compare_regions(product_info: dict, regions: List[str], base_currency: str = "USD", timeout: Optional[float] = 30.0, max_ranked: int = 20) -> RegionComparison:
+    """
+    Fetches the canonical product in every region concurrently and normalizes
+    all prices to base_currency, so the comparison takes as long as the slowest
+    region rather than the sum. Regions that fail or exceed timeout are kept in
+    the matrix with an error instead of failing the comparison.
+    """
+    started = time.monotonic()
+    product_info = {**copy.deepcopy(ProductSchema), **product_info}
+    query = build_search_query(product_info)
+    fx = get_fx_table()
+    regions = list(dict.fromkeys(region.strip().lower() for region in regions if region and region.strip()))
+
+    futures = {region: _executor.submit(_fetch_region, product_info, query, region) for region in regions}
+    wait(futures.values(), timeout=timeout)
+
+    matrix, offers, sketches = [], [], []
+    for region, future in futures.items():
+        currency = region_currency(region) or product_info.get("currency") or "USD"
+        if not future.done():
+            future.cancel()
+            matrix.append(RegionPrices(market_region=region, currency=currency, latency_seconds=round(time.monotonic() - started, 3), error=f"timed out after {timeout:.0f}s"))
+            continue
+        try:
+            output, latency = future.result()
+        except Exception as e:
+            matrix.append(RegionPrices(market_region=region, currency=currency, error=str(e)))
+            continue
+
+        rate = fx.rate(output.currency, base_currency)
+        to_base = lambda amount: round(amount * rate, 2) if amount is not None and rate is not None else None
+        matrix.append(RegionPrices(
+            market_region=region,
+            currency=output.currency,
+            fx_rate=rate,
+            seller_count=output.seller_count or 0,
+            lowest_price=output.lowest_price,
+            average_price=output.average_price,
+            highest_price=output.highest_price,
+            lowest_price_base=to_base(output.lowest_price),
+            average_price_base=to_base(output.average_price),
+            highest_price_base=to_base(output.highest_price),
+            latency_seconds=round(latency, 3),
+            error=None if rate is not None else f"no FX rate for {output.currency}"
+        ))
+        if rate is not None:
+            sketches.append((PriceSketch.from_dict(output.price_sketch) or PriceSketch.from_prices(output.offers.prices)).scaled(rate))
+            for seller, price in zip(output.offers.seller_names().tolist(), output.offers.prices.tolist()):
+                offers.append((to_base(price), region, seller, price, output.currency))
+
+    offers.sort(key=lambda offer: offer[0])
+    ranking = [
+        RankedOffer(rank=rank, market_region=region, seller=seller, price=price, currency=currency, price_base=price_base)
+        for rank, (price_base, region, seller, price, currency) in enumerate(offers[:max_ranked], start=1)
+    ]
+    # Offer prices of every region in one distribution, however many offers the regions returned
+    price_sketch = PriceSketch.merged(sketches)
+
+    return RegionComparison(
+        product_id=get_catalog().resolve(product_info),
+        query=query,
+        base_currency=base_currency.upper(),
+        fx_source=fx.source,
+        regions=matrix,
+        ranking=ranking,
+        price_percentiles_base=price_sketch.percentiles(),
+        price_sketch=price_sketch.to_dict() if len(price_sketch) else None,
+        total_seconds=round(time.monotonic() - started, 3)
+    )
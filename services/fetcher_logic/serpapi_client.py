@@ -0,0 +1,63 @@
+from services.concurrency_logic.single_flight import get_single_flight
+from services.cache_logic.result_cache import get_cache, hash_payload
+from services.concurrency_logic.rate_limiter import RateLimitError, get_rate_limiter, is_rate_limit_error
+from services.concurrency_logic.deadline import bounded_timeout, is_deadline_error, mark_degraded
+from services.config_logic.settings import get_settings
+from services.metrics_logic.registry import EXTERNAL_CALL_LATENCY, timed
+from typing import Optional
+import requests
+
+SERPAPI_KEY = get_settings().serpapi_key
+SERPAPI_TIMEOUT_SECONDS = get_settings().serpapi_timeout_seconds
+SERPAPI_URL = "https://serpapi.com/search"
+
+# Identical concurrent searches share one SerpAPI request
+SEARCH_FLIGHT = get_single_flight("fetcher_http")
+
+# Last good response per search, served when the SerpAPI budget or the request deadline runs out
+STALE_SEARCH_CACHE = get_cache("fetcher_stale", max_entries=2048, ttl_seconds=24 * 60 * 60)
+
+
+# search Google Shopping through SerpAPI
+def search_google_shopping(query: str, market_region: Optional[str], num_results: int = 5) -> dict:
+    """
+    Runs one Google Shopping search and returns the raw SerpAPI payload.
+
+    Requests draw from the shared SerpAPI rate limit and identical concurrent
+    searches are coalesced. The HTTP call is bounded by SERPAPI_TIMEOUT_SECONDS
+    and by the current request deadline. When the budget is exhausted or the
+    search times out, the last good payload for the same search is returned instead.
+    """
+    params = {
+        "engine" : "google_shopping",
+        "q": query,
+        "api_key": SERPAPI_KEY,
+        "hl": "en",                   #host language
+        "gl": market_region,          #geolocation
+        "num": num_results            #number of results
+    }
+
+    def search():
+        get_rate_limiter().acquire("serpapi")
+        timeout = bounded_timeout(SERPAPI_TIMEOUT_SECONDS, what="SerpAPI search")
+        with timed(EXTERNAL_CALL_LATENCY, "serpapi"):
+            response = requests.get(SERPAPI_URL, params=params, timeout=timeout)
+        if response.status_code == 429:
+            raise RateLimitError("SerpAPI returned 429 Too Many Requests")
+        return response.json()
+
+    # The API key is left out of the coalescing and cache key
+    search_key = hash_payload({k: v for k, v in params.items() if k != "api_key"})
+    try:
+        data = SEARCH_FLIGHT.do(search_key, search)
+        if "error" not in data:
+            STALE_SEARCH_CACHE.set(search_key, data)
+        return data
+    except Exception as e:
+        data = STALE_SEARCH_CACHE.get(search_key)
+        if not (is_rate_limit_error(e) or is_deadline_error(e)) or data is None:
+            raise
+        # Out of budget or time: serve the last good results instead of failing
+        print(f"⚠️ Fetching degraded to cached results: {e}")
+        mark_degraded("fetcher", "stale_results", e)
+        return data
@@ -0,0 +1,109 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from services.extractor_logic.heuristic_parser import heuristic_extract
+from services.fetcher_logic.query_builder import build_search_query
+from services.fetcher_logic.serpapi_client import search_google_shopping
+from services.concurrency_logic.deadline import bounded_timeout
+from services.config_logic.settings import get_settings
+from typing import Any, Dict, Optional
+import re
+import threading
+
+SPECULATIVE_FETCH_ENABLED = get_settings().speculative_fetch_enabled
+SPECULATION_MIN_SIMILARITY = get_settings().speculation_min_similarity
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculative-fetch")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+# token-set Jaccard similarity of two queries
+def query_similarity(first: str, second: str) -> float:
+    first_tokens = set(_TOKEN_PATTERN.findall(first.lower()))
+    second_tokens = set(_TOKEN_PATTERN.findall(second.lower()))
+    if not first_tokens or not second_tokens:
+        return 0.0
+    return len(first_tokens & second_tokens) / len(first_tokens | second_tokens)
+
+
+class SpeculationStats:
+    """Counts how often speculative searches were reused."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            resolved = self.hits + self.misses + self.errors
+            return {
+                "started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / resolved, 3) if resolved else 0.0,
+            }
+
+
+SPECULATION_STATS = SpeculationStats()
+
+
+class SpeculativeFetch:
+    """
+    A SerpAPI search started from a heuristic parse of the raw input, running
+    while the LLM extraction is still in progress.
+    """
+
+    def __init__(self, query: str, market_region: Optional[str], future: Future):
+        self.query = query
+        self.market_region = market_region
+        self.future = future
+
+    @classmethod
+    def start(cls, product_input: str) -> "SpeculativeFetch":
+        guess = heuristic_extract(product_input)
+        query = build_search_query(guess)
+        market_region = guess.get("market_region")
+        SPECULATION_STATS.record("started")
+        # The search runs in the caller's context: its deadline, priority and degradation report
+        return cls(query, market_region, _executor.submit(copy_context().run, search_google_shopping, query, market_region))
+
+    def resolve(self, canonical_query: str, market_region: Optional[str]) -> Optional[dict]:
+        """
+        Returns the speculative payload if it searched for (close enough to) the
+        canonical query in the same region, otherwise None so the real fetch runs.
+        """
+        similarity = query_similarity(self.query, canonical_query)
+        same_region = (market_region or "").lower() == (self.market_region or "").lower()
+        if not same_region or similarity < SPECULATION_MIN_SIMILARITY:
+            self.future.cancel()
+            SPECULATION_STATS.record("misses")
+            print(f"⚠️ Speculative fetch discarded (similarity {similarity:.2f}): '{self.query}' vs '{canonical_query}'")
+            return None
+
+        try:
+            data = self.future.result(timeout=bounded_timeout(what="speculative fetch"))
+        except Exception as e:
+            SPECULATION_STATS.record("errors")
+            print(f"⚠️ Speculative fetch failed: {e}")
+            return None
+
+        if "error" in data:
+            SPECULATION_STATS.record("errors")
+            return None
+
+        SPECULATION_STATS.record("hits")
+        print(f"✅ Speculative fetch reused (similarity {similarity:.2f}).")
+        return data
+
+
+# current speculation counters, including the hit rate
+def speculation_stats() -> Dict[str, Any]:
+    return SPECULATION_STATS.snapshot()
@@ -0,0 +1,78 @@
+from services.job_logic.job_store import SQLiteJobStore
+from services.pipeline_logic.pipeline import ToolRegistry, find_recent_analysis, run_analysis_pipeline, serialize_results
+from typing import Any, Dict, List, Optional
+import threading
+import traceback
+
+
+class BackgroundJobRunner:
+    """
+    Executes queued analysis jobs on background threads.
+
+    Work is claimed from the SQLite job store, so it outlives the Streamlit
+    script run (and browser session) that submitted it. Each worker thread
+    keeps its own ToolRegistry.
+    """
+
+    def __init__(self, job_store: SQLiteJobStore, num_workers: int = 2, poll_interval: float = 2.0, stale_after_seconds: float = 900.0):
+        self.job_store = job_store
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.stale_after_seconds = stale_after_seconds
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        # Jobs left running by a crashed process go back to the queue
+        requeued = self.job_store.requeue_stale(self.stale_after_seconds)
+        if requeued:
+            print(f"✅ Requeued {requeued} stale job(s).")
+
+        for index in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def submit(self, product_input: str) -> str:
+        """Queues an analysis (or attaches to an identical in-flight one) and returns its job ID."""
+        job = self.job_store.submit(product_input)
+        if not job["attached"]:
+            self._wake.set()
+        return job["job_id"]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.job_store.get(job_id)
+
+    def find_recent(self, product_input: str) -> Optional[Dict[str, Any]]:
+        """Recent analysis of a near-identical request finished by this process, if any."""
+        return find_recent_analysis(product_input)
+
+    def _worker_loop(self) -> None:
+        registry = ToolRegistry()
+        while not self._stopping.is_set():
+            job = self.job_store.claim_next()
+            if job is None:
+                # Sleep until a local submit or the next poll (other processes may enqueue too)
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run_job(registry, job)
+
+    def _run_job(self, registry: ToolRegistry, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        try:
+            results = run_analysis_pipeline(job["product_input"], registry=registry)
+            self.job_store.complete(job_id, serialize_results(results))
+            print(f"✅ Job {job_id} succeeded.")
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            traceback.print_exc()
+            self.job_store.fail(job_id, str(e))
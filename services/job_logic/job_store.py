@@ -0,0 +1,185 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+
+
+# Jobs that are still waiting for or holding a worker
+IN_FLIGHT_STATUSES = ("queued", "running")
+
+
+# current UTC time in ISO 8601 format
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# key identifying requests that should share one job
+def request_key(product_input: str) -> str:
+    """
+    Normalizes case and whitespace so trivially different submissions of the
+    same text attach to the same job.
+    """
+    normalized = " ".join(product_input.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SQLiteJobStore:
+    """
+    Persistent job queue and result store backed by a local SQLite file.
+
+    Queued rows form the queue itself, so work submitted before a restart is
+    picked up again by the next worker. Safe to share between threads and
+    between processes on the same host.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    request_key TEXT NOT NULL,
+                    product_input TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_request_key ON jobs (request_key, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so check-then-write is atomic
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["result"] = json.loads(record["result"]) if record["result"] else None
+        return record
+
+    def submit(self, product_input: str) -> Dict[str, Any]:
+        """
+        Queues a job, or returns the in-flight job for an identical request.
+
+        Returns:
+            Job record; "attached" is True when an existing job was reused
+        """
+        key = request_key(product_input)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE request_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (key, *IN_FLIGHT_STATUSES)
+            ).fetchone()
+            if row is not None:
+                return {**self._to_record(row), "attached": True}
+
+            job_id = uuid.uuid4().hex
+            now = _now()
+            conn.execute(
+                "INSERT INTO jobs (job_id, request_key, product_input, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, key, product_input, now, now)
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return {**self._to_record(row), "attached": False}
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically moves the oldest queued job to running and returns it."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                (_now(), row["job_id"])
+            )
+            return {**self._to_record(row), "status": "running"}
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = _now()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._update(job_id, status="succeeded", result=json.dumps(result, default=str), error=None)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._update(job_id, status="failed", error=error)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return self._to_record(row) if row else None
+
+    def count_active(self) -> Dict[str, int]:
+        """Number of queued and running jobs."""
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued', 'running') GROUP BY status").fetchall())
+        return {"queued": counts.get("queued", 0), "running": counts.get("running", 0)}
+
+    def iter_results(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yields the result of every successful job, oldest first, reading in batches."""
+        last_rowid = 0
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT rowid, result FROM jobs WHERE status = 'succeeded' AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                if row["result"]:
+                    yield json.loads(row["result"])
+            last_rowid = rows[-1]["rowid"]
+
+    def requeue_stale(self, stale_after_seconds: float) -> int:
+        """Returns running jobs whose worker went silent to the queue."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)).isoformat()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running' AND updated_at < ?",
+                (_now(), cutoff)
+            )
+            return cursor.rowcount
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=older_than_seconds)).isoformat()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (cutoff,)
+            )
+            return cursor.rowcount
@@ -0,0 +1,120 @@
+from services.config_logic.settings import get_settings
+from pydantic import BaseModel
+from typing import Any, Dict, List, Type
+import threading
+
+
+# Input-token budget per stage; the dynamic part of a prompt is trimmed to fit
+STAGE_TOKEN_BUDGETS = {
+    "extractor": get_settings().prompt_budget_extractor,
+    "analyzer": get_settings().prompt_budget_analyzer,
+    "predictor": get_settings().prompt_budget_predictor,
+}
+
+# Rough characters-per-token ratio for English/JSON text on Gemini and Llama tokenizers
+CHARS_PER_TOKEN = 4
+
+
+# approximate token count of a prompt
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+# flatten nested data into "key: value" lines, most important keys first
+def to_kv_lines(data: Dict[str, Any], prefix: str = "") -> List[str]:
+    lines = []
+    for key, value in data.items():
+        if value in (None, [], {}, ""):
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, BaseModel):
+            value = value.model_dump()
+        if isinstance(value, dict):
+            lines.extend(to_kv_lines(value, prefix=f"{name}."))
+        elif isinstance(value, list):
+            lines.append(f"{name}: " + "; ".join(str(item) for item in value))
+        elif isinstance(value, float):
+            lines.append(f"{name}: {round(value, 2)}")
+        else:
+            lines.append(f"{name}: {value}")
+    return lines
+
+
+# one-line description of the JSON object a model must return
+def compact_schema_hint(model: Type[BaseModel]) -> str:
+    """
+    Short replacement for PydanticOutputParser.get_format_instructions(),
+    e.g. 'Return only a JSON object: {"headline": string, "key_points": [string]}'.
+    """
+    type_names = {"string": "string", "number": "number", "integer": "integer", "boolean": "boolean"}
+    fields = []
+    for name, spec in model.model_json_schema()["properties"].items():
+        if spec.get("type") == "array":
+            item_type = type_names.get(spec.get("items", {}).get("type"), "value")
+            fields.append(f'"{name}": [{item_type}]')
+        else:
+            fields.append(f'"{name}": {type_names.get(spec.get("type"), "value")}')
+    return "Return only a JSON object: {" + ", ".join(fields) + "}"
+
+
+class PromptStats:
+    """Per-stage prompt size counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, int]] = {}
+
+    def record(self, stage: str, tokens: int, trimmed: bool) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(stage, {"prompts": 0, "tokens_total": 0, "tokens_max": 0, "trimmed": 0, "over_budget": 0})
+            stats["prompts"] += 1
+            stats["tokens_total"] += tokens
+            stats["tokens_max"] = max(stats["tokens_max"], tokens)
+            stats["trimmed"] += int(trimmed)
+            stats["over_budget"] += int(tokens > STAGE_TOKEN_BUDGETS.get(stage, tokens))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                stage: {**stats, "tokens_avg": round(stats["tokens_total"] / stats["prompts"], 1), "budget": STAGE_TOKEN_BUDGETS.get(stage)}
+                for stage, stats in self._stages.items()
+            }
+
+
+PROMPT_STATS = PromptStats()
+
+
+# trim the dynamic text of a prompt to the stage's remaining token budget
+def fit_text(stage: str, static_tokens: int, text: str) -> str:
+    """
+    Cuts text (e.g. raw user input) so that static_tokens plus the text stay
+    within the stage budget.
+    """
+    available = max(STAGE_TOKEN_BUDGETS[stage] - static_tokens, 0) * CHARS_PER_TOKEN
+    return text if len(text) <= available else text[:available]
+
+
+# keep as many leading lines as fit in the stage's remaining token budget
+def fit_lines(stage: str, static_tokens: int, lines: List[str]) -> str:
+    available = max(STAGE_TOKEN_BUDGETS[stage] - static_tokens, 0)
+    kept = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > available:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+# record the final prompt size for a stage
+def record_prompt(stage: str, prompt: str, trimmed: bool = False) -> int:
+    tokens = estimate_tokens(prompt)
+    PROMPT_STATS.record(stage, tokens, trimmed)
+    return tokens
+
+
+# per-stage prompt token counts
+def prompt_stats() -> Dict[str, Dict[str, Any]]:
+    return PROMPT_STATS.snapshot()
@@ -0,0 +1,369 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import deque
+from contextvars import copy_context
+from services.config_logic.settings import get_settings
+from services.concurrency_logic.rate_limiter import RateLimitError, get_rate_limiter
+from services.concurrency_logic.deadline import DeadlineExceeded, bounded_timeout, current_deadline
+from services.llm_logic.prompt_assembly import estimate_tokens
+from services.metrics_logic.registry import EXTERNAL_CALL_LATENCY, REGISTRY
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import time
+
+GOOGLE_API_KEY = get_settings().google_api_key
+LLM_CALL_WORKERS = get_settings().llm_call_workers
+
+LLM_TOKENS = REGISTRY.counter("productpulse_llm_tokens_total", "LLM tokens by stage, backend and direction (input/output); estimated from the text when the provider reports no usage.", ("stage", "backend", "direction"))
+
+
+# plain text of a prompt or response (string, prompt value, message or message list)
+def _text_of(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "\n".join(_text_of(item) for item in value)
+    if hasattr(value, "to_string"):
+        return value.to_string()
+    content = getattr(value, "content", value)
+    return content if isinstance(content, str) else str(content)
+
+
+# nearest-rank percentile of a list of numbers
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures; open -> half-open
+    once cooldown_seconds pass, letting a single trial call through; a success
+    closes it again and a failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether allow() would currently let a call through, without claiming the trial."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                return time.monotonic() - self.opened_at >= self.cooldown_seconds
+            return not self._trial_in_flight
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def cancel_trial(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class LLMBackend:
+    """
+    One chat model behind the router, with rolling latency and error statistics.
+
+    The model is built lazily by factory, so backends that are never routed to
+    (or whose client cannot be constructed) cost nothing until needed. Any object
+    with an invoke() method works, including langchain's FakeListChatModel.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], provider: Optional[str] = None, window: int = 50):
+        self.name = name
+        self.provider = provider
+        self.factory = factory
+        self.breaker = CircuitBreaker()
+        self._model = None
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._latency_ok = EXTERNAL_CALL_LATENCY.labels(name, "ok")
+        self._latency_error = EXTERNAL_CALL_LATENCY.labels(name, "error")
+
+    def _get_model(self) -> Any:
+        with self._lock:
+            if self._model is None:
+                self._model = self.factory()
+            return self._model
+
+    def invoke(self, model_input: Any, **kwargs) -> Any:
+        self.reserve()
+        return self.call(model_input, **kwargs)
+
+    def reserve(self, max_wait: Optional[float] = None) -> None:
+        """Takes a rate-limit token for one call (waiting at most max_wait); a no-op without a provider."""
+        # Local rate limit and deadline rejections are not backend failures and do not touch the breaker
+        if self.provider:
+            try:
+                get_rate_limiter().acquire(self.provider, max_wait=max_wait)
+            except (RateLimitError, DeadlineExceeded):
+                self.breaker.cancel_trial()
+                raise
+
+    def call(self, model_input: Any, **kwargs) -> Any:
+        """Calls the model once a token is reserved, recording latency and the outcome on the breaker."""
+        started = time.monotonic()
+        try:
+            response = self._get_model().invoke(model_input, **kwargs)
+        except Exception:
+            latency = time.monotonic() - started
+            self._record(latency, ok=False)
+            self._latency_error.observe(latency)
+            self.breaker.record_failure()
+            raise
+        latency = time.monotonic() - started
+        self._record(latency, ok=True)
+        self._latency_ok.observe(latency)
+        self.breaker.record_success()
+        return response
+
+    def _record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((latency, ok))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+        latencies = [latency for latency, ok in samples if ok]
+        return {
+            "samples": len(samples),
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "error_rate": round(sum(1 for _, ok in samples if not ok) / len(samples), 3) if samples else 0.0,
+            "circuit": self.breaker.state,
+        }
+
+
+class LLMRouter:
+    """
+    Routes chat-model calls across backends by observed health and latency.
+
+    Healthy backends (circuit not open) are tried fastest-p50 first; backends
+    without samples keep their configured order. If the chosen backend has not
+    answered by its own p95 latency, the request is hedged to the next backend
+    and the first answer wins. Failures fall through to the next backend.
+
+    Under a request deadline, invoke() stops waiting once the deadline passes
+    and raises DeadlineExceeded; the abandoned call finishes in the background.
+
+    Exposes invoke() like a chat model, so it drops in for ChatOllama or
+    ChatGoogleGenerativeAI (wrap with RunnableLambda inside LCEL chains).
+    """
+
+    MIN_SAMPLES_TO_HEDGE = 10
+
+    def __init__(self, stage: str, backends: List[LLMBackend], hedge: bool = True):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.stage = stage
+        self.model = f"router:{stage}"
+        self.backends = backends
+        self.hedge = hedge
+        self.hedged_requests = 0
+        self._lock = threading.Lock()
+
+    def _ranked_backends(self) -> List[LLMBackend]:
+        def sort_key(item):
+            position, backend = item
+            stats = backend.stats()
+            if stats["samples"] == 0:
+                return (0, position, 0.0)
+            if stats["p50"] is None:
+                return (2, position, 0.0)
+            return (1, stats["p50"] * (1 + stats["error_rate"]), position)
+
+        ranked = [backend for _, backend in sorted(enumerate(self.backends), key=sort_key)]
+        return [backend for backend in ranked if backend.breaker.available()]
+
+    def _hedge_delay(self, backend: LLMBackend) -> Optional[float]:
+        stats = backend.stats()
+        if not self.hedge or stats["samples"] < self.MIN_SAMPLES_TO_HEDGE:
+            return None
+        return stats["p95"]
+
+    def _submit(self, backend: LLMBackend, model_input: Any, kwargs: Dict[str, Any]):
+        # Backend calls see the caller's priority and deadline
+        return _get_executor().submit(copy_context().run, backend.call, model_input, **kwargs)
+
+    def invoke(self, model_input: Any, **kwargs) -> Any:
+        candidates = self._ranked_backends()
+        if not candidates:
+            raise RuntimeError(f"No healthy LLM backend for {self.stage}: all circuits open")
+
+        errors = []
+        while candidates:
+            bounded_timeout(what=f"{self.stage} LLM call")
+            primary = candidates.pop(0)
+            if not primary.breaker.allow():
+                continue
+            try:
+                primary.reserve()
+            except RateLimitError as e:
+                print(f"⚠️ LLM backend {primary.name} rate limited for {self.stage}: {e}")
+                errors.append(e)
+                continue
+
+            # Nothing to hedge to and no deadline to enforce: no reason to leave this thread
+            delay = self._hedge_delay(primary) if candidates else None
+            if delay is None and current_deadline() is None:
+                try:
+                    response = primary.call(model_input, **kwargs)
+                except Exception as e:
+                    print(f"⚠️ LLM backend {primary.name} failed for {self.stage}: {e}")
+                    errors.append(e)
+                    continue
+                self._count_tokens(primary, model_input, response)
+                return response
+
+            pending = {self._submit(primary, model_input, kwargs): primary}
+
+            # Hedge to the next backend once the primary runs past its own p95
+            if delay is not None:
+                done, _ = wait(pending, timeout=bounded_timeout(delay, what=f"{self.stage} LLM call"))
+                if not done and candidates[0].breaker.allow():
+                    secondary = candidates[0]
+                    try:
+                        # A hedge only goes out if the budget allows it right now
+                        secondary.reserve(max_wait=0)
+                    except (RateLimitError, DeadlineExceeded):
+                        secondary = None
+                    if secondary is not None:
+                        candidates.pop(0)
+                        pending[self._submit(secondary, model_input, kwargs)] = secondary
+                        with self._lock:
+                            self.hedged_requests += 1
+
+            while pending:
+                timeout = bounded_timeout(what=f"{self.stage} LLM call")
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    raise DeadlineExceeded(f"{self.stage} LLM call did not answer within the request deadline")
+                for future in done:
+                    backend = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        print(f"⚠️ LLM backend {backend.name} failed for {self.stage}: {e}")
+                        errors.append(e)
+                        continue
+                    self._count_tokens(backend, model_input, response)
+                    return response
+
+        if not errors:
+            raise RuntimeError(f"No healthy LLM backend for {self.stage}: all circuits open")
+        # Only report a rate limit when every backend was out of budget, so callers can degrade
+        if all(isinstance(e, RateLimitError) for e in errors):
+            raise RateLimitError(f"All LLM backends for {self.stage} are rate limited")
+        raise next(e for e in reversed(errors) if not isinstance(e, RateLimitError))
+
+    def _count_tokens(self, backend: LLMBackend, model_input: Any, response: Any) -> None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens")
+        output_tokens = usage.get("output_tokens")
+        LLM_TOKENS.labels(self.stage, backend.name, "input").inc(input_tokens if input_tokens is not None else estimate_tokens(_text_of(model_input)))
+        LLM_TOKENS.labels(self.stage, backend.name, "output").inc(output_tokens if output_tokens is not None else estimate_tokens(_text_of(response)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hedged_requests = self.hedged_requests
+        return {
+            "hedged_requests": hedged_requests,
+            "backends": {backend.name: backend.stats() for backend in self.backends},
+        }
+
+
+# backend factories for the models each stage has used so far; json_mode turns on
+# the provider's native JSON output (Gemini response_mime_type, Ollama format)
+def _gemini(temperature: float, json_mode: bool = False) -> Callable[[], Any]:
+    def build():
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        extra = {"response_mime_type": "application/json"} if json_mode else {}
+        return ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=temperature, google_api_key=GOOGLE_API_KEY, **extra)
+    return build
+
+
+def _ollama(model: str, temperature: float, json_mode: bool = False) -> Callable[[], Any]:
+    def build():
+        from langchain_ollama import ChatOllama
+        extra = {"format": "json"} if json_mode else {}
+        return ChatOllama(model=model, temperature=temperature, **extra)
+    return build
+
+
+# Backends per pipeline stage, in preference order
+STAGE_BACKENDS = {
+    "extractor": lambda: [
+        LLMBackend("gemini-2.5-flash", _gemini(0.7, json_mode=True), provider="gemini"),
+        LLMBackend("ollama/qwen2.5:7b", _ollama("qwen2.5:7b", 0.7, json_mode=True), provider="ollama"),
+    ],
+    "analyzer": lambda: [
+        LLMBackend("ollama/llama3.1:8b", _ollama("llama3.1:8b", 0.5, json_mode=True), provider="ollama"),
+        LLMBackend("gemini-2.5-flash", _gemini(0.5, json_mode=True), provider="gemini"),
+    ],
+    "predictor": lambda: [
+        LLMBackend("gemini-2.5-flash", _gemini(0.3), provider="gemini"),
+        LLMBackend("ollama/llama3.1:8b", _ollama("llama3.1:8b", 0.3), provider="ollama"),
+    ],
+}
+
+_routers: Dict[str, LLMRouter] = {}
+_routers_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+# pool shared by every router for hedged and deadline-bound calls; threads start only as calls need them
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _routers_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LLM_CALL_WORKERS, thread_name_prefix="llm-call")
+        return _executor
+
+
+# process-wide router for a pipeline stage
+def get_router(stage: str) -> LLMRouter:
+    with _routers_lock:
+        router = _routers.get(stage)
+        if router is None:
+            router = LLMRouter(stage, STAGE_BACKENDS[stage]())
+            _routers[stage] = router
+        return router
+
+
+# snapshot of every router's backend statistics
+def all_router_stats() -> Dict[str, Dict[str, Any]]:
+    with _routers_lock:
+        routers = list(_routers.values())
+    return {router.stage: router.stats() for router in routers}
@@ -0,0 +1,228 @@
+from services.config_logic.settings import get_settings
+from pydantic import ValidationError
+from typing import Any, Callable, Dict, Optional, Tuple
+import ast
+import json
+import re
+import threading
+
+
+# How many times a response that cannot be repaired locally is sent back to the model
+MAX_REPROMPTS = get_settings().structured_output_max_reprompts
+
+# Longest previous reply echoed back in a re-prompt
+MAX_ECHO_CHARS = 2000
+
+REPROMPT_TEMPLATE = """Your previous reply was not valid: {error}
+{schema_hint}
+Previous reply:
+{previous}
+Return only the corrected JSON object."""
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?", re.IGNORECASE)
+_PYTHON_LITERALS = {"None": "null", "True": "true", "False": "false"}
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a model response cannot be parsed or validated, even after repair and re-prompting."""
+
+
+# text of a chat model response (AIMessage or plain string)
+def response_text(response: Any) -> str:
+    content = getattr(response, "content", response)
+    if isinstance(content, list):
+        content = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return str(content)
+
+
+# short, model-readable description of a parse or validation error
+def describe_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'root'}: {err['msg']}" for err in error.errors()[:5]
+        )
+    return str(error)
+
+
+# remove trailing commas, colons and whitespace before a container is closed
+def _drop_dangling(chars: list) -> None:
+    while chars and (chars[-1].isspace() or chars[-1] == ","):
+        chars.pop()
+    if chars and chars[-1] == ":":
+        chars.append("null")
+
+
+# cheap local fix-ups for almost-JSON model replies
+def repair_json(text: str) -> Optional[str]:
+    """
+    Returns a JSON string for the first object in text, or None if there is no object.
+
+    Handles code fences, prose around the object, trailing commas, Python
+    literals (None/True/False), unterminated strings and truncated output
+    (missing closing brackets). Single-quoted dicts are handled by
+    parse_json_object via ast.literal_eval.
+    """
+    text = _FENCE_PATTERN.sub("", text)
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    chars, stack, word = [], [], []
+    in_string = escape = False
+
+    def flush_word():
+        if word:
+            token = "".join(word)
+            chars.append(_PYTHON_LITERALS.get(token, token))
+            word.clear()
+
+    for ch in text[start:]:
+        if in_string:
+            chars.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch.isalnum() or ch in "_.-+":
+            word.append(ch)
+            continue
+        flush_word()
+        if ch == '"':
+            in_string = True
+            chars.append(ch)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            chars.append(ch)
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                continue
+            _drop_dangling(chars)
+            chars.append(stack.pop())
+            if not stack:
+                break
+        else:
+            chars.append(ch)
+    flush_word()
+
+    # Truncated reply: close the open string and containers
+    if in_string:
+        chars.append('"')
+    while stack:
+        _drop_dangling(chars)
+        chars.append(stack.pop())
+    return "".join(chars)
+
+
+# parse a model reply into a JSON object, repairing it locally if needed
+def parse_json_object(text: str) -> Tuple[Any, bool]:
+    """
+    Returns (data, repaired). Raises StructuredOutputError if no object can be recovered.
+    """
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as e:
+        first_error = e
+
+    repaired = repair_json(text)
+    if repaired is not None:
+        try:
+            return json.loads(repaired), True
+        except json.JSONDecodeError:
+            pass
+        # Single-quoted, Python-style dicts
+        try:
+            data = ast.literal_eval(text[text.find("{"):text.rfind("}") + 1])
+            if isinstance(data, dict):
+                return data, True
+        except (ValueError, SyntaxError):
+            pass
+    raise StructuredOutputError(f"invalid JSON ({first_error.msg} at line {first_error.lineno} column {first_error.colno})")
+
+
+class StructuredOutputStats:
+    """Per-stage counters for first-try parses, local repairs and re-prompts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, int]] = {}
+
+    def record(self, stage: str, outcome: str, count: int = 1) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(stage, {"responses": 0, "parsed": 0, "repaired": 0, "reprompts": 0, "reprompt_successes": 0, "failures": 0})
+            stats[outcome] += count
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                stage: {
+                    **stats,
+                    "repair_rate": round(stats["repaired"] / stats["responses"], 3) if stats["responses"] else 0.0,
+                    "retry_rate": round(stats["reprompts"] / stats["responses"], 3) if stats["responses"] else 0.0,
+                }
+                for stage, stats in self._stages.items()
+            }
+
+
+STRUCTURED_OUTPUT_STATS = StructuredOutputStats()
+
+
+# parse and validate one reply; returns (value, repaired)
+def _parse_and_validate(text: str, validate: Callable[[Any], Any]) -> Tuple[Any, bool]:
+    data, repaired = parse_json_object(text)
+    try:
+        return validate(data), repaired
+    except (ValidationError, ValueError, TypeError) as e:
+        raise StructuredOutputError(describe_error(e)) from e
+
+
+# invoke a chat model and return its reply as validated structured data
+def invoke_structured(stage: str, llm: Any, model_input: Any, validate: Callable[[Any], Any], schema_hint: str, max_reprompts: int = MAX_REPROMPTS) -> Any:
+    """
+    Sends model_input once and parses the reply exactly once. A reply that is
+    not valid JSON is repaired locally first; if it still fails to parse or
+    validate, the model is re-prompted with only the error, the schema hint and
+    its previous reply (not the original prompt).
+
+    Args:
+        stage: Pipeline stage name, used for the statistics
+        llm: Anything with invoke() (chat model or LLMRouter)
+        model_input: Prompt string or list of messages
+        validate: Callable that turns the parsed JSON into the result, raising on invalid data
+        schema_hint: Short description of the expected JSON shape
+        max_reprompts: How many corrective re-prompts to allow
+
+    Returns:
+        Whatever validate returns
+    """
+    STRUCTURED_OUTPUT_STATS.record(stage, "responses")
+    text = response_text(llm.invoke(model_input))
+
+    for attempt in range(max_reprompts + 1):
+        try:
+            value, repaired = _parse_and_validate(text, validate)
+        except StructuredOutputError as e:
+            if attempt == max_reprompts:
+                STRUCTURED_OUTPUT_STATS.record(stage, "failures")
+                raise
+            error = str(e)
+        else:
+            if attempt:
+                STRUCTURED_OUTPUT_STATS.record(stage, "reprompt_successes")
+            elif repaired:
+                STRUCTURED_OUTPUT_STATS.record(stage, "repaired")
+            else:
+                STRUCTURED_OUTPUT_STATS.record(stage, "parsed")
+            return value
+
+        print(f"⚠️ {stage} output invalid ({error}); re-prompting with the error.")
+        STRUCTURED_OUTPUT_STATS.record(stage, "reprompts")
+        reprompt = REPROMPT_TEMPLATE.format(error=error, schema_hint=schema_hint, previous=text[:MAX_ECHO_CHARS])
+        text = response_text(llm.invoke(reprompt))
+
+
+# per-stage parse, repair and retry counters
+def structured_output_stats() -> Dict[str, Dict[str, Any]]:
+    return STRUCTURED_OUTPUT_STATS.snapshot()
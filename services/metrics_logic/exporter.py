@@ -0,0 +1,103 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.cache_logic.result_cache import all_cache_stats
+from services.concurrency_logic.cpu_pool import cpu_pool_stats
+from services.concurrency_logic.rate_limiter import get_rate_limiter
+from services.concurrency_logic.single_flight import all_single_flight_stats
+from services.config_logic.settings import get_settings
+from services.metrics_logic.registry import REGISTRY
+from typing import Optional
+import threading
+
+METRICS_HOST = get_settings().metrics_host
+METRICS_PORT = get_settings().metrics_port
+
+
+# cache counters, sizes and hit ratios
+def _cache_metrics():
+    caches = list(all_cache_stats().values())
+    by_cache = lambda field: [({"cache": cache["name"]}, cache[field]) for cache in caches]
+    yield "productpulse_cache_hits_total", "counter", "Cache lookups that found a live entry.", by_cache("hits")
+    yield "productpulse_cache_misses_total", "counter", "Cache lookups that found nothing or an expired entry.", by_cache("misses")
+    yield "productpulse_cache_evictions_total", "counter", "Entries evicted to stay within the cache size.", by_cache("evictions")
+    yield "productpulse_cache_entries", "gauge", "Entries currently cached.", by_cache("size")
+    yield "productpulse_cache_hit_ratio", "gauge", "Hits over lookups since start.", by_cache("hit_ratio")
+
+
+# request coalescing counters
+def _single_flight_metrics():
+    groups = list(all_single_flight_stats().values())
+    yield "productpulse_coalesced_calls_total", "counter", "Calls that joined an identical call already in flight.", [({"group": group["name"]}, group["collapsed"]) for group in groups]
+    yield "productpulse_in_flight_calls", "gauge", "Distinct calls currently in flight.", [({"group": group["name"]}, group["in_flight"]) for group in groups]
+
+
+# CPU pool backlog
+def _cpu_pool_metrics():
+    stats = cpu_pool_stats()
+    if stats is None:
+        return
+    yield "productpulse_cpu_pool_queued", "gauge", "Calls waiting for a CPU pool worker.", [({}, stats["queued"])]
+    yield "productpulse_cpu_pool_calls_total", "counter", "Calls run in the CPU pool.", [({}, stats["calls"])]
+
+
+# daily provider quota left
+def _quota_metrics():
+    usage = get_rate_limiter().quota_usage()
+    yield "productpulse_quota_used_today", "gauge", "Provider calls made today (UTC).", [({"provider": provider}, stats["used_today"]) for provider, stats in usage.items()]
+    yield "productpulse_quota_remaining", "gauge", "Provider calls left in today's quota.", [({"provider": provider}, stats["remaining"]) for provider, stats in usage.items()]
+
+
+REGISTRY.register_collector("caches", _cache_metrics)
+REGISTRY.register_collector("single_flight", _single_flight_metrics)
+REGISTRY.register_collector("cpu_pool", _cpu_pool_metrics)
+REGISTRY.register_collector("quota", _quota_metrics)
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics in the Prometheus text format."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        payload = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown the app's own output
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+# serve /metrics on METRICS_HOST:METRICS_PORT from a background thread (once per process; port 0 disables it)
+def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    global _server
+    if port <= 0:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+            except OSError as e:
+                print(f"⚠️ Metrics endpoint not started on {host}:{port}: {e}")
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+            print(f"✅ Metrics on http://{host}:{port}/metrics")
+        return _server
+
+
+# stop the metrics endpoint, if it was started
+def stop_metrics_server() -> None:
+    global _server
+    with _server_lock:
+        server, _server = _server, None
+    if server is not None:
+        server.shutdown()
+        server.server_close()
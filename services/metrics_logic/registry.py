@@ -0,0 +1,282 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+import functools
+import math
+import threading
+import time
+
+# Latency buckets in seconds, from cache hits to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# A collector returns (name, type, help, [(labels, value), ...]) families, computed at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+class _ShardedValues:
+    """
+    A fixed-width vector of sums recorded without locks: every thread adds to
+    its own shard (created once per thread), and reads add the shards up.
+    Shards of finished threads are folded into a retired total on read, so
+    short-lived threads (e.g. one per Streamlit script run) do not pile up.
+    """
+
+    __slots__ = ("width", "_local", "_shards", "_retired", "_lock")
+
+    def __init__(self, width: int):
+        self.width = width
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, List[float]]] = []
+        self._retired = [0.0] * width
+        self._lock = threading.Lock()
+
+    def shard(self) -> List[float]:
+        """The calling thread's shard; only that thread writes to it."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = [0.0] * self.width
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def read(self) -> List[float]:
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._retired = [total + value for total, value in zip(self._retired, shard)]
+            self._shards = live
+            totals = list(self._retired)
+            for _, shard in live:
+                totals = [total + value for total, value in zip(totals, shard)]
+            return totals
+
+
+class _CounterChild:
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values = _ShardedValues(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] += amount
+
+    def value(self) -> float:
+        return self._values.read()[0]
+
+
+class _GaugeChild:
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        # A single attribute store; the last writer wins, which is what a gauge means
+        self._value = float(value)
+
+    def value(self) -> float:
+        return self._value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "_values")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket, one for +Inf, then the sum
+        self._values = _ShardedValues(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        shard = self._values.shard()
+        shard[bisect_left(self.bounds, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float]:
+        """Cumulative bucket counts (the last is +Inf, i.e. the count) and the sum."""
+        values = self._values.read()
+        cumulative, running = [], 0.0
+        for count in values[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, values[-1]
+
+
+class MetricFamily:
+    """
+    A named metric with a fixed set of label names; labels(*values) returns
+    the child to record into. Children are created once per label set, so
+    hot paths can look them up once and keep them.
+    """
+
+    def __init__(self, name: str, kind: str, help_text: str, labelnames: Sequence[str], make_child: Callable[[], Any]):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._make_child = make_child
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._make_child())
+        return child
+
+    def children(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    # Unlabelled families record directly
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+
+# escape a label value for the text format
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# format a sample value for the text format
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+# one sample line
+def _sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics, rendered in the Prometheus text exposition format.
+
+    counter(), gauge() and histogram() get or create a family by name, so a
+    module can declare the metrics it records at import time. Collectors
+    report values that already live elsewhere (cache counters, queue depths)
+    when a scrape asks for them, at no cost on the paths that update them.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, kind: str, help_text: str, labelnames: Sequence[str], make_child: Callable[[], Any]) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, kind, help_text, labelnames, make_child)
+            elif family.kind != kind or family.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered as a {family.kind} with labels {family.labelnames}")
+            return family
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, "counter", help_text, labelnames, _CounterChild)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, "gauge", help_text, labelnames, _GaugeChild)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        bounds = tuple(sorted(float(bound) for bound in buckets))
+        return self._family(name, "histogram", help_text, labelnames, lambda: _HistogramChild(bounds))
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """Adds (or replaces) a scrape-time collector."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        with self._lock:
+            families = list(self._families.values())
+            collectors = list(self._collectors.items())
+
+        lines = []
+        for family in families:
+            children = family.children()
+            if not children:
+                continue
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, child in children:
+                if family.kind == "histogram":
+                    cumulative, total = child.snapshot()
+                    for bound, count in zip(child.bounds + (math.inf,), cumulative):
+                        lines.append(_sample(f"{family.name}_bucket", {**labels, "le": _format_value(bound)}, count))
+                    lines.append(_sample(f"{family.name}_sum", labels, total))
+                    lines.append(_sample(f"{family.name}_count", labels, cumulative[-1]))
+                else:
+                    lines.append(_sample(family.name, labels, child.value()))
+
+        for collector_name, collector in collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:
+                print(f"⚠️ Metrics collector {collector_name} failed: {e}")
+                continue
+            for name, kind, help_text, samples in collected:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(_sample(name, labels, value) for labels, value in samples if value is not None)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_LATENCY = REGISTRY.histogram("productpulse_tool_duration_seconds", "Time spent in each pipeline tool.", ("tool", "outcome"))
+EXTERNAL_CALL_LATENCY = REGISTRY.histogram("productpulse_external_call_duration_seconds", "Latency of calls to LLM backends and external HTTP services.", ("target", "outcome"))
+
+
+# time the enclosed block into a histogram labelled with label_values plus outcome (ok/error)
+@contextmanager
+def timed(histogram: MetricFamily, *label_values: Any) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        histogram.labels(*label_values, "error").observe(time.perf_counter() - started)
+        raise
+    histogram.labels(*label_values, "ok").observe(time.perf_counter() - started)
+
+
+# decorator form of timed(), with the children looked up once
+def timed_calls(histogram: MetricFamily, *label_values: Any) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        ok, error = histogram.labels(*label_values, "ok"), histogram.labels(*label_values, "error")
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                error.observe(time.perf_counter() - started)
+                raise
+            ok.observe(time.perf_counter() - started)
+            return result
+        return wrapper
+    return decorate
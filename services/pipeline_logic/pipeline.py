@@ -0,0 +1,199 @@
+from pydantic import BaseModel
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from services.config_logic.settings import get_settings
+from services.fetcher_logic.query_builder import build_search_query
+from services.fetcher_logic.speculative_fetch import SPECULATIVE_FETCH_ENABLED, SpeculativeFetch
+from services.cache_logic.near_duplicate import NearDuplicateIndex
+from services.concurrency_logic.deadline import current_deadline, degradation_report, request_deadline
+import importlib
+import threading
+
+if TYPE_CHECKING:
+    from tools.extractor_tool import Extractor_Tool
+    from tools.fetcher_tool import Fetcher_Tool
+    from tools.analyzer_tool import Analyzer_Tool
+    from tools.predictor_tool import Predictor_Tool
+
+# Recent analyses keyed by their free-text request, for reuse by near-identical requests
+RECENT_ANALYSES = NearDuplicateIndex(
+    "recent_analyses",
+    max_entries=get_settings().near_duplicate_max_entries,
+    ttl_seconds=get_settings().near_duplicate_ttl_seconds,
+    threshold=get_settings().near_duplicate_threshold
+)
+
+
+# End-to-end budget of an interactive analysis (None = no deadline)
+PIPELINE_DEADLINE_SECONDS = get_settings().pipeline_deadline_seconds or None
+
+# Relative share of the remaining deadline each stage may use; time a stage
+# leaves unused carries over to the stages after it
+STAGE_DEADLINE_WEIGHTS = {"extractor": 2, "fetcher": 4, "analyzer": 2, "predictor": 2}
+
+
+# Fields the fetcher requires, with defaults for anything the extractor left out
+REQUIRED_PRODUCT_FIELDS = {
+    'product_name': None, 'brand': None, 'model': None, 'category': None,
+    'attributes': {}, 'condition': None, 'market_region': None,
+    'currency': 'USD', 'additional_context': None,
+    'search_keywords': [], 'input_confidence': 0.0
+}
+
+
+class ToolRegistry:
+    """
+    Holds one instance of each pipeline tool, created on first use.
+
+    Tools such as the predictor load a model and an LLM client when constructed,
+    so a worker should build its registry once and reuse it for every request.
+    Tool modules (and langchain, joblib and scikit-learn behind them) are only
+    imported when a tool is first needed, which keeps importing the pipeline cheap.
+    """
+
+    # registry name -> (module, class)
+    TOOLS = {
+        "extractor": ("tools.extractor_tool", "Extractor_Tool"),
+        "fetcher": ("tools.fetcher_tool", "Fetcher_Tool"),
+        "analyzer": ("tools.analyzer_tool", "Analyzer_Tool"),
+        "predictor": ("tools.predictor_tool", "Predictor_Tool"),
+    }
+
+    def __init__(self):
+        self._tools: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> Any:
+        with self._lock:
+            tool = self._tools.get(name)
+            if tool is None:
+                module_name, class_name = self.TOOLS[name]
+                tool = getattr(importlib.import_module(module_name), class_name)()
+                self._tools[name] = tool
+            return tool
+
+    @property
+    def extractor(self) -> "Extractor_Tool":
+        return self._get("extractor")
+
+    @property
+    def fetcher(self) -> "Fetcher_Tool":
+        return self._get("fetcher")
+
+    @property
+    def analyzer(self) -> "Analyzer_Tool":
+        return self._get("analyzer")
+
+    @property
+    def predictor(self) -> "Predictor_Tool":
+        return self._get("predictor")
+
+
+# fill in the fields the fetcher requires
+def complete_product_info(extractor_output: dict) -> dict:
+    return {**REQUIRED_PRODUCT_FIELDS, **extractor_output}
+
+
+# seconds a stage may use: its weighted share of what is left of the request deadline
+def stage_deadline_seconds(stage: str) -> Optional[float]:
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    stages = list(STAGE_DEADLINE_WEIGHTS)
+    remaining_weight = sum(STAGE_DEADLINE_WEIGHTS[name] for name in stages[stages.index(stage):])
+    return deadline.remaining() * STAGE_DEADLINE_WEIGHTS[stage] / remaining_weight
+
+
+# run all tools sequentially
+def run_analysis_pipeline(product_input: str, registry: Optional[ToolRegistry] = None, deadline_seconds: Optional[float] = PIPELINE_DEADLINE_SECONDS) -> Dict[str, Any]:
+    """
+    Runs extractor -> fetcher -> analyzer -> predictor on a product description.
+
+    Each stage gets a share of deadline_seconds for its LLM and SerpAPI calls.
+    A stage that runs out of time (or rate limit budget) falls back to its
+    degraded result: heuristic extraction, stale search results, a template
+    summary or ML-only reasoning.
+
+    Args:
+        product_input: Free-text product description
+        registry: Tool instances to reuse; a fresh registry is used when omitted
+        deadline_seconds: End-to-end budget; None waits as long as the providers take
+
+    Returns:
+        Dictionary with the output of each stage, plus "degraded" mapping each
+        stage that fell back to {"fallback", "reason"} (empty when none did)
+    """
+    registry = registry or ToolRegistry()
+
+    with request_deadline(deadline_seconds), degradation_report() as degraded:
+        # Start a search from a heuristic query while the LLM extraction runs
+        speculation = None
+        if SPECULATIVE_FETCH_ENABLED:
+            try:
+                speculation = SpeculativeFetch.start(product_input)
+            except Exception as e:
+                print(f"⚠️ Speculative fetch not started: {e}")
+
+        # Step 1: Extract
+        with request_deadline(stage_deadline_seconds("extractor")):
+            extractor_output = registry.extractor.run(product_input)
+
+        # Step 2: Fetch (ensure required fields), reusing the speculative search when it matches
+        with request_deadline(stage_deadline_seconds("fetcher")):
+            product_info = complete_product_info(extractor_output)
+            fetcher_args = {"product_info": product_info}
+            if speculation is not None:
+                prefetched_results = speculation.resolve(build_search_query(product_info), product_info.get("market_region"))
+                if prefetched_results is not None:
+                    fetcher_args["prefetched_results"] = prefetched_results
+            fetcher_output = registry.fetcher.run(fetcher_args)
+
+        # Step 3: Analyze
+        with request_deadline(stage_deadline_seconds("analyzer")):
+            analyzer_output = registry.analyzer.run({"fetched_product_info": fetcher_output})
+
+        # Step 4: Predict
+        with request_deadline(stage_deadline_seconds("predictor")):
+            predictor_output = registry.predictor.run({"analyzer_output": analyzer_output})
+
+    results = {
+        "extractor": extractor_output,
+        "fetcher": fetcher_output,
+        "analyzer": analyzer_output,
+        "predictor": predictor_output,
+        "degraded": dict(degraded)
+    }
+    # Only full-quality analyses are offered for reuse
+    if not degraded:
+        RECENT_ANALYSES.add(product_input, serialize_results(results))
+    return results
+
+
+# most similar recent analysis of a near-identical request, if any
+def find_recent_analysis(product_input: str, max_age_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Looks up a previous analysis for a request phrased differently but naming
+    the same product, without any LLM or SerpAPI calls.
+
+    Returns:
+        {"results", "matched_input", "similarity", "age_seconds"} or None
+    """
+    match = RECENT_ANALYSES.find(product_input, max_age_seconds=max_age_seconds)
+    if match is None:
+        return None
+    return {
+        "results": match.value,
+        "matched_input": match.text,
+        "similarity": match.similarity,
+        "age_seconds": match.age_seconds
+    }
+
+
+# convert pipeline results into plain JSON-compatible data
+def serialize_results(results: Any) -> Any:
+    if isinstance(results, BaseModel):
+        return results.model_dump(mode="json")
+    if isinstance(results, dict):
+        return {key: serialize_results(value) for key, value in results.items()}
+    if isinstance(results, (list, tuple)):
+        return [serialize_results(value) for value in results]
+    return results
@@ -1,6 +1,17 @@
 from typing import Dict, Any, List
 from prompts.predictor_prompt import generate_predictor_prompt
 from schemas.analysis_schema import AnalysisOutput
+from services.concurrency_logic.single_flight import get_single_flight
+from services.cache_logic.result_cache import hash_payload
+from services.concurrency_logic.rate_limiter import is_rate_limit_error
+from services.concurrency_logic.deadline import is_deadline_error, mark_degraded
+
+
+# Identical concurrent reasoning prompts share one LLM call
+REASONING_FLIGHT = get_single_flight("predictor_llm")
+
+# Closing bullet of every fallback explanation
+ML_ONLY_NOTE = "Decision based solely on ML model"
 
 
 def llm_reasoning(llm, analyzer_output: AnalysisOutput, ml_decision: str, confidence: float) -> List[str]:
@@ -13,7 +24,10 @@ def llm_reasoning(llm, analyzer_output: AnalysisOutput, ml_decision: str, confid
                 confidence=confidence, 
                 analyzer_output=analyzer_output
             )
-            response = llm.invoke(prompt)
+            response = REASONING_FLIGHT.do(
+                hash_payload({"model": getattr(llm, "model", None), "prompt": prompt}),
+                lambda: llm.invoke(prompt)
+            )
             
             # Parse reasoning into bullet points
             reasoning = [
@@ -25,4 +39,9 @@ def llm_reasoning(llm, analyzer_output: AnalysisOutput, ml_decision: str, confid
             return reasoning if reasoning else ["Decision based on ML model analysis"]
             
         except Exception as e:
-            return [f"LLM reasoning failed: {str(e)}", "Decision based solely on ML model"]
\ No newline at end of file
+            mark_degraded("predictor", "ml_only", e)
+            if is_rate_limit_error(e):
+                return ["LLM reasoning skipped: provider rate limit or quota reached", ML_ONLY_NOTE]
+            if is_deadline_error(e):
+                return ["LLM reasoning skipped: request deadline reached", ML_ONLY_NOTE]
+            return [f"LLM reasoning failed: {str(e)}", ML_ONLY_NOTE]
\ No newline at end of file
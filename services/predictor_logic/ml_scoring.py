@@ -0,0 +1,20 @@
+from typing import Any, Dict, List, Tuple
+import threading
+
+# Models loaded in this process, keyed by path and content version
+_models: Dict[Tuple[str, str], Any] = {}
+_models_lock = threading.Lock()
+
+
+# class probabilities for one feature vector, loading the model once per process
+def predict_probabilities(model_path: str, model_version: str, features: List[float]) -> List[float]:
+    """
+    Scores features with the saved predictor model. Used by batch runs, which
+    score in CPU pool worker processes that do not share the tool's model.
+    """
+    with _models_lock:
+        model = _models.get((model_path, model_version))
+        if model is None:
+            import joblib
+            model = _models[(model_path, model_version)] = joblib.load(model_path)
+    return model.predict_proba([features])[0].tolist()
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from schemas.fetcher_schema import PRICE_DISTRIBUTION_MAX_OFFERS, FetcherOutput
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class MarketChange:
+    """Differences between two fetches of the same product."""
+    changed: bool
+    reasons: List[str] = field(default_factory=list)
+    sellers_added: List[str] = field(default_factory=list)
+    sellers_removed: List[str] = field(default_factory=list)
+    # seller -> (previous lowest price, new lowest price), for sellers present in both
+    price_moves: Dict[str, tuple] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "changed": self.changed,
+            "reasons": self.reasons,
+            "sellers_added": self.sellers_added,
+            "sellers_removed": self.sellers_removed,
+            "price_moves": {seller: list(move) for seller, move in self.price_moves.items()},
+        }
+
+
+# compare a fresh fetch with the previous one
+def detect_market_change(previous: Optional[Dict[str, Any]], current: FetcherOutput, price_tolerance: float = 0.005) -> MarketChange:
+    """
+    Args:
+        previous: Serialized FetcherOutput of the last refresh, or None
+        current: Fresh FetcherOutput
+        price_tolerance: Relative move below which a price counts as unchanged
+
+    Returns:
+        MarketChange; changed is True when the seller set changed, any
+        seller's lowest price moved by more than price_tolerance, or the
+        summary prices (current/lowest/highest/average) did
+
+    The previous fetch is compared through its seller_prices (the cheapest
+    PRICE_DISTRIBUTION_MAX_OFFERS sellers), not its full offer list. When that
+    list was full, a seller priced above all of it may have been there
+    already, so it is not reported as added; the summary prices still move.
+    """
+    if previous is None:
+        return MarketChange(changed=True, reasons=["first_refresh"])
+
+    before = previous.get("seller_prices")
+    if before is None:
+        # Stored before seller_prices was serialized
+        before = FetcherOutput.model_validate(previous).offers.lowest_by_seller()
+    after = current.offers.lowest_by_seller()
+    moved = lambda old, new: (old is None) != (new is None) or (old is not None and abs(new - old) > price_tolerance * max(abs(old), 1e-9))
+
+    change = MarketChange(changed=False)
+    added = set(after) - set(before)
+    if before and len(before) >= PRICE_DISTRIBUTION_MAX_OFFERS:
+        cutoff = max(before.values())
+        added = {seller for seller in added if after[seller] <= cutoff}
+    change.sellers_added = sorted(added)
+    change.sellers_removed = sorted(set(before) - set(after))
+    if change.sellers_added or change.sellers_removed:
+        change.reasons.append("seller_set")
+
+    change.price_moves = {
+        seller: (before[seller], after[seller])
+        for seller in sorted(set(before) & set(after)) if moved(before[seller], after[seller])
+    }
+    if change.price_moves:
+        change.reasons.append("seller_prices")
+
+    for name in ("current_price", "lowest_price", "highest_price", "average_price"):
+        if moved(previous.get(name), getattr(current, name)):
+            change.reasons.append(name)
+
+    change.changed = bool(change.reasons)
+    return change
@@ -0,0 +1,190 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from services.catalog_logic.catalog_index import get_catalog
+from services.config_logic.settings import get_settings
+from services.concurrency_logic.rate_limiter import BATCH, request_priority
+from services.concurrency_logic.cpu_pool import cpu_offload, get_cpu_pool
+from services.fetcher_logic.price_sketch import PriceSketch
+from services.pipeline_logic.pipeline import ToolRegistry, complete_product_info, serialize_results
+from services.watchlist_logic.change_detection import detect_market_change
+from services.watchlist_logic.watchlist_store import SQLiteWatchlistStore
+from typing import Any, Callable, Dict, List, Optional
+import random
+import threading
+import time
+import traceback
+
+settings = get_settings()
+WATCHLIST_DB_PATH = settings.watchlist_db_path
+WATCHLIST_DEFAULT_INTERVAL_SECONDS = settings.watchlist_default_interval_seconds
+WATCHLIST_MIN_INTERVAL_SECONDS = settings.watchlist_min_interval_seconds
+WATCHLIST_MAX_CONCURRENCY = settings.watchlist_max_concurrency
+WATCHLIST_JITTER = settings.watchlist_jitter
+WATCHLIST_PRICE_TOLERANCE = settings.watchlist_price_tolerance
+
+
+class WatchlistScheduler:
+    """
+    Refreshes watched products on their own intervals.
+
+    A dispatcher thread claims due items, never more than max_concurrency at
+    once, and refreshes them on a thread pool at batch priority: the stored
+    spec goes straight to the fetcher (no extraction), the new fetch is diffed
+    against the one the stored analysis was computed from, and the analyzer
+    and predictor only run when prices or the seller set changed since then
+    (so small moves that add up across refreshes are still caught). Each next refresh is scheduled at the
+    item's interval plus or minus jitter, so items added together drift apart
+    instead of refreshing in bursts. After each refresh, observers are called
+    with the item, the serialized fetch and the new results (None when the
+    analysis was skipped).
+    """
+
+    def __init__(self, store: SQLiteWatchlistStore, max_concurrency: int = WATCHLIST_MAX_CONCURRENCY, jitter: float = WATCHLIST_JITTER,
+                 price_tolerance: float = WATCHLIST_PRICE_TOLERANCE, poll_interval: float = 5.0, lease_seconds: float = 900.0,
+                 observers: Optional[List[Callable[[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]], Any]]] = None):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self.store = store
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.price_tolerance = price_tolerance
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.observers = list(observers or [])
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._registries = threading.local()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = Counter()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="watchlist-refresh")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="watchlist-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _registry(self) -> ToolRegistry:
+        registry = getattr(self._registries, "registry", None)
+        if registry is None:
+            registry = self._registries.registry = ToolRegistry()
+        return registry
+
+    def add(self, product_input: Optional[str] = None, product_info: Optional[Dict[str, Any]] = None, interval_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Watches a product given either free text (extracted once, now) or an
+        already structured spec. The spec is stored and reused for every refresh.
+
+        Raises:
+            ValueError: If neither input is given or the interval is too short
+        """
+        if product_info is None:
+            if not product_input or not product_input.strip():
+                raise ValueError("Either product_input or product_info is required")
+            product_info = self._registry().extractor.run(product_input)
+        interval_seconds = WATCHLIST_DEFAULT_INTERVAL_SECONDS if interval_seconds is None else float(interval_seconds)
+        if interval_seconds < WATCHLIST_MIN_INTERVAL_SECONDS:
+            raise ValueError(f"interval_seconds must be at least {WATCHLIST_MIN_INTERVAL_SECONDS:g}")
+
+        product_info = complete_product_info(product_info)
+        product_id = get_catalog().resolve(product_info)
+        item = self.store.add(product_id, product_info, interval_seconds)
+        self._wake.set()
+        return item
+
+    def remove(self, item_id: str) -> bool:
+        return self.store.remove(item_id)
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(item_id)
+
+    def list_items(self) -> List[Dict[str, Any]]:
+        return self.store.list_items()
+
+    def _next_run_at(self, interval_seconds: float) -> float:
+        return time.time() + interval_seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _dispatch_loop(self) -> None:
+        while not self._stopping.is_set():
+            with self._lock:
+                free_slots = self.max_concurrency - self._in_flight
+            items = self.store.claim_due(free_slots, self.lease_seconds) if free_slots > 0 else []
+            for item in items:
+                with self._lock:
+                    self._in_flight += 1
+                self._executor.submit(self._refresh, item)
+
+            # Sleep until the next item is due, a slot frees up, or an item is added
+            next_due = self.store.next_due_at()
+            timeout = self.poll_interval if next_due is None else min(self.poll_interval, max(next_due - time.time(), 0.05))
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _refresh(self, item: Dict[str, Any]) -> None:
+        item_id = item["item_id"]
+        try:
+            registry = self._registry()
+            with request_priority(BATCH), cpu_offload(get_cpu_pool()):
+                fetcher_output = registry.fetcher.run({"product_info": item["product_info"]})
+                # Items stored before analyzed_fetcher was kept fall back to the last fetch
+                baseline = item.get("analyzed_fetcher") or item["last_fetcher"]
+                change = detect_market_change(baseline, fetcher_output, self.price_tolerance)
+
+                results = None
+                if change.changed or item["last_results"] is None:
+                    analyzer_output = registry.analyzer.run({"fetched_product_info": fetcher_output})
+                    predictor_output = registry.predictor.run({"analyzer_output": analyzer_output})
+                    results = serialize_results({
+                        "extractor": item["product_info"],
+                        "fetcher": fetcher_output,
+                        "analyzer": analyzer_output,
+                        "predictor": predictor_output,
+                        "change": change.to_dict()
+                    })
+
+            # Fold this refresh's prices into the item's history, which stays the same size however many refreshes it has seen
+            history = PriceSketch.merged([PriceSketch.from_dict(item.get("price_history")), PriceSketch.from_dict(fetcher_output.price_sketch)])
+
+            fetcher_data = serialize_results(fetcher_output)
+            self.store.record_refresh(item_id, self._next_run_at(item["interval_seconds"]), fetcher_data, results, change.changed,
+                                      history.to_dict() if len(history) else None)
+            with self._lock:
+                self.stats["refreshes"] += 1
+                self.stats["changed" if change.changed else "unchanged"] += 1
+                if results is None:
+                    self.stats["analyses_skipped"] += 1
+            print(f"✅ Watchlist refresh of {item['product_id']} succeeded ({', '.join(change.reasons) or 'no change'}).")
+
+            for observer in self.observers:
+                try:
+                    observer(item, fetcher_data, results)
+                except Exception as e:
+                    print(f"⚠️ Watchlist observer failed: {e}")
+
+        except Exception as e:
+            print(f"❌ Watchlist refresh of {item['product_id']} failed: {e}")
+            traceback.print_exc()
+            self.store.record_error(item_id, self._next_run_at(item["interval_seconds"]), str(e))
+            with self._lock:
+                self.stats["errors"] += 1
+
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._wake.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"items": self.store.count(), "in_flight": self._in_flight, "max_concurrency": self.max_concurrency, **self.stats}
@@ -0,0 +1,184 @@
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+
+# current UTC time in ISO 8601 format
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SQLiteWatchlistStore:
+    """
+    Watched products and their last refresh, backed by a local SQLite file.
+
+    Each item keeps the canonical product spec it was added with (so refreshes
+    never re-run extraction), its refresh interval, the epoch time of its next
+    refresh, the last fetcher output and pipeline results, the fetcher output
+    those results were computed from (analyzed_fetcher), and a quantile
+    sketch of the offer prices of every refresh so far. Due items are
+    claimed by pushing next_run_at forward by a lease, so a crashed refresh is
+    retried once the lease expires.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    item_id TEXT PRIMARY KEY,
+                    product_id TEXT NOT NULL UNIQUE,
+                    product_info TEXT NOT NULL,
+                    interval_seconds REAL NOT NULL,
+                    next_run_at REAL NOT NULL,
+                    last_fetcher TEXT,
+                    last_results TEXT,
+                    analyzed_fetcher TEXT,
+                    price_history TEXT,
+                    last_error TEXT,
+                    refreshes INTEGER NOT NULL DEFAULT 0,
+                    changes INTEGER NOT NULL DEFAULT 0,
+                    last_checked_at TEXT,
+                    last_changed_at TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_next_run ON watchlist (next_run_at)")
+            # Watchlists created before price history or the analyzed fetch were kept
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(watchlist)")}
+            if "price_history" not in columns:
+                conn.execute("ALTER TABLE watchlist ADD COLUMN price_history TEXT")
+            if "analyzed_fetcher" not in columns:
+                conn.execute("ALTER TABLE watchlist ADD COLUMN analyzed_fetcher TEXT")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        for name in ("product_info", "last_fetcher", "last_results", "analyzed_fetcher", "price_history"):
+            record[name] = json.loads(record[name]) if record[name] else None
+        return record
+
+    def add(self, product_id: str, product_info: Dict[str, Any], interval_seconds: float) -> Dict[str, Any]:
+        """
+        Watches a product, due immediately. Adding a product that is already
+        watched updates its spec and interval instead.
+
+        Returns:
+            Item record; "existing" is True when the product was already watched
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT item_id FROM watchlist WHERE product_id = ?", (product_id,)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE watchlist SET product_info = ?, interval_seconds = ? WHERE item_id = ?",
+                    (json.dumps(product_info), interval_seconds, row["item_id"])
+                )
+                item_id, existing = row["item_id"], True
+            else:
+                item_id, existing = uuid.uuid4().hex, False
+                conn.execute(
+                    "INSERT INTO watchlist (item_id, product_id, product_info, interval_seconds, next_run_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (item_id, product_id, json.dumps(product_info), interval_seconds, time.time(), _now())
+                )
+            row = conn.execute("SELECT * FROM watchlist WHERE item_id = ?", (item_id,)).fetchone()
+            return {**self._to_record(row), "existing": existing}
+
+    def remove(self, item_id: str) -> bool:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM watchlist WHERE item_id = ?", (item_id,)).rowcount > 0
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM watchlist WHERE item_id = ?", (item_id,)).fetchone()
+            return self._to_record(row) if row else None
+
+    def list_items(self) -> List[Dict[str, Any]]:
+        """Every watched item without its stored outputs, soonest refresh first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT item_id, product_id, product_info, interval_seconds, next_run_at, last_error, refreshes, changes, "
+                "last_checked_at, last_changed_at, created_at, NULL AS last_fetcher, NULL AS last_results, NULL AS analyzed_fetcher, NULL AS price_history "
+                "FROM watchlist ORDER BY next_run_at"
+            ).fetchall()
+            return [self._to_record(row) for row in rows]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM watchlist").fetchone()[0]
+
+    def next_due_at(self) -> Optional[float]:
+        with self._connect() as conn:
+            return conn.execute("SELECT MIN(next_run_at) FROM watchlist").fetchone()[0]
+
+    def claim_due(self, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """Atomically claims up to limit due items, leasing them for lease_seconds."""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT * FROM watchlist WHERE next_run_at <= ? ORDER BY next_run_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE watchlist SET next_run_at = ? WHERE item_id = ?",
+                [(now + lease_seconds, row["item_id"]) for row in rows]
+            )
+            return [self._to_record(row) for row in rows]
+
+    def record_refresh(self, item_id: str, next_run_at: float, fetcher: Dict[str, Any], results: Optional[Dict[str, Any]], changed: bool,
+                       price_history: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Stores a successful refresh; results is None when the analysis was
+        skipped. When results are given, fetcher also becomes the analyzed
+        fetch that later refreshes are compared with. price_history (a
+        PriceSketch dict of every refresh's offer prices) replaces the stored
+        one when given.
+        """
+        now = _now()
+        fetcher_json = json.dumps(fetcher, default=str)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE watchlist SET next_run_at = ?, last_fetcher = ?, last_results = COALESCE(?, last_results), "
+                "analyzed_fetcher = COALESCE(?, analyzed_fetcher), last_error = NULL, "
+                "price_history = COALESCE(?, price_history), refreshes = refreshes + 1, changes = changes + ?, last_checked_at = ?, "
+                "last_changed_at = CASE WHEN ? THEN ? ELSE last_changed_at END WHERE item_id = ?",
+                (next_run_at, fetcher_json, json.dumps(results, default=str) if results is not None else None,
+                 fetcher_json if results is not None else None,
+                 json.dumps(price_history) if price_history is not None else None, int(changed), now, int(changed), now, item_id)
+            )
+
+    def record_error(self, item_id: str, next_run_at: float, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE watchlist SET next_run_at = ?, last_error = ?, last_checked_at = ? WHERE item_id = ?",
+                (next_run_at, error, _now(), item_id)
+            )
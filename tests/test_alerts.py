@@ -0,0 +1,54 @@
+from schemas.alert_schema import AlertRule
+from services.alert_logic.alert_engine import AlertEngine, Observation
+from services.alert_logic.alert_sinks import read_recent_alerts
+import json
+import pytest
+import sqlite3
+
+
+def test_state_is_saved_after_each_observation(tmp_path):
+    state_path = str(tmp_path / "alert_state.sqlite3")
+    engine = AlertEngine(state_path=state_path)
+    engine.add_rule(AlertRule(kind="window_low", product_id="p1", window_days=7))
+    engine.observe(Observation(product_id="p1", timestamp=1000.0, current_price=500.0))
+
+    # A new engine (e.g. after a crash) picks up the window minimum and EWMA
+    restarted = AlertEngine(state_path=state_path)
+    restarted.add_rule(AlertRule(kind="window_low", product_id="p1", window_days=7))
+    assert restarted._states["p1"].ewma == 500.0
+    alerts = restarted.observe(Observation(product_id="p1", timestamp=2000.0, current_price=450.0))
+    assert len(alerts) == 1
+
+
+def test_each_observation_writes_only_its_product_row(tmp_path):
+    state_path = str(tmp_path / "alert_state.sqlite3")
+    engine = AlertEngine(state_path=state_path)
+    for product_id in ("p1", "p2"):
+        engine.observe(Observation(product_id=product_id, timestamp=1000.0, current_price=500.0))
+    engine._states["p2"].ewma = 1.0
+
+    engine.observe(Observation(product_id="p1", timestamp=2000.0, current_price=400.0))
+    with sqlite3.connect(state_path) as conn:
+        rows = dict(conn.execute("SELECT product_id, state FROM alert_state").fetchall())
+    assert json.loads(rows["p1"])["observations"] == 2
+    assert json.loads(rows["p2"])["ewma"] == 500.0
+
+    # An older state never overwrites a newer one
+    engine._save_rows([("p1", 1, json.dumps({"observations": 1}))])
+    assert AlertEngine(state_path=state_path)._states["p1"].observations == 2
+
+
+@pytest.mark.parametrize("count, limit, block_size", [(0, 5, 64), (3, 5, 64), (200, 5, 64), (200, 20, 7), (200, 20, 8192)])
+def test_recent_alerts_are_read_from_the_tail(tmp_path, count, limit, block_size):
+    path = tmp_path / "alerts.jsonl"
+    path.write_text("".join(json.dumps({"alert_id": str(i), "message": "x" * (i % 13)}) + "\n" for i in range(count)))
+
+    alerts = read_recent_alerts(str(path), limit=limit, block_size=block_size)
+    assert [alert["alert_id"] for alert in alerts] == [str(i) for i in reversed(range(max(count - limit, 0), count))]
+
+
+def test_recent_alerts_skip_a_partly_written_line(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    path.write_text(json.dumps({"alert_id": "0"}) + "\n" + json.dumps({"alert_id": "1"}) + "\n" + '{"alert_id": "2", "mes')
+
+    assert [alert["alert_id"] for alert in read_recent_alerts(str(path), limit=5)] == ["1", "0"]
@@ -0,0 +1,38 @@
+from services.api_logic import client as client_module
+from services.api_logic.client import AnalysisApiClient, AnalysisApiError
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        if self._payload is None:
+            raise ValueError("no JSON body")
+        return self._payload
+
+
+@pytest.fixture
+def respond(monkeypatch):
+    def set_response(status_code, payload=None):
+        monkeypatch.setattr(client_module.requests, "request", lambda method, url, **kwargs: FakeResponse(status_code, payload))
+    return set_response
+
+
+def test_missing_job_is_none(respond):
+    respond(404, {"error": "Job not found"})
+    assert AnalysisApiClient("http://api").get_job("abc123") is None
+
+
+def test_other_errors_still_raise(respond):
+    respond(500)
+    with pytest.raises(AnalysisApiError, match="HTTP 500"):
+        AnalysisApiClient("http://api").get_job("abc123")
+
+
+def test_waiting_for_a_missing_job_raises(respond):
+    respond(404, {"error": "Job not found"})
+    with pytest.raises(AnalysisApiError, match="not found"):
+        AnalysisApiClient("http://api").wait_for_job("abc123", poll_interval=0.0, timeout=1.0)
@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+from services.concurrency_logic.deadline import request_deadline
+from services.concurrency_logic.rate_limiter import RateLimitError, RateLimiter
+from services.llm_logic import router as router_module
+from services.llm_logic.router import CircuitBreaker, LLMBackend, LLMRouter
+import pytest
+import threading
+import time
+
+
+class FakeChatModel:
+    """Local stand-in for a chat model: answers (or raises) after an optional delay."""
+
+    def __init__(self, answer="ok", delay=0.0, error=None):
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, model_input, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+
+def fake_backend(name, model, provider=None, failure_threshold=3, cooldown_seconds=30.0):
+    backend = LLMBackend(name, lambda: model, provider=provider)
+    backend.breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown_seconds=cooldown_seconds)
+    return backend
+
+
+def test_breaker_opens_half_opens_and_closes():
+    flaky = FakeChatModel(answer="flaky", error=RuntimeError("backend down"))
+    backend = fake_backend("flaky", flaky, failure_threshold=2, cooldown_seconds=0.05)
+    router = LLMRouter("test", [backend], hedge=False)
+
+    # Consecutive failures open the circuit
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="backend down"):
+            router.invoke("hi")
+    assert backend.breaker.state == "open"
+
+    # While open, the backend is not called at all
+    with pytest.raises(RuntimeError, match="all circuits open"):
+        router.invoke("hi")
+    assert flaky.calls == 2
+
+    # After the cooldown one trial goes through; its success closes the circuit
+    time.sleep(0.06)
+    assert backend.breaker.available()
+    flaky.error = None
+    assert router.invoke("hi") == "flaky"
+    assert backend.breaker.state == "closed"
+
+
+def test_half_open_trial_failure_reopens():
+    flaky = FakeChatModel(error=RuntimeError("still down"))
+    first = fake_backend("flaky", flaky, failure_threshold=1, cooldown_seconds=0.05)
+    router = LLMRouter("test", [first, fake_backend("steady", FakeChatModel(answer="steady"))], hedge=False)
+
+    assert router.invoke("hi") == "steady"
+    assert first.breaker.state == "open"
+    time.sleep(0.06)
+    assert first.breaker.allow()
+    assert first.breaker.state == "half_open"
+    # Only one trial at a time
+    assert not first.breaker.allow()
+    with pytest.raises(RuntimeError):
+        first.call("hi")
+    assert first.breaker.state == "open"
+
+
+def test_hedges_once_primary_runs_past_p95():
+    slow = FakeChatModel(answer="slow", delay=1.0)
+    fast = FakeChatModel(answer="fast")
+    primary, secondary = fake_backend("slow", slow), fake_backend("fast", fast)
+    # The primary has been the faster backend so far, with a p95 of 20 ms
+    for _ in range(LLMRouter.MIN_SAMPLES_TO_HEDGE):
+        primary._record(0.02, ok=True)
+        secondary._record(0.05, ok=True)
+    router = LLMRouter("test", [primary, secondary])
+
+    started = time.monotonic()
+    assert router.invoke("hi") == "fast"
+    assert time.monotonic() - started < 0.5
+    assert router.stats()["hedged_requests"] == 1
+
+
+def test_error_falls_through_to_next_backend():
+    broken = FakeChatModel(error=ValueError("bad response"))
+    router = LLMRouter("test", [fake_backend("broken", broken), fake_backend("steady", FakeChatModel(answer="steady"))])
+
+    assert router.invoke("hi") == "steady"
+    assert broken.calls == 1
+
+
+def test_last_real_error_is_raised_when_all_backends_fail():
+    router = LLMRouter("test", [
+        fake_backend("a", FakeChatModel(error=ValueError("a failed"))),
+        fake_backend("b", FakeChatModel(error=KeyError("b failed"))),
+    ])
+
+    with pytest.raises(KeyError):
+        router.invoke("hi")
+
+
+def test_all_rate_limited_raises_rate_limit_error(tmp_path, monkeypatch):
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite3"))
+    monkeypatch.setattr(router_module, "get_rate_limiter", lambda: limiter)
+    # Each provider's daily quota of one call is already used up
+    for provider in ("fake_a", "fake_b"):
+        monkeypatch.setenv(f"QUOTA_{provider.upper()}_PER_DAY", "1")
+        limiter.acquire(provider)
+    first, second = FakeChatModel(), FakeChatModel()
+    router = LLMRouter("test", [fake_backend("a", first, provider="fake_a"), fake_backend("b", second, provider="fake_b")])
+
+    with pytest.raises(RateLimitError, match="All LLM backends for test are rate limited"):
+        router.invoke("hi")
+    assert first.calls == second.calls == 0
+    # Local rate limits are not backend failures
+    assert all(backend.breaker.state == "closed" for backend in router.backends)
+
+
+@pytest.mark.parametrize("deadline_seconds", [None, 5.0])
+def test_concurrent_calls_are_not_capped_per_stage(deadline_seconds):
+    model = FakeChatModel(delay=0.5)
+    router = LLMRouter("test", [fake_backend("only", model)])
+
+    # Without a deadline calls run on the caller's thread; with one, on the shared pool
+    def call(prompt):
+        with request_deadline(deadline_seconds):
+            return router.invoke(prompt)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=16) as callers:
+        answers = list(callers.map(call, ["hi"] * 16))
+    assert answers == ["ok"] * 16
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,42 @@
+from services.catalog_logic.catalog_index import CatalogIndex
+from services.fetcher_logic import offer_sources
+from services.fetcher_logic.offer_sources import LocalFileSource
+import json
+import pytest
+
+PHONE = {"product_name": "Galaxy S23", "brand": "Samsung", "attributes": {"storage": "256GB"}, "market_region": "us"}
+LAPTOP = {"product_name": "MacBook Air M2", "brand": "Apple", "market_region": "us"}
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    catalog = CatalogIndex(path=str(tmp_path / "catalog.jsonl"))
+    monkeypatch.setattr(offer_sources, "get_catalog", lambda: catalog)
+    return catalog
+
+
+def write_offers(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return LocalFileSource(str(path))
+
+
+def test_indexing_the_file_does_not_grow_the_catalog(tmp_path, catalog):
+    phone_id = catalog.resolve(PHONE)
+    source = write_offers(tmp_path / "offers.jsonl", [
+        {**PHONE, "product_name": "Galaxy S-23", "seller": "Amazon", "price": 799.0},
+        {**LAPTOP, "seller": "Walmart", "price": 999.0},
+    ])
+
+    index = source.file.index()
+    # The variant spelling is matched to the known phone; the unknown laptop is not registered
+    assert [row["seller"] for row in index[phone_id]] == ["Amazon"]
+    assert len(catalog) == 1
+    assert not (tmp_path / "catalog.jsonl").read_text().count("MacBook")
+
+
+def test_unmatched_rows_are_found_by_their_normalized_fields(tmp_path, catalog):
+    source = write_offers(tmp_path / "offers.jsonl", [{**LAPTOP, "seller": "Walmart", "price": 999.0}])
+    source.file.index()
+
+    batch = source.fetch("macbook air m2", {**LAPTOP, "product_name": "macbook  air m2"})
+    assert batch.offers.prices.tolist() == [999.0]
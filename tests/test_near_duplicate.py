@@ -0,0 +1,16 @@
+from services.cache_logic.near_duplicate import normalize_request
+import pytest
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Samsung Galaxy S23 in India", "Samsung Galaxy S23 India"),
+    ("Sony Bravia 55 in TV", "Sony Bravia 55 inch TV"),
+    ("Sony Bravia 55in TV", "Sony Bravia 55 inches TV"),
+    ("iPhone 14 256 GB in USA", "iphone 14 256gb united states"),
+])
+def test_equivalent_requests_normalize_alike(first, second):
+    assert normalize_request(first) == normalize_request(second)
+
+
+def test_in_before_a_region_is_not_a_unit():
+    assert normalize_request("Samsung Galaxy S23 in India") == ["23", "galaxy", "in", "s", "samsung"]
@@ -0,0 +1,35 @@
+from services.fetcher_logic.fetcher_output import build_fetcher_output
+from services.fetcher_logic.offer_table import OfferTable
+from services.fetcher_logic.outlier_filter import outlier_mask
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("method", ["mad", "iqr"])
+@pytest.mark.parametrize("prices", [[499, 499, 499, 499, 489], [100, 100, 100, 101, 100]])
+def test_small_gaps_are_not_outliers_when_offers_cluster(method, prices):
+    assert not outlier_mask(np.array(prices, dtype=float), method=method).any()
+
+
+@pytest.mark.parametrize("method", ["mad", "iqr"])
+def test_accessory_and_bundle_are_flagged(method):
+    flagged = outlier_mask(np.array([20.0, 799, 829, 779, 849, 2400]), method=method)
+    assert flagged.tolist() == [True, False, False, False, False, True]
+
+
+def test_replaced_current_price_is_recorded():
+    offers = OfferTable.from_columns([20.0, 799, 829, 779, 849], ["CaseCo", "Amazon", "Walmart", "BestBuy", "Target"])
+    output = build_fetcher_output({"product_name": "iPhone 14"}, offers, "USD")
+
+    assert output.current_price == 799
+    assert output.current_price_replaced
+    assert output.raw_price_stats["current"] == 20.0
+    assert output.lowest_price == 779
+
+
+def test_current_price_kept_when_not_an_outlier():
+    offers = OfferTable.from_columns([799, 20.0, 829, 779, 849], ["Amazon", "CaseCo", "Walmart", "BestBuy", "Target"])
+    output = build_fetcher_output({"product_name": "iPhone 14"}, offers, "USD")
+
+    assert output.current_price == 799
+    assert not output.current_price_replaced
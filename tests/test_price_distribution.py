@@ -0,0 +1,53 @@
+from schemas import fetcher_schema
+from services.fetcher_logic.fetcher_output import build_fetcher_output
+from services.fetcher_logic.offer_table import OfferTable
+from services.watchlist_logic import change_detection
+from services.watchlist_logic.change_detection import detect_market_change
+import pytest
+
+
+@pytest.fixture
+def max_offers(monkeypatch):
+    monkeypatch.setattr(fetcher_schema, "PRICE_DISTRIBUTION_MAX_OFFERS", 5)
+    monkeypatch.setattr(change_detection, "PRICE_DISTRIBUTION_MAX_OFFERS", 5)
+    return 5
+
+
+def fetch(prices, sellers):
+    return build_fetcher_output({"product_name": "Phone"}, OfferTable.from_columns(prices, sellers), "USD")
+
+
+def test_large_offer_sets_serialize_the_first_offers_and_the_sketch(max_offers):
+    output = fetch([100.0 + i % 7 for i in range(40)], [f"s{i}" for i in range(40)])
+    data = output.model_dump()
+
+    assert [offer["seller"] for offer in data["price_distribution"]] == ["s0", "s1", "s2", "s3", "s4"]
+    assert data["seller_count"] == 40
+    assert sum(data["price_sketch"]["weights"]) == 40
+    assert len(data["seller_prices"]) == max_offers
+    assert max(data["seller_prices"].values()) == 100.0
+
+
+def test_change_detection_reads_the_stored_seller_prices(max_offers):
+    sellers = [f"s{i}" for i in range(10)]
+    previous = fetch([100.0 + 10 * i for i in range(10)], sellers).model_dump()
+
+    # A seller above the stored cheapest five is not a new seller
+    unchanged = detect_market_change(previous, fetch([100.0 + 10 * i for i in range(10)], sellers))
+    assert not unchanged.changed
+
+    moved = detect_market_change(previous, fetch([95.0] + [100.0 + 10 * i for i in range(1, 10)], sellers))
+    assert moved.price_moves == {"s0": (100.0, 95.0)}
+
+    joined = detect_market_change(previous, fetch([100.0 + 10 * i for i in range(10)] + [95.0], sellers + ["new"]))
+    assert joined.sellers_added == ["new"]
+
+    dropped = detect_market_change(previous, fetch([100.0 + 10 * i for i in range(1, 10)], sellers[1:]))
+    assert dropped.sellers_removed == ["s0"]
+
+
+def test_change_detection_accepts_outputs_stored_without_seller_prices():
+    previous = fetch([100.0, 101.0, 102.0], ["a", "b", "c"]).model_dump(exclude={"seller_prices"})
+
+    change = detect_market_change(previous, fetch([100.0, 101.0, 102.0, 103.0], ["a", "b", "c", "d"]))
+    assert change.sellers_added == ["d"]
@@ -0,0 +1,59 @@
+from services.concurrency_logic.rate_limiter import RateLimitError, RateLimiter, is_rate_limit_error
+import threading
+import time
+
+
+class ResourceExhausted(Exception):
+    """Named like google.api_core.exceptions.ResourceExhausted."""
+
+
+class StatusError(Exception):
+    def __init__(self, message, status_code=None, response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+class FakeResponse:
+    status_code = 429
+
+
+def test_rate_limit_errors_are_detected_by_type_and_status():
+    assert is_rate_limit_error(RateLimitError("local budget"))
+    assert is_rate_limit_error(ResourceExhausted("slow down"))
+    assert is_rate_limit_error(StatusError("too many", status_code=429))
+    assert is_rate_limit_error(StatusError("too many", response=FakeResponse()))
+
+
+def test_wrapped_rate_limit_error_is_detected():
+    try:
+        try:
+            raise ResourceExhausted("slow down")
+        except ResourceExhausted as e:
+            raise RuntimeError("model call failed") from e
+    except RuntimeError as wrapped:
+        assert is_rate_limit_error(wrapped)
+
+
+def test_message_text_alone_is_not_a_rate_limit():
+    assert not is_rate_limit_error(ValueError("Galaxy S23 priced at 4299 is over the quota of the rate limit page"))
+    assert not is_rate_limit_error(StatusError("server error", status_code=500))
+
+
+def test_slow_bucket_of_one_provider_does_not_block_another(tmp_path, monkeypatch):
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite3"))
+    take = limiter._try_take
+
+    def slow_take(provider):
+        if provider == "slow":
+            time.sleep(0.5)
+        return take(provider)
+
+    monkeypatch.setattr(limiter, "_try_take", slow_take)
+    slow = threading.Thread(target=limiter.acquire, args=("slow",))
+    slow.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    limiter.acquire("fast")
+    assert time.monotonic() - started < 0.3
+    slow.join()
@@ -0,0 +1,80 @@
+from services.concurrency_logic.deadline import DeadlineExceeded, bounded_timeout, is_deadline_error, request_deadline
+from services.concurrency_logic.single_flight import SingleFlight
+import pytest
+import requests
+import threading
+import time
+
+
+def run_as_leader(flight, key, fn, deadline_seconds, outcome):
+    try:
+        with request_deadline(deadline_seconds):
+            outcome["result"] = flight.do(key, fn)
+    except BaseException as e:
+        outcome["error"] = e
+
+
+def slow_call(seconds, answer="answer"):
+    # Sleeps in deadline-bounded steps, like a network call with bounded timeouts
+    def call():
+        finish = time.monotonic() + seconds
+        while time.monotonic() < finish:
+            time.sleep(min(0.02, bounded_timeout(0.02, what="slow call")))
+        return answer
+    return call
+
+
+def test_follower_without_deadline_retries_after_leader_deadline():
+    flight = SingleFlight("test")
+    leader = {}
+    thread = threading.Thread(target=run_as_leader, args=(flight, "key", slow_call(0.3), 0.1, leader))
+    thread.start()
+    time.sleep(0.02)
+
+    assert flight.do("key", slow_call(0.3, answer="follower")) == "follower"
+    thread.join()
+    assert isinstance(leader["error"], DeadlineExceeded)
+    assert flight.stats()["retried"] == 1
+
+
+def test_follower_shares_leader_result():
+    flight = SingleFlight("test")
+    leader = {}
+    thread = threading.Thread(target=run_as_leader, args=(flight, "key", slow_call(0.1), None, leader))
+    thread.start()
+    time.sleep(0.02)
+
+    assert flight.do("key", slow_call(0.1, answer="unused")) == "answer"
+    thread.join()
+    assert flight.stats()["executions"] == 1
+
+
+def test_follower_gets_leader_error_when_not_a_deadline():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("bad input")
+
+    thread = threading.Thread(target=lambda: pytest.raises(ValueError, flight.do, "key", failing))
+    thread.start()
+    started.wait()
+    with pytest.raises(ValueError, match="bad input"):
+        flight.do("key", failing)
+    thread.join()
+
+
+def test_deadline_errors_are_detected_by_type():
+    assert is_deadline_error(DeadlineExceeded("request deadline reached"))
+    assert is_deadline_error(requests.exceptions.ReadTimeout("read timed out"))
+    try:
+        try:
+            raise requests.exceptions.ConnectTimeout("connect timed out")
+        except requests.exceptions.ConnectTimeout as e:
+            raise RuntimeError("search failed") from e
+    except RuntimeError as wrapped:
+        assert is_deadline_error(wrapped)
+    # A message alone is not a timeout
+    assert not is_deadline_error(ValueError("the seller timed out the offer"))
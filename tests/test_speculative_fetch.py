@@ -0,0 +1,65 @@
+from services.concurrency_logic.rate_limiter import RateLimiter
+from services.extractor_logic.heuristic_parser import heuristic_extract
+from services.fetcher_logic.query_builder import build_search_query
+from services.fetcher_logic import serpapi_client
+from services.pipeline_logic import pipeline
+from types import SimpleNamespace
+import pytest
+
+PAYLOAD = {"shopping_results": [{"source": "Amazon", "extracted_price": 799.0}]}
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeRequests:
+    """Stand-in for the requests module: answers every search with one fixed response."""
+
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, params=None, timeout=None):
+        return self.response
+
+
+class FakeTool:
+    def __init__(self, run):
+        self.run = run
+
+
+@pytest.fixture
+def serpapi(tmp_path, monkeypatch):
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite3"))
+    monkeypatch.setattr(serpapi_client, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(serpapi_client, "STALE_SEARCH_CACHE", serpapi_client.get_cache("test_fetcher_stale", max_entries=16, ttl_seconds=60))
+    monkeypatch.setattr(pipeline, "SPECULATIVE_FETCH_ENABLED", True)
+    return monkeypatch
+
+
+def test_rate_limited_speculative_search_marks_the_fetcher_degraded(serpapi):
+    product_input = "Samsung Galaxy S23 in USA"
+    product_info = {"product_name": "Samsung Galaxy S23", "brand": "Samsung", "market_region": "us"}
+    prefetched = []
+
+    # A good search leaves a stale payload to fall back on
+    serpapi.setattr(serpapi_client, "requests", FakeRequests(FakeResponse(200, PAYLOAD)))
+    guess = heuristic_extract(product_input)
+    serpapi_client.search_google_shopping(build_search_query(guess), guess.get("market_region"))
+
+    serpapi.setattr(serpapi_client, "requests", FakeRequests(FakeResponse(429)))
+    registry = SimpleNamespace(
+        extractor=FakeTool(lambda product_input: product_info),
+        fetcher=FakeTool(lambda args: prefetched.append(args.get("prefetched_results")) or "fetched"),
+        analyzer=FakeTool(lambda args: "analyzed"),
+        predictor=FakeTool(lambda args: "predicted"),
+    )
+    results = pipeline.run_analysis_pipeline(product_input, registry=registry, deadline_seconds=None)
+
+    assert prefetched == [PAYLOAD]
+    assert results["degraded"]["fetcher"]["fallback"] == "stale_results"
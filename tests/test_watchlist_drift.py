@@ -0,0 +1,39 @@
+from services.fetcher_logic.fetcher_output import build_fetcher_output
+from services.fetcher_logic.offer_table import OfferTable
+from services.watchlist_logic.scheduler import WatchlistScheduler
+from services.watchlist_logic.watchlist_store import SQLiteWatchlistStore
+from types import SimpleNamespace
+
+
+class FakeTool:
+    def __init__(self, run):
+        self.run = run
+        self.calls = 0
+
+    def __call__(self, args):
+        self.calls += 1
+        return self.run(args)
+
+
+def test_small_moves_that_add_up_rerun_the_analysis(tmp_path):
+    store = SQLiteWatchlistStore(str(tmp_path / "watchlist.sqlite3"))
+    scheduler = WatchlistScheduler(store, price_tolerance=0.005)
+    item = store.add("prd_phone", {"product_name": "Phone", "market_region": "us"}, 3600)
+    prices = [100.0]
+
+    # Every refresh the price drops by 0.4%, under the 0.5% tolerance
+    def fetch(args):
+        prices.append(prices[-1] * 0.996)
+        return build_fetcher_output({"product_name": "Phone"}, OfferTable.from_columns([prices[-1]], ["Amazon"]), "USD")
+
+    analyzer = FakeTool(lambda args: {"price_position": "fair"})
+    scheduler._registries.registry = SimpleNamespace(
+        fetcher=SimpleNamespace(run=fetch), analyzer=SimpleNamespace(run=analyzer), predictor=SimpleNamespace(run=lambda args: {})
+    )
+    for _ in range(30):
+        scheduler._refresh(store.get(item["item_id"]))
+
+    # The first refresh, then each time the drift since the last analysis passes the tolerance
+    assert analyzer.calls == 15
+    stored = store.get(item["item_id"])
+    assert abs(stored["analyzed_fetcher"]["current_price"] - stored["last_fetcher"]["current_price"]) <= 0.005 * stored["analyzed_fetcher"]["current_price"]
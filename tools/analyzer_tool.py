@@ -1,25 +1,39 @@
-from services.analyzer_logic.confidence import compute_confidence_score
-from services.analyzer_logic.price_analysis import get_price_evaluation
-from services.analyzer_logic.market_analysis import generate_market_analysis
-from services.analyzer_logic.risk_analysis import generate_risks_and_warnings
-from services.analyzer_logic.signals import generate_signals
-from services.analyzer_logic.buy_decision import get_buy_decision_info
-from services.analyzer_logic.offer_selection import select_best_offer
-from services.analyzer_logic.data_completeness import get_data_completeness_ratio
+from services.analyzer_logic.market_assessment import assess_market
 from services.analyzer_logic.get_analysis import get_analysis_data
+from services.analyzer_logic.template_summary import build_template_summary
+from services.cache_logic.result_cache import get_cache, hash_payload
+from services.concurrency_logic.single_flight import get_single_flight
+from services.concurrency_logic.rate_limiter import is_rate_limit_error
+from services.concurrency_logic.deadline import is_deadline_error, mark_degraded
+from services.concurrency_logic.cpu_pool import run_cpu
+from services.llm_logic.router import get_router
+from services.llm_logic.prompt_assembly import compact_schema_hint, estimate_tokens, fit_lines, record_prompt, to_kv_lines
+from services.llm_logic.structured_output import invoke_structured
+from services.metrics_logic.registry import TOOL_LATENCY, timed_calls
 from schemas.analysis_schema import Summary, AnalysisOutput
 from schemas.fetcher_schema import FetcherOutput
 from prompts.analyzer_prompts import system_prompt_template, summarize_prompt_template
-from langchain_ollama import ChatOllama
-from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Type
-import json
 import traceback
 
 
+# Analyses are memoized on the fetched data (minus its timestamp) and shared across sessions
+ANALYSIS_CACHE = get_cache("analyzer", max_entries=512, ttl_seconds=6 * 60 * 60)
+
+# Identical concurrent summaries share one LLM chain run
+SUMMARY_FLIGHT = get_single_flight("analyzer_chain")
+
+# Prompt is built once; the format instructions are a one-line schema hint
+SUMMARY_SCHEMA_HINT = compact_schema_hint(Summary)
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", system_prompt_template),
+    ("human", summarize_prompt_template + "\n{format_instructions}")
+]).partial(format_instructions=SUMMARY_SCHEMA_HINT)
+SUMMARY_PROMPT_TOKENS = estimate_tokens(system_prompt_template + summarize_prompt_template + SUMMARY_SCHEMA_HINT)
+
 
 # Define the argument schema for the tool
 class AnalyzerArgs(BaseModel):
@@ -32,6 +46,7 @@ class Analyzer_Tool(BaseTool):
     args_schema : Type[BaseModel] = AnalyzerArgs 
     
     
+    @timed_calls(TOOL_LATENCY, "Analyzer_Tool")
     def _run(self, fetched_product_info: FetcherOutput) -> AnalysisOutput:
         """
         Analyzes market data and provides insights on pricing, competition, and buy recommendations.
@@ -43,75 +58,59 @@ class Analyzer_Tool(BaseTool):
             AnalysisOutput with summary, price evaluation, buy decision, best offer, market analysis, risks and warnings, signals and confidence score.
         """
         try:
-            # Extract relevant fields from fetched_product_info
-            current_price = fetched_product_info.current_price
-            average_price = fetched_product_info.average_price
-            lowest_price = fetched_product_info.lowest_price
-            highest_price = fetched_product_info.highest_price
-            seller_count = fetched_product_info.seller_count
-            price_distribution = fetched_product_info.price_distribution
+            # Return the memoized analysis if the same market data was already analyzed
+            cache_key = hash_payload({
+                **fetched_product_info.model_dump(exclude={"timestamp", "price_distribution", "seller_prices", "price_sketch"}),
+                "offers": fetched_product_info.offers.fingerprint()
+            })
+            cached_output = ANALYSIS_CACHE.get(cache_key)
+            if cached_output is not None:
+                print("✅ Analysis served from cache.")
+                return cached_output.model_copy(deep=True)
 
-            
-            # Get price evaluation
-            price_evaluation = get_price_evaluation(current_price, average_price, lowest_price, highest_price, seller_count)
-            
-            # Get buy decision
-            buy_decision = get_buy_decision_info(price_position=price_evaluation.price_position, price_gap_percent=price_evaluation.price_gap_percent, price_volatility=price_evaluation.price_volatility, seller_count=seller_count)
-            
-            # Select best offer
-            best_offer = select_best_offer(price_distribution, average_price)
-            
-            # Generate market analysis
-            market_analysis = generate_market_analysis(seller_count, lowest_price, highest_price, average_price)
-            
-            # Generate risks and warnings
-            risks_and_warnings = generate_risks_and_warnings(seller_count, price_evaluation.price_volatility, current_price, average_price)
-            
-            # Generate market signals
-            signals = generate_signals(price_evaluation.price_position, price_evaluation.price_volatility, seller_count)
-            
-            # get data completeness ratio for calculating confidence score
-            data_completeness_ratio = get_data_completeness_ratio(current_price, average_price, lowest_price, highest_price, seller_count)
-            
-            # Compute confidence score        
-            confidence_score = compute_confidence_score(seller_count, price_evaluation.price_position, price_evaluation.price_volatility, data_completeness_ratio)
+            # Rule-based analysis (in a worker process for batch runs)
+            assessment = run_cpu(assess_market, fetched_product_info)
+            price_evaluation = assessment["price_evaluation"]
+            buy_decision = assessment["buy_decision"]
+            best_offer = assessment["best_offer"]
+            market_analysis = assessment["market_analysis"]
+            risks_and_warnings = assessment["risks_and_warnings"]
+            signals = assessment["signals"]
+            confidence_score = assessment["confidence_score"]
             
             # Summarize analysis using LLM
             
-            # initialize the LLM
-            llm = ChatOllama(model="llama3.1:8b", temperature=0.5)
+            # Route between the local llama3.1 model and Gemini by health and latency
+            llm = get_router("analyzer")
             
             # Get analysis data for the prompt
             analysis_data = get_analysis_data(fetched_product_info, price_evaluation, buy_decision, market_analysis, best_offer, risks_and_warnings, signals, confidence_score)
             
-            # Define the prompt template 
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", system_prompt_template),
-                ("human", summarize_prompt_template + "\n\n{format_instructions}")
-            ])
-            
-            parser = PydanticOutputParser(pydantic_object=Summary)
-            
-            # Create the LLM chain
-            chain = prompt | llm | parser
+            # Serialize the analysis as compact key: value lines within the analyzer's token budget
+            data_lines = to_kv_lines(analysis_data)
+            chain_input = {"analysis_data": fit_lines("analyzer", SUMMARY_PROMPT_TOKENS, data_lines)}
+            messages = SUMMARY_PROMPT.format_messages(**chain_input)
+            record_prompt("analyzer", "\n".join(message.content for message in messages), trimmed=chain_input["analysis_data"].count("\n") + 1 < len(data_lines))
                 
-            # generate the summary
-            summary = chain.invoke({"analysis_data": json.dumps(analysis_data, indent=2), "format_instructions": parser.get_format_instructions()})
+            # generate the summary (JSON mode, parsed once, repaired or re-prompted if malformed)
+            degraded = False
+            try:
+                summary = SUMMARY_FLIGHT.do(
+                    hash_payload(chain_input),
+                    lambda: invoke_structured("analyzer", llm, messages, Summary.model_validate, SUMMARY_SCHEMA_HINT)
+                )
+            except Exception as e:
+                if not (is_rate_limit_error(e) or is_deadline_error(e)):
+                    raise
+                # Out of budget or time: fill the template summary instead of failing
+                print(f"⚠️ Analysis summary degraded to template: {e}")
+                mark_degraded("analyzer", "template_summary", e)
+                summary = build_template_summary(fetched_product_info.product_name, price_evaluation, buy_decision, market_analysis, risks_and_warnings)
+                degraded = True
             
             print("✅ Analysis succeeded.")
             
-            print(AnalysisOutput(
-                summary = summary,
-                price_evaluation = price_evaluation,
-                buy_decision = buy_decision,
-                best_offer = best_offer,
-                market_analysis = market_analysis,
-                risks_and_warnings = risks_and_warnings,
-                signals = signals,
-                confidence_score = confidence_score
-            ))
-            
-            return AnalysisOutput(
+            analysis_output = AnalysisOutput(
                 summary = summary,
                 price_evaluation = price_evaluation,
                 buy_decision = buy_decision,
@@ -121,6 +120,13 @@ class Analyzer_Tool(BaseTool):
                 signals = signals,
                 confidence_score = confidence_score
             )
+            
+            print(analysis_output)
+            
+            if not degraded:
+                ANALYSIS_CACHE.set(cache_key, analysis_output.model_copy(deep=True))
+            
+            return analysis_output
 
         except Exception as e:
             print(f"❌ Analysis failed: {e}")
@@ -1,18 +1,33 @@
 from langchain_core.tools import BaseTool 
 from pydantic import BaseModel, Field 
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
 from schemas.product_schema import ProductSchema
 from prompts.Extractor_prompt import extract_prompt_template
+from services.concurrency_logic.single_flight import get_single_flight
+from services.cache_logic.result_cache import hash_payload
+from services.concurrency_logic.rate_limiter import is_rate_limit_error
+from services.concurrency_logic.deadline import is_deadline_error, mark_degraded
+from services.llm_logic.router import get_router
+from services.extractor_logic.heuristic_parser import heuristic_extract
+from services.llm_logic.prompt_assembly import estimate_tokens, fit_text, record_prompt
+from services.llm_logic.structured_output import invoke_structured
+from services.extractor_logic.product_validation import PRODUCT_SCHEMA_HINT, validate_product_info
+from services.metrics_logic.registry import TOOL_LATENCY, timed_calls
 from typing import Type 
 import traceback
-from dotenv import load_dotenv
-import os
 
-load_dotenv()  # Load environment variables from .env file
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") 
+# Identical concurrent extractions share one LLM call
+EXTRACTION_FLIGHT = get_single_flight("extractor_llm")
+
+# Parser and prompt are built once; only the user input changes per request
+EXTRACTION_PARSER = JsonOutputParser(schema = ProductSchema)
+EXTRACTION_PROMPT = PromptTemplate(
+    template=extract_prompt_template,
+    input_variables= ["input_text"],
+    partial_variables={'format_instructions': EXTRACTION_PARSER.get_format_instructions()}
+)
+EXTRACTION_PROMPT_TOKENS = estimate_tokens(EXTRACTION_PROMPT.format(input_text=""))
 
 
 # Define the argument schema for the tool
@@ -26,6 +41,7 @@ class Extractor_Tool(BaseTool):
     description : str = "Extracts structured information from raw text. The input is a string, and the output is a dictionary containing the extracted fields"
     args_schema : Type[BaseModel] = ExtractorArgs
     
+    @timed_calls(TOOL_LATENCY, "Extractor_Tool")
     def _run(self, input_text: str) -> dict:
         
         """
@@ -42,32 +58,32 @@ class Extractor_Tool(BaseTool):
             RuntimeError: If extraction fails
         """
         try:
-            # initialize the LLM
-            # llm = ChatOllama(model="qwen2.5:7b", temperature=0.7)
-            llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7, api_key=GOOGLE_API_KEY)
-            
-            # Define the json parser
-            json_parser = JsonOutputParser(schema = ProductSchema)
+            # Route between Gemini and the local qwen2.5 model by health and latency
+            llm = get_router("extractor")
             
-            # Define the prompt template 
-            prompt = PromptTemplate(
-                template=extract_prompt_template,
-                input_variables= ["input_text"],
-                partial_variables={'format_instructions': json_parser.get_format_instructions()}
-            )
+            # Format the prompt with user input, trimmed to the extractor's token budget
+            prompt_input = fit_text("extractor", EXTRACTION_PROMPT_TOKENS, input_text)
+            formatted_prompt = EXTRACTION_PROMPT.format(input_text=prompt_input)
+            record_prompt("extractor", formatted_prompt, trimmed=prompt_input != input_text)
             
-            # Format the prompt with user input
-            formatted_prompt = prompt.format(input_text=input_text)
-            
-            # Get the response from the LLM
-            response = llm.invoke(formatted_prompt)
+            # Get the parsed response from the LLM (JSON mode, parsed once, repaired or re-prompted if malformed)
+            try:
+                product_info = EXTRACTION_FLIGHT.do(
+                    hash_payload({"model": llm.model, "prompt": formatted_prompt}),
+                    lambda: invoke_structured("extractor", llm, formatted_prompt, validate_product_info, PRODUCT_SCHEMA_HINT)
+                )
+            except Exception as e:
+                if not (is_rate_limit_error(e) or is_deadline_error(e)):
+                    raise
+                # Out of budget or time: fall back to the rule-based parser instead of failing
+                print(f"⚠️ Extraction degraded to heuristic parse: {e}")
+                mark_degraded("extractor", "heuristic_parse", e)
+                return heuristic_extract(input_text)
             
             print("✅ Extraction succeeded.")
+            print(product_info)
             
-            # Parse and return the JSON response
-            print(json_parser.parse(response.content))
-            
-            return json_parser.parse(response.content)
+            return product_info
         
         except Exception as e:
             print(f"❌ Extraction failed: {e}")
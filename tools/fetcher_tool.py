@@ -1,87 +1,48 @@
-from langchain.tools import BaseTool 
+from langchain_core.tools import BaseTool 
 from pydantic import BaseModel, Field
-from typing import Type
-from dotenv import load_dotenv
-from services.fetcher_logic.query_builder  import flatten_value
-from services.fetcher_logic.serpapi_parser import parse_serpapi_shopping_results
+from typing import Optional, Type
+from services.fetcher_logic.query_builder import build_search_query
+from services.fetcher_logic.offer_collection import fetch_offers
+from services.catalog_logic.catalog_index import get_catalog
+from services.metrics_logic.registry import TOOL_LATENCY, timed_calls
 from schemas.fetcher_schema import FetcherOutput
-import requests
 import traceback
-import os
-
-
-load_dotenv()
-# Load environment variables
-SERPAPI_KEY = os.getenv('SERPAPI_KEY')
 
 
 # Define the argument schema for the tool
 class FetcherArgs(BaseModel):
     product_info: dict = Field(description="JSON containing product details to search for.")
+    prefetched_results: Optional[dict] = Field(default=None, description="SerpAPI payload already fetched for this product; skips the search when given.")
 
 # Define the Product Fetcher Tool
 class Fetcher_Tool(BaseTool):
     name : str = "ProductFetcher"
-    description : str = "Takes structured product information (JSON) extracted from text and searches the web for matching products. Uses the provided fields such as product name, brand, RAM, storage, condition, and location to fetch real-time product details like price, availability, specifications, and seller information."
+    description : str = "Takes structured product information (JSON) extracted from text and searches every enabled offer source (web shopping search, local offer files, recorded searches) for matching products. Uses the provided fields such as product name, brand, RAM, storage, condition, and location to fetch real-time product details like price, availability, specifications, and seller information."
     args_schema : Type[BaseModel] = FetcherArgs 
 
-    def _run(self, product_info: dict) -> FetcherOutput:
+    @timed_calls(TOOL_LATENCY, "Fetcher_Tool")
+    def _run(self, product_info: dict, prefetched_results: Optional[dict] = None) -> FetcherOutput:
         
         """
-        Fetches real-time product prices and availability from Google Shopping.
+        Fetches real-time product prices and availability from the enabled offer sources.
         
         Args:
             product_info: Dictionary with product details (name, brand, specs, region)
+            prefetched_results: Optional SerpAPI payload fetched ahead of time (speculative fetch)
             
         Returns:
-            FetcherOutput with prices, sellers, and market data
+            FetcherOutput with the catalog product ID, prices, sellers, and market data
         """
         try:
             # Build the search query from product_info
-            important_fields = {
-                "product_name",
-                "brand",
-                "model",
-                "category",
-                "attributes",
-                "condition",  
-                "market_region", 
-                "additional_context",
-                "search_keywords",
-                "input_confidence"
-            }
-            
-            # Construct the search query
-            query = ""
-            for field in important_fields:
-                parts = []
-                if field not in product_info:
-                    raise ValueError(f"Missing required field: {field}")
-                else:
-                    value = product_info.get(field)
-                    parts.extend(flatten_value(value))
-                    query = " ".join(parts)
-                    query = " ".join(query.split())
-                    
-            # parameters for SerpAPI request        
-            params = {
-                "engine" : "google_shopping", 
-                "q": query,
-                "api_key": SERPAPI_KEY,
-                "hl": "en",                                   #host language
-                "gl": product_info.get("market_region"),      #geolocation
-                "num": 5                                      #number of results
-            }        
-                    
-            # url for SerpAPI request
-            url = "https://serpapi.com/search"
+            query = build_search_query(product_info)
             
-            # Make the request to SerpAPI
-            result = requests.get(url, params=params)
-            data = result.json()
+            # Query all offer sources in parallel and merge their offers; SerpAPI reuses the prefetched payload
+            prefetched = {"serpapi": prefetched_results} if prefetched_results is not None else None
+            clean_data = fetch_offers(product_info, query, prefetched=prefetched)
             
-            # Parse and clean the SerpAPI shopping results
-            clean_data = parse_serpapi_shopping_results(product_info, data)
+            # Attach the canonical catalog ID for this product
+            clean_data.product_id = get_catalog().resolve(product_info)
             
             print("✅ Fetching succeeded.")
             print(clean_data)
@@ -1,18 +1,27 @@
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Type, Dict, Any, List, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
 from prompts.predictor_prompt import generate_predictor_prompt
 from schemas.analysis_schema import AnalysisOutput
 from services.predictor_logic.buid_features import build_features
-from services.predictor_logic.llm_reasoning import llm_reasoning
-from dotenv import load_dotenv
+from services.predictor_logic.llm_reasoning import llm_reasoning, ML_ONLY_NOTE
+from services.predictor_logic.ml_scoring import predict_probabilities
+from services.concurrency_logic.cpu_pool import current_cpu_pool, run_cpu
+from services.cache_logic.result_cache import get_cache, hash_payload
+from services.llm_logic.router import get_router
+from services.metrics_logic.registry import REGISTRY, TOOL_LATENCY, timed_calls
+import numpy as np
 import traceback
-import joblib
+import hashlib
+import copy
 import os
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Predictions are memoized on the feature vector and model version, shared across sessions
+PREDICTION_CACHE = get_cache("predictor", max_entries=1024, ttl_seconds=6 * 60 * 60)
+
+# Which model version this process serves, so a stale or mixed deployment can be alerted on
+MODEL_INFO = REGISTRY.gauge("productpulse_model_info", "Loaded ML model versions: 1 for the version in use, 0 for versions loaded earlier.", ("model", "version"))
+MODEL_FILE_TIMESTAMP = REGISTRY.gauge("productpulse_model_file_timestamp_seconds", "Modification time of each loaded ML model file.", ("model",))
 
 
 class PredictorArgs(BaseModel):
@@ -26,11 +35,11 @@ class Predictor_Tool(BaseTool):
     
     # Class constants
     MODEL_PATH: str = "models/logistic_predictor.joblib"
-    LLM_MODEL: str = "gemini-2.5-flash"
-    LLM_TEMPERATURE: float = 0.3
+    LLM_STAGE: str = "predictor"
     
     # Internal attributes
     model: Optional[Any] = Field(default=None, exclude=True)
+    model_version: Optional[str] = Field(default=None, exclude=True)
     llm: Optional[Any] = Field(default=None, exclude=True)
     
     def __init__(self, **kwargs):
@@ -40,28 +49,33 @@ class Predictor_Tool(BaseTool):
         if not os.path.exists(self.MODEL_PATH):
             raise FileNotFoundError(f"LogisticRegression model not found at {self.MODEL_PATH}")
         
-        # Check if API key exists
-        if not GOOGLE_API_KEY:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        
         try:
             # Load the trained Logistic Regression model
+            # joblib (and scikit-learn, through the pickle) load here rather than at import
+            import joblib
             object.__setattr__(self, 'model', joblib.load(self.MODEL_PATH))
         except Exception as e:
             raise RuntimeError(f"Failed to load model: {e}")
         
+        # Version the model by its file contents so retraining invalidates cached predictions
+        with open(self.MODEL_PATH, "rb") as model_file:
+            object.__setattr__(self, 'model_version', hashlib.sha256(model_file.read()).hexdigest()[:16])
+        model_name = os.path.splitext(os.path.basename(self.MODEL_PATH))[0]
+        for labels, gauge in MODEL_INFO.children():
+            if labels["model"] == model_name and labels["version"] != self.model_version:
+                gauge.set(0)
+        MODEL_INFO.labels(model_name, self.model_version).set(1)
+        MODEL_FILE_TIMESTAMP.labels(model_name).set(os.path.getmtime(self.MODEL_PATH))
+        
         try:
-            # Initialize the LLM
-            object.__setattr__(self, 'llm', ChatGoogleGenerativeAI(
-                model=self.LLM_MODEL,
-                google_api_key=GOOGLE_API_KEY,
-                temperature=self.LLM_TEMPERATURE
-            ))
+            # Route between Gemini and the local llama3.1 model by health and latency
+            object.__setattr__(self, 'llm', get_router(self.LLM_STAGE))
         except Exception as e:
             raise RuntimeError(f"Failed to initialize LLM: {e}")
 
 
     # Main execution method
+    @timed_calls(TOOL_LATENCY, "Predictor_Tool")
     def _run(self, analyzer_output: AnalysisOutput) -> Dict[str, Any]:
         """
         Makes BUY/WAIT prediction using ML model and provides LLM-generated reasoning.
@@ -81,8 +95,18 @@ class Predictor_Tool(BaseTool):
             # Extract features for ML model
             features = build_features(analyzer_output)
 
-            # Get ML prediction
-            probs = self.model.predict_proba([features])[0]
+            # Return the memoized prediction if these features were already scored by this model
+            cache_key = hash_payload({"features": features, "model_version": self.model_version, "llm_model": self.llm.model})
+            cached_prediction = PREDICTION_CACHE.get(cache_key)
+            if cached_prediction is not None:
+                print(f"✅ Prediction served from cache: {cached_prediction['final_decision']}")
+                return copy.deepcopy(cached_prediction)
+
+            # Get ML prediction (in a worker process for batch runs)
+            if current_cpu_pool() is not None:
+                probs = np.asarray(run_cpu(predict_probabilities, self.MODEL_PATH, self.model_version, features))
+            else:
+                probs = self.model.predict_proba([features])[0]
             pred = int(probs.argmax())
             confidence = float(probs[pred])
 
@@ -93,22 +117,7 @@ class Predictor_Tool(BaseTool):
             
             print(f"✅ Prediction succeeded: {ml_decision} with confidence {confidence:.2f}")
             
-            print({
-                "final_decision": ml_decision,
-                "confidence": round(confidence, 2),
-                "ml_decision": ml_decision,
-                "llm_reasoning": reasoning,
-                "feature_snapshot": {
-                    "price_gap_percent": features[0],
-                    "price_spread_percent": features[1],
-                    "seller_count": features[2],
-                    "volatility_score": features[3],
-                    "competition_score": features[4],
-                    "confidence_score": features[5]
-                }
-            })
-            
-            return {
+            prediction = {
                 "final_decision": ml_decision,
                 "confidence": round(confidence, 2),
                 "ml_decision": ml_decision,
@@ -123,6 +132,14 @@ class Predictor_Tool(BaseTool):
                 }
             }
             
+            print(prediction)
+            
+            # Don't pin a failed LLM explanation in the cache
+            if ML_ONLY_NOTE not in reasoning:
+                PREDICTION_CACHE.set(cache_key, copy.deepcopy(prediction))
+            
+            return prediction
+            
         except Exception as e:
             print(f"❌ Prediction failed: {e}")
             traceback.print_exc()
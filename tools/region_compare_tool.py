@@ -0,0 +1,48 @@
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+from typing import List, Type
+from services.fetcher_logic.region_compare import compare_regions
+from services.metrics_logic.registry import TOOL_LATENCY, timed_calls
+from schemas.comparison_schema import RegionComparison
+import traceback
+
+
+# Define the argument schema for the tool
+class RegionCompareArgs(BaseModel):
+    product_info: dict = Field(description="JSON containing the extracted product details to compare.")
+    regions: List[str] = Field(description="Google country codes of the markets to compare, e.g. ['us', 'in', 'uk'].")
+    base_currency: str = Field(default="USD", description="Currency to normalize all prices to.")
+
+
+# Define the Region Compare Tool
+class RegionCompare_Tool(BaseTool):
+    name : str = "RegionCompare"
+    description : str = "Searches the same product in several market regions at once and normalizes the prices to one currency. Returns a per-region price matrix and a cross-region ranking of the cheapest offers."
+    args_schema : Type[BaseModel] = RegionCompareArgs
+
+    @timed_calls(TOOL_LATENCY, "RegionCompare_Tool")
+    def _run(self, product_info: dict, regions: List[str], base_currency: str = "USD") -> RegionComparison:
+
+        """
+        Compares product prices across market regions.
+
+        Args:
+            product_info: Dictionary with product details (name, brand, specs)
+            regions: Market regions to search concurrently
+            base_currency: Currency the prices are converted to
+
+        Returns:
+            RegionComparison with the price matrix and best-offer ranking
+        """
+        try:
+            comparison = compare_regions(product_info, regions, base_currency=base_currency)
+
+            print(f"✅ Region comparison succeeded in {comparison.total_seconds:.2f}s.")
+            print(comparison)
+
+            return comparison
+
+        except Exception as e:
+            print(f"❌ Region comparison failed: {e}")
+            traceback.print_exc()
+            raise